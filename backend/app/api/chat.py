@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any, Tuple
@@ -249,7 +250,7 @@ async def send_message(
                 if not clean_message:
                     clean_message = request.message
                 
-                rag_result = rag_service.query(
+                rag_result = await rag_service.query(
                     clean_message, 
                     current_user.role.value,
                     model_id=request.model_id,
@@ -303,7 +304,7 @@ async def send_message(
                     clean_message = request.message
                 
                 # Get RAG content for the podcast
-                rag_result = rag_service.query(
+                rag_result = await rag_service.query(
                     clean_message, 
                     current_user.role.value,
                     model_id=request.model_id,
@@ -387,7 +388,7 @@ async def send_message(
                 if not clean_message:
                     clean_message = request.message
                 
-                rag_result = rag_service.query(
+                rag_result = await rag_service.query(
                     clean_message, 
                     current_user.role.value,
                     model_id=request.model_id,
@@ -441,7 +442,7 @@ async def send_message(
                 if not clean_message:
                     clean_message = request.message
                 
-                rag_result = rag_service.query(
+                rag_result = await rag_service.query(
                     clean_message, 
                     current_user.role.value,
                     model_id=request.model_id,
@@ -489,7 +490,7 @@ async def send_message(
                     ]
                 
                 # Get RAG response about the topic
-                rag_result = rag_service.query(
+                rag_result = await rag_service.query(
                     topic or request.message,
                     current_user.role.value,
                     model_id=request.model_id,
@@ -681,7 +682,7 @@ async def send_message(
                             for msg in previous_messages
                         ]
                     
-                    rag_result = rag_service.query(
+                    rag_result = await rag_service.query(
                         topic or request.message,
                         current_user.role.value,
                         model_id=request.model_id,
@@ -782,7 +783,7 @@ async def send_message(
                                 for msg in previous_messages
                             ]
                         
-                        rag_result = rag_service.query(
+                        rag_result = await rag_service.query(
                             topic or request.message,
                             current_user.role.value,
                             model_id=request.model_id,
@@ -854,7 +855,7 @@ async def send_message(
                     for msg in previous_messages
                 ]
             
-            rag_result = rag_service.query(
+            rag_result = await rag_service.query(
                 request.message, 
                 current_user.role.value,
                 model_id=request.model_id,
@@ -894,6 +895,88 @@ async def send_message(
         }
     }
 
+@router.post("/message/stream")
+async def send_message_stream(
+    request: ChatMessageRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Regular RAG Q&A with the answer streamed as plain text while it is generated
+    
+    The session ID is returned in the X-Session-Id header; the assistant message (with sources)
+    is saved once the stream completes.
+    """
+    # Get or create session
+    if request.session_id:
+        session = db.query(ChatSession).filter(
+            ChatSession.id == request.session_id,
+            ChatSession.user_id == current_user.id
+        ).first()
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chat session not found"
+            )
+    else:
+        session = ChatSession(user_id=current_user.id, title=request.message[:50])
+        db.add(session)
+        db.commit()
+        db.refresh(session)
+    
+    # Get conversation history for context (include metadata to track document usage)
+    previous_messages = db.query(ChatMessage).filter(
+        ChatMessage.session_id == session.id
+    ).order_by(ChatMessage.created_at.asc()).all()
+    conversation_history = [
+        {
+            "role": msg.role,
+            "content": msg.content,
+            "metadata": msg.message_metadata or {}  # Include metadata to track sources
+        }
+        for msg in previous_messages
+    ]
+    
+    # Save user message
+    db.add(ChatMessage(session_id=session.id, role="user", content=request.message))
+    db.commit()
+    
+    async def generate():
+        sources = []
+        metadata = {"model_used": request.model_id or "auto"}
+        answer_parts = []
+        try:
+            async for text in rag_service.stream_answer(
+                request.message,
+                current_user.role.value,
+                model_id=request.model_id,
+                conversation_history=conversation_history,
+                content_type=request.content_type,
+                sources=sources
+            ):
+                answer_parts.append(text)
+                yield text
+        except Exception as e:
+            logger.error(f"Error streaming RAG answer: {e}", exc_info=True)
+            error_text = f"I encountered an error: {str(e)}"
+            answer_parts.append(error_text)
+            metadata["error"] = str(e)
+            yield error_text
+        
+        metadata["sources"] = sources
+        db.add(ChatMessage(
+            session_id=session.id,
+            role="assistant",
+            content="".join(answer_parts),
+            message_metadata=metadata
+        ))
+        db.commit()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Session-Id": str(session.id)}
+    )
+
 @router.get("/sessions")
 async def list_sessions(
     current_user: User = Depends(get_current_user),
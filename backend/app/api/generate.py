@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Literal, Optional
@@ -8,6 +8,7 @@ from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.services.document_generator import DocumentGenerator
 from app.services.mcp_service import mcp_service
+from app.services.tts_service import tts_service
 import logging
 
 router = APIRouter()
@@ -20,6 +21,10 @@ class GenerateRequest(BaseModel):
     topic: Optional[str] = None
     template_id: Optional[int] = None  # ID of uploaded PowerPoint template
 
+class TTSStreamRequest(BaseModel):
+    text: str
+    use_dialogue: bool = True  # Host/Guest voices for dialogue scripts, single voice otherwise
+
 class ConfirmPPTRequest(BaseModel):
     content: str  # The assistant's message content to use for PowerPoint generation
     topic: Optional[str] = None
@@ -98,6 +103,23 @@ async def generate_document(
             detail=f"Failed to generate document: {str(e)}"
         )
 
+@router.post("/tts/stream")
+async def stream_tts(
+    request: TTSStreamRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream MP3 audio for a script segment by segment, so playback starts before the whole file is ready"""
+    if not request.text.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No text provided for TTS conversion"
+        )
+    
+    return StreamingResponse(
+        tts_service.text_to_speech_stream(request.text, use_dialogue=request.use_dialogue),
+        media_type="audio/mpeg"
+    )
+
 @router.post("/confirm-ppt")
 async def confirm_generate_ppt(
     request: ConfirmPPTRequest,
@@ -8,6 +8,7 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")  # Root log level for the API process
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./intranet.db")
@@ -19,6 +20,9 @@ class Settings(BaseSettings):
     # OpenAI TTS voices: alloy, echo, fable, onyx, nova, shimmer
     OPENAI_TTS_VOICE_HOST: str = os.getenv("OPENAI_TTS_VOICE_HOST", "nova")  # Voice for Host
     OPENAI_TTS_VOICE_GUEST: str = os.getenv("OPENAI_TTS_VOICE_GUEST", "onyx")  # Voice for Guest
+    TTS_CONCURRENCY: int = int(os.getenv("TTS_CONCURRENCY", "6"))  # Max concurrent OpenAI TTS requests (dialogue segments)
+    TTS_CACHE_ENABLED: bool = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"  # Reuse audio for repeated lines
+    TTS_CACHE_MAX_MB: int = int(os.getenv("TTS_CACHE_MAX_MB", "64"))  # In-memory TTS cache size cap
     
     # Cisco OpenAI Endpoint (OAuth2)
     CISCO_CLIENT_ID: str = os.getenv("CISCO_CLIENT_ID", "")
@@ -31,14 +35,25 @@ class Settings(BaseSettings):
     AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID", "")
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
+    # Optional comma-separated regions to spread Bedrock calls over (TPS quotas are per region), e.g. us-east-1,us-west-2
+    AWS_BEDROCK_REGIONS: str = os.getenv("AWS_BEDROCK_REGIONS", "")
     # Bedrock models can be specified multiple times or comma-separated
     # Format: BEDROCK_CHAT_MODEL=model1,BEDROCK_CHAT_MODEL=model2 or BEDROCK_CHAT_MODELS=model1,model2
     BEDROCK_CHAT_MODELS: str = os.getenv("BEDROCK_CHAT_MODELS", "")  # Comma-separated list
     BEDROCK_EMBED_MODEL: str = os.getenv("BEDROCK_EMBED_MODEL", "amazon.titan-embed-text-v1")
+    BEDROCK_MAX_PARALLEL: int = int(os.getenv("BEDROCK_MAX_PARALLEL", "50"))  # Max concurrent LLM requests (RAG semaphore / Bedrock connection pool)
+    # Bedrock batch inference for bulk RAG workloads (RAGService.batch_answer)
+    BEDROCK_USE_BATCH: bool = os.getenv("BEDROCK_USE_BATCH", "false").lower() == "true"
+    BEDROCK_BATCH_MODEL_ID: str = os.getenv("BEDROCK_BATCH_MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0")
+    BEDROCK_BATCH_ROLE_ARN: str = os.getenv("BEDROCK_BATCH_ROLE_ARN", "")  # Service role Bedrock assumes to read/write S3
+    BEDROCK_BATCH_S3_BUCKET: str = os.getenv("BEDROCK_BATCH_S3_BUCKET", "")
+    BEDROCK_BATCH_S3_PREFIX: str = os.getenv("BEDROCK_BATCH_S3_PREFIX", "rag-batch")
+    BEDROCK_BATCH_MIN_RECORDS: int = int(os.getenv("BEDROCK_BATCH_MIN_RECORDS", "1000"))  # Bedrock minimum per job
     
     # Vector Database
     VECTOR_DB_PATH: str = os.getenv("VECTOR_DB_PATH", "./vector_db")
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "amazon.titan-embed-text-v1")  # Default to Bedrock
+    FAISS_INDEX_PATH: str = os.getenv("FAISS_INDEX_PATH", "")  # Optional: FAISS IVF-PQ index file for the search read path
     
     # External AI Services (Optional)
     # Video Generation Services
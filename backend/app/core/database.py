@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -12,6 +12,23 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def insert_ignore(model, index_elements):
+    """INSERT that silently skips rows conflicting on index_elements (single round-trip, race-safe)
+    
+    On dialects without an insert-or-ignore form this is a plain INSERT, so callers should still
+    check for an existing row first; a conflict there raises IntegrityError as before.
+    """
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect in ("mysql", "mariadb"):
+        return insert(model).prefix_with("IGNORE")
+    return insert(model)
+
 def get_db():
     db = SessionLocal()
     try:
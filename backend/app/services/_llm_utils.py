@@ -0,0 +1,33 @@
+"""
+Helpers shared by the services that call chat models
+"""
+from typing import Any, Callable, Dict
+
+from langchain.schema.messages import AIMessage, AIMessageChunk
+
+
+def _from_dict(response: dict) -> str:
+    # Some models return dict with 'text' or 'content' key
+    return response.get('text') or response.get('content') or str(response)
+
+
+def _fallback(response: Any) -> str:
+    if hasattr(response, 'content'):
+        return response.content
+    if hasattr(response, 'text'):
+        return response.text
+    return str(response)
+
+
+# Exact-type lookup covers the common responses with a single dict get
+_EXTRACTORS: Dict[type, Callable[[Any], str]] = {
+    AIMessage: lambda r: r.content,
+    AIMessageChunk: lambda r: r.content,
+    str: lambda r: r,
+    dict: _from_dict,
+}
+
+
+def extract_text(response: Any) -> str:
+    """Text of an LLM response (chat message, stream chunk, plain string or dict)"""
+    return _EXTRACTORS.get(type(response), _fallback)(response)
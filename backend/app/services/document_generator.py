@@ -613,16 +613,13 @@ For professional results, consider using:
             )
         
         # Try to generate actual audio using TTS service
-        # Run TTS in a thread pool to avoid blocking the event loop
+        # Async TTS keeps the event loop free (segments are requested concurrently)
         try:
             from app.services.tts_service import tts_service
-            import asyncio
             
             logger.info(f"Generating {audio_format.upper()} audio from dialogue using TTS service...")
-            # Run blocking TTS call in thread pool to avoid freezing UI
             # Explicitly enable dialogue mode for podcast (Host/Guest voices)
-            audio_data = await asyncio.to_thread(
-                tts_service.text_to_speech,
+            audio_data = await tts_service.text_to_speech_async(
                 text=dialogue,
                 audio_format=audio_format,
                 language="en",
@@ -755,14 +752,11 @@ To convert to audio manually, you can use:
             # speech_text is now generated by SpeechService
             
             # Generate audio using TTS service (single voice, no dialogue parsing)
-            # Run TTS in a thread pool to avoid blocking the event loop
+            # Async TTS keeps the event loop free
             from app.services.tts_service import tts_service
-            import asyncio
             
             logger.info(f"Generating {audio_format.upper()} audio from speech using TTS service...")
-            # Run blocking TTS call in thread pool to avoid freezing UI
-            audio_data = await asyncio.to_thread(
-                tts_service.text_to_speech_dialogue,
+            audio_data = await tts_service.text_to_speech_async(
                 speech_text,
                 audio_format=audio_format,
                 language="en",
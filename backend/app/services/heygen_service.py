@@ -387,8 +387,8 @@ class HeyGenService:
         # Fallback: return empty string to let API error show what's available
         raise ValueError("No voice ID configured and unable to fetch available voices. Please set HEYGEN_VOICE_ID in environment variables or check your API key.")
     
-    async def list_avatars(self) -> list:
-        """List available avatars from HeyGen"""
+    async def list_avatars(self, client: Optional[httpx.AsyncClient] = None) -> list:
+        """List available avatars from HeyGen (pass client to reuse an open connection pool)"""
         if not self.api_key:
             raise ValueError("HeyGen API key not configured")
         
@@ -397,6 +397,10 @@ class HeyGenService:
             logger.debug(f"Using cached avatars ({len(self._cached_avatars)} found)")
             return self._cached_avatars
         
+        if client is None:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                return await self.list_avatars(client=client)
+        
         logger.info("Fetching available avatars from HeyGen API...")
         
         try:
@@ -407,20 +411,19 @@ class HeyGenService:
                 "Content-Type": "application/json"
             }
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(endpoint, headers=headers)
-                response.raise_for_status()
-                result = response.json()
-                avatars = result.get("data", {}).get("avatars", [])
-                if avatars:
-                    self._cached_avatars = avatars
-                    logger.info(f"✓ Found {len(avatars)} avatar(s) from v2 API")
-                    # Log first few avatars for debugging
-                    for i, avatar in enumerate(avatars[:3], 1):
-                        avatar_id = avatar.get("avatar_id") or avatar.get("id", "N/A")
-                        avatar_name = avatar.get("name", "Unnamed")
-                        logger.info(f"   {i}. {avatar_name} (ID: {avatar_id})")
-                    return avatars
+            response = await client.get(endpoint, headers=headers)
+            response.raise_for_status()
+            result = response.json()
+            avatars = result.get("data", {}).get("avatars", [])
+            if avatars:
+                self._cached_avatars = avatars
+                logger.info(f"✓ Found {len(avatars)} avatar(s) from v2 API")
+                # Log first few avatars for debugging
+                for i, avatar in enumerate(avatars[:3], 1):
+                    avatar_id = avatar.get("avatar_id") or avatar.get("id", "N/A")
+                    avatar_name = avatar.get("name", "Unnamed")
+                    logger.info(f"   {i}. {avatar_name} (ID: {avatar_id})")
+                return avatars
         except Exception as e:
             logger.warning(f"v2 avatars endpoint failed, trying v1: {e}")
         
@@ -432,20 +435,19 @@ class HeyGenService:
                 "Content-Type": "application/json"
             }
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(endpoint, headers=headers)
-                response.raise_for_status()
-                result = response.json()
-                avatars = result.get("data", {}).get("avatars", [])
-                if avatars:
-                    self._cached_avatars = avatars
-                    logger.info(f"✓ Found {len(avatars)} avatar(s) from v1 API")
-                    # Log first few avatars for debugging
-                    for i, avatar in enumerate(avatars[:3], 1):
-                        avatar_id = avatar.get("avatar_id") or avatar.get("id", "N/A")
-                        avatar_name = avatar.get("name", "Unnamed")
-                        logger.info(f"   {i}. {avatar_name} (ID: {avatar_id})")
-                    return avatars
+            response = await client.get(endpoint, headers=headers)
+            response.raise_for_status()
+            result = response.json()
+            avatars = result.get("data", {}).get("avatars", [])
+            if avatars:
+                self._cached_avatars = avatars
+                logger.info(f"✓ Found {len(avatars)} avatar(s) from v1 API")
+                # Log first few avatars for debugging
+                for i, avatar in enumerate(avatars[:3], 1):
+                    avatar_id = avatar.get("avatar_id") or avatar.get("id", "N/A")
+                    avatar_name = avatar.get("name", "Unnamed")
+                    logger.info(f"   {i}. {avatar_name} (ID: {avatar_id})")
+                return avatars
         except Exception as e:
             logger.error(f"Error listing avatars: {e}", exc_info=True)
             return []
@@ -453,8 +455,8 @@ class HeyGenService:
         logger.warning("No avatars found from either v1 or v2 API")
         return []
     
-    async def list_voices(self) -> list:
-        """List available voices from HeyGen"""
+    async def list_voices(self, client: Optional[httpx.AsyncClient] = None) -> list:
+        """List available voices from HeyGen (pass client to reuse an open connection pool)"""
         if not self.api_key:
             raise ValueError("HeyGen API key not configured")
         
@@ -463,6 +465,10 @@ class HeyGenService:
             logger.debug(f"Using cached voices ({len(self._cached_voices)} found)")
             return self._cached_voices
         
+        if client is None:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                return await self.list_voices(client=client)
+        
         logger.info("Fetching available voices from HeyGen API...")
         
         try:
@@ -473,20 +479,19 @@ class HeyGenService:
                 "Content-Type": "application/json"
             }
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(endpoint, headers=headers)
-                response.raise_for_status()
-                result = response.json()
-                voices = result.get("data", {}).get("voices", [])
-                if voices:
-                    self._cached_voices = voices
-                    logger.info(f"✓ Found {len(voices)} voice(s) from v2 API")
-                    # Log first few voices for debugging
-                    for i, voice in enumerate(voices[:3], 1):
-                        voice_id = voice.get("voice_id") or voice.get("id", "N/A")
-                        voice_name = voice.get("name", "Unnamed")
-                        logger.info(f"   {i}. {voice_name} (ID: {voice_id})")
-                    return voices
+            response = await client.get(endpoint, headers=headers)
+            response.raise_for_status()
+            result = response.json()
+            voices = result.get("data", {}).get("voices", [])
+            if voices:
+                self._cached_voices = voices
+                logger.info(f"✓ Found {len(voices)} voice(s) from v2 API")
+                # Log first few voices for debugging
+                for i, voice in enumerate(voices[:3], 1):
+                    voice_id = voice.get("voice_id") or voice.get("id", "N/A")
+                    voice_name = voice.get("name", "Unnamed")
+                    logger.info(f"   {i}. {voice_name} (ID: {voice_id})")
+                return voices
         except Exception as e:
             logger.warning(f"v2 voices endpoint failed, trying v1: {e}")
         
@@ -498,20 +503,19 @@ class HeyGenService:
                 "Content-Type": "application/json"
             }
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(endpoint, headers=headers)
-                response.raise_for_status()
-                result = response.json()
-                voices = result.get("data", {}).get("voices", [])
-                if voices:
-                    self._cached_voices = voices
-                    logger.info(f"✓ Found {len(voices)} voice(s) from v1 API")
-                    # Log first few voices for debugging
-                    for i, voice in enumerate(voices[:3], 1):
-                        voice_id = voice.get("voice_id") or voice.get("id", "N/A")
-                        voice_name = voice.get("name", "Unnamed")
-                        logger.info(f"   {i}. {voice_name} (ID: {voice_id})")
-                    return voices
+            response = await client.get(endpoint, headers=headers)
+            response.raise_for_status()
+            result = response.json()
+            voices = result.get("data", {}).get("voices", [])
+            if voices:
+                self._cached_voices = voices
+                logger.info(f"✓ Found {len(voices)} voice(s) from v1 API")
+                # Log first few voices for debugging
+                for i, voice in enumerate(voices[:3], 1):
+                    voice_id = voice.get("voice_id") or voice.get("id", "N/A")
+                    voice_name = voice.get("name", "Unnamed")
+                    logger.info(f"   {i}. {voice_name} (ID: {voice_id})")
+                return voices
         except Exception as e:
             logger.error(f"Error listing voices: {e}", exc_info=True)
             return []
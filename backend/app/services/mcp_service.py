@@ -245,7 +245,7 @@ class MCPService:
                 }
             
             try:
-                audio_data = tts_service.text_to_speech(text, audio_format, language)
+                audio_data = await tts_service.text_to_speech_async(text, audio_format, language)
                 return {
                     "status": "success",
                     "audio_data": audio_data,  # Base64 encoded audio
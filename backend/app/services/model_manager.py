@@ -1,8 +1,15 @@
-from typing import Dict, List, Optional, Literal, Union
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Literal, Tuple, Union
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings, AzureChatOpenAI
 from langchain_aws import ChatBedrock, BedrockLLM
+from langchain.schema import HumanMessage
 from app.core.config import settings
+from tenacity import RetryCallState, retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+import asyncio
+import itertools
+import json
+import re
 import boto3
+from botocore.config import Config
 import base64
 import httpx
 import time
@@ -12,13 +19,240 @@ logger = logging.getLogger(__name__)
 
 ModelProvider = Literal["openai", "bedrock", "auto"]
 
+try:
+    from openai import AuthenticationError
+except ImportError:
+    AuthenticationError = Exception  # Fallback if openai not available
+
+# Error-message classifiers; one case-insensitive search instead of lowercasing multi-KB error strings
+_THROTTLE_RE = re.compile(r"throttl|too many requests", re.IGNORECASE)
+_AUTH_RE = re.compile(r"401|expired|authentication", re.IGNORECASE)
+
+# Sends a formatted prompt to a specific LLM instance and returns the raw response
+Invoker = Callable[[str], Awaitable[Any]]
+
+
+def _is_auth_error(exc: BaseException) -> bool:
+    """Whether a Cisco/Azure error means the access token expired"""
+    return isinstance(exc, AuthenticationError) or bool(_AUTH_RE.search(str(exc)))
+
+
+def _azure_invoker(manager: "ModelManager", llm: AzureChatOpenAI, model_id: Optional[str], temperature: float) -> Invoker:
+    """AzureChatOpenAI (Cisco) - messages format, refresh the token and retry once on auth errors"""
+    # Add user parameter with appkey if configured (static, so resolved once per model)
+    invoke_kwargs = {"user": manager.CISCO_USER_JSON} if manager.CISCO_USER_JSON else {}
+    
+    async def invoke(formatted_prompt: str):
+        # Built once and reused if the request is retried with a refreshed token
+        messages = [HumanMessage(content=formatted_prompt)]
+        logger.info(f"Invoking AzureChatOpenAI (Cisco) with {len(messages)} message(s)")
+        try:
+            return await llm.ainvoke(messages, **invoke_kwargs)
+        except Exception as auth_error:
+            # Check if it's an authentication error (token expired)
+            if not _is_auth_error(auth_error):
+                logger.error(f"Azure/Cisco API error: {auth_error}", exc_info=True)
+                raise
+            
+            logger.warning("Cisco token expired during request, refreshing and retrying...")
+            # Refresh token (shared with any concurrent requests that hit the same expiry) and retry once
+            # Compare against the plain token the model was built with (the client field may be a SecretStr)
+            token = await manager.refresh_cisco_token(stale_token=getattr(llm, "_cisco_token", None))
+            if not token:
+                raise ValueError("Failed to refresh Cisco token after expiration")
+            # The openai client captures the key at construction, so get a model bound to the new token
+            retry_llm = manager.get_chat_model(model_id=model_id, temperature=temperature)
+            try:
+                return await retry_llm.ainvoke(messages, **invoke_kwargs)
+            except Exception as retry_error:
+                logger.error(f"Azure/Cisco API error on retry: {retry_error}", exc_info=True)
+                raise
+    return invoke
+
+
+BEDROCK_MAX_ATTEMPTS = 5
+BEDROCK_REGION_COOLDOWN = 30  # seconds a throttled region is skipped when other regions are configured
+
+
+def _is_throttling(exc: BaseException) -> bool:
+    """Whether a Bedrock error is a rate limit that is worth retrying"""
+    return bool(_THROTTLE_RE.search(str(exc)))
+
+
+def _log_bedrock_retry(retry_state: RetryCallState):
+    logger.warning(
+        f"Bedrock throttling detected (attempt {retry_state.attempt_number}/{BEDROCK_MAX_ATTEMPTS}). "
+        f"Retrying in {retry_state.next_action.sleep:.1f} seconds..."
+    )
+
+
+# Full jitter spreads out retries from concurrent requests that were throttled at the same moment
+@retry(
+    retry=retry_if_exception(_is_throttling),
+    wait=wait_exponential_jitter(initial=2, max=30),
+    stop=stop_after_attempt(BEDROCK_MAX_ATTEMPTS),
+    before_sleep=_log_bedrock_retry,
+    reraise=True
+)
+async def _call_bedrock(manager: "ModelManager", llm: Union[ChatBedrock, BedrockLLM], payload):
+    # Each attempt goes to a region that isn't cooling down from a recent throttle
+    target = manager._bedrock_model_for_attempt(llm)
+    try:
+        return await target.ainvoke(payload)
+    except Exception as e:
+        if _is_throttling(e):
+            manager._mark_bedrock_region_throttled(target.region_name)
+        raise
+
+
+async def _start_stream(stream) -> Tuple[Any, Any]:
+    """Open an astream and wait for its first chunk (None if it ends empty), so errors surface before anything is yielded"""
+    iterator = stream.__aiter__()
+    try:
+        return iterator, await iterator.__anext__()
+    except StopAsyncIteration:
+        return iterator, None
+
+
+# Same policy as _call_bedrock, applied up to the first streamed chunk
+@retry(
+    retry=retry_if_exception(_is_throttling),
+    wait=wait_exponential_jitter(initial=2, max=30),
+    stop=stop_after_attempt(BEDROCK_MAX_ATTEMPTS),
+    before_sleep=_log_bedrock_retry,
+    reraise=True
+)
+async def _start_bedrock_stream(manager: "ModelManager", llm: Union[ChatBedrock, BedrockLLM], payload) -> Tuple[Any, Any]:
+    target = manager._bedrock_model_for_attempt(llm)
+    try:
+        return await _start_stream(target.astream(payload))
+    except Exception as e:
+        if _is_throttling(e):
+            manager._mark_bedrock_region_throttled(target.region_name)
+        raise
+
+
+def _bedrock_invoker(manager: "ModelManager", llm: Union[ChatBedrock, BedrockLLM], use_messages: bool) -> Invoker:
+    """Bedrock - exponential backoff on throttling, clearer errors for bad model configuration"""
+    async def invoke(formatted_prompt: str):
+        # Built once and reused across the throttling retries in _call_bedrock
+        if use_messages:
+            # ChatBedrock - use messages format
+            payload = [HumanMessage(content=formatted_prompt)]
+            logger.info(f"Invoking ChatBedrock with {len(payload)} message(s)")
+        else:
+            # BedrockLLM (for models that don't support chat) - use string prompt
+            payload = formatted_prompt
+            logger.info("Invoking BedrockLLM with string prompt")
+        
+        try:
+            return await _call_bedrock(manager, llm, payload)
+        except Exception as bedrock_error:
+            error_str = str(bedrock_error)
+            
+            if use_messages:
+                # Log the actual error from Bedrock
+                logger.error(f"Bedrock API error: {bedrock_error}", exc_info=True)
+                
+                # Check if it's a response parsing error (NoneType subscriptable)
+                if "'NoneType' object is not subscriptable" in error_str or "outputs" in error_str.lower():
+                    error_msg = (
+                        f"Bedrock model returned an invalid response. This usually means:\n"
+                        f"1. The model ID format is incorrect (try using just 'model:version' instead of full ARN)\n"
+                        f"2. The model is not available in your AWS account or region\n"
+                        f"3. AWS credentials don't have Bedrock access permissions\n"
+                        f"4. The model request format is incompatible\n\n"
+                        f"Original error: {bedrock_error}\n\n"
+                        f"Try using a simple model ID format like 'mistral.mistral-large-2407-v1:0' "
+                        f"instead of an ARN, or verify the model is available in region {settings.AWS_REGION}."
+                    )
+                    logger.error(error_msg)
+                    raise ValueError(error_msg)
+            
+            # Handle throttling after max retries
+            if _is_throttling(bedrock_error):
+                error_msg = (
+                    f"AWS Bedrock rate limit exceeded. Please wait a moment and try again.\n\n"
+                    f"The system attempted {BEDROCK_MAX_ATTEMPTS} times with exponential backoff.\n"
+                    f"This usually happens when:\n"
+                    f"1. Too many requests are being made in a short time\n"
+                    f"2. Your AWS account has rate limits on Bedrock usage\n"
+                    f"3. Multiple users are using the system simultaneously\n\n"
+                    f"Please wait 30-60 seconds before trying again."
+                )
+                logger.error(error_msg)
+                raise ValueError(error_msg)
+            
+            raise
+    return invoke
+
+
+def _chat_openai_invoker(llm: ChatOpenAI) -> Invoker:
+    """Regular ChatOpenAI - use messages format"""
+    async def invoke(formatted_prompt: str):
+        messages = [HumanMessage(content=formatted_prompt)]
+        logger.info(f"Invoking ChatOpenAI with {len(messages)} message(s)")
+        return await llm.ainvoke(messages)
+    return invoke
+
+
+def _default_invoker(llm) -> Invoker:
+    """Other models can take the string prompt directly"""
+    async def invoke(formatted_prompt: str):
+        if hasattr(llm, "ainvoke"):
+            return await llm.ainvoke(formatted_prompt)
+        return await asyncio.to_thread(llm.invoke, formatted_prompt)
+    return invoke
+
+
+# Keyed by the concrete class (type(llm)), so AzureChatOpenAI doesn't fall through to ChatOpenAI
+_INVOKER_FACTORIES: Dict[type, Callable[..., Invoker]] = {
+    AzureChatOpenAI: _azure_invoker,
+    ChatBedrock: lambda manager, llm, model_id, temperature: _bedrock_invoker(manager, llm, use_messages=True),
+    BedrockLLM: lambda manager, llm, model_id, temperature: _bedrock_invoker(manager, llm, use_messages=False),
+    ChatOpenAI: lambda manager, llm, model_id, temperature: _chat_openai_invoker(llm),
+}
+
+
+def _make_invoker(manager: "ModelManager", llm, model_id: Optional[str], temperature: float) -> Invoker:
+    """Pick the message format and retry policy for this LLM once, when it is created"""
+    factory = _INVOKER_FACTORIES.get(type(llm))
+    if factory is None:
+        return _default_invoker(llm)
+    return factory(manager, llm, model_id, temperature)
+
+
+def _extract_deployment(endpoint: str) -> Optional[str]:
+    """Deployment name from an Azure-style endpoint URL
+    
+    Endpoint format: https://chat-ai.cisco.com/openai/deployments/gpt-4.1/chat/completions
+    Deployment name: gpt-4.1 (or gpt-4o-mini, etc.)
+    """
+    endpoint_parts = endpoint.split("/")
+    for i, part in enumerate(endpoint_parts):
+        if part == "deployments" and i + 1 < len(endpoint_parts):
+            return endpoint_parts[i + 1]
+    return None
+
+
 class ModelManager:
     """Manages multiple AI models from different providers"""
     
+    # `user` kwarg for Cisco requests; the appkey is static so serialize it once
+    CISCO_USER_JSON: Optional[str] = json.dumps({"appkey": settings.CISCO_APPKEY}) if settings.CISCO_APPKEY else None
+    # Explicit CISCO_DEPLOYMENT wins, otherwise parse it from the endpoint; both are static config
+    CISCO_DEPLOYMENT_RESOLVED: Optional[str] = settings.CISCO_DEPLOYMENT or _extract_deployment(settings.CISCO_ENDPOINT)
+    
     def __init__(self):
         self.bedrock_client = None
+        self._bedrock_clients: Dict[str, Any] = {}  # region -> shared bedrock-runtime client
+        # Regions Bedrock calls are round-robined over; a throttled region cools down while others take the load
+        self._bedrock_regions = [r.strip() for r in settings.AWS_BEDROCK_REGIONS.split(",") if r.strip()] or [settings.AWS_REGION]
+        self._bedrock_region_cycle = itertools.cycle(self._bedrock_regions)
+        self._bedrock_region_cooldown: Dict[str, float] = {}  # region -> time.monotonic() it may be used again
         self.cisco_access_token = None
         self.cisco_token_expires_at = None  # Track token expiration time
+        self._cisco_refresh_lock = asyncio.Lock()  # Only one coroutine refreshes an expired token
         self._initialize_bedrock()
         self._initialize_cisco()
         self.available_models = self._load_available_models()
@@ -27,12 +261,66 @@ class ModelManager:
         """Initialize AWS Bedrock client if credentials are available"""
         # Bedrock is now hidden, but keep initialization for fallback
         if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-            self.bedrock_client = boto3.client(
+            self.bedrock_client = self._get_bedrock_client(settings.AWS_REGION)
+    
+    def _get_bedrock_client(self, region: str):
+        """Shared bedrock-runtime client for a region
+        
+        Every ChatBedrock/BedrockLLM for the region reuses it, so model instances created per request
+        keep the pooled keep-alive connections instead of paying DNS/TLS/credential setup again.
+        """
+        client = self._bedrock_clients.get(region)
+        if client is None:
+            client = boto3.client(
                 'bedrock-runtime',
                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
+                region_name=region,
+                config=self._bedrock_client_config()
             )
+            self._bedrock_clients[region] = client
+        return client
+    
+    def _next_bedrock_region(self) -> str:
+        """Next configured Bedrock region in round-robin order, skipping regions that were just throttled"""
+        now = time.monotonic()
+        for _ in range(len(self._bedrock_regions)):
+            region = next(self._bedrock_region_cycle)
+            if self._bedrock_region_cooldown.get(region, 0) <= now:
+                return region
+        # Every region is cooling down - use the one that recovers first
+        return min(self._bedrock_regions, key=lambda r: self._bedrock_region_cooldown.get(r, 0))
+    
+    def _mark_bedrock_region_throttled(self, region: str):
+        self._bedrock_region_cooldown[region] = time.monotonic() + BEDROCK_REGION_COOLDOWN
+        if len(self._bedrock_regions) > 1:
+            logger.warning(f"Bedrock region {region} throttled, routing to other regions for {BEDROCK_REGION_COOLDOWN}s")
+    
+    def _bedrock_model_for_attempt(self, llm: Union[ChatBedrock, BedrockLLM]) -> Union[ChatBedrock, BedrockLLM]:
+        """The model itself, or the same model in another region if its region is cooling down"""
+        if self._bedrock_region_cooldown.get(llm.region_name, 0) <= time.monotonic():
+            return llm
+        region = self._next_bedrock_region()
+        if region == llm.region_name:
+            return llm
+        return type(llm)(
+            model_id=llm.model_id,
+            client=self._get_bedrock_client(region),
+            region_name=region,
+            model_kwargs=llm.model_kwargs
+        )
+    
+    @staticmethod
+    def _bedrock_client_config() -> Config:
+        """botocore config sized so concurrent ainvoke/abatch calls don't queue on the connection pool"""
+        return Config(
+            # Adaptive mode keeps its client-side rate limiting (token bucket), but botocore doesn't
+            # retry: _call_bedrock's tenacity policy is the only retry layer, so backoffs don't stack
+            retries={"mode": "adaptive", "total_max_attempts": 1},
+            # botocore's default pool holds 10 connections, which caps Bedrock fan-out well below TPS limits
+            max_pool_connections=settings.BEDROCK_MAX_PARALLEL,
+            tcp_keepalive=True
+        )
     
     def _initialize_cisco(self):
         """Initialize Cisco OpenAI endpoint access token"""
@@ -80,6 +368,27 @@ class ModelManager:
             self._initialize_cisco()
         return self.cisco_access_token
     
+    async def refresh_cisco_token(self, stale_token: Optional[str] = None) -> Optional[str]:
+        """Force a Cisco token refresh, shared by all coroutines that saw the same token fail"""
+        async with self._cisco_refresh_lock:
+            # Another request may already have refreshed it while we waited for the lock
+            if self.cisco_access_token and self.cisco_access_token != stale_token:
+                return self.cisco_access_token
+            await asyncio.to_thread(self._initialize_cisco)
+            return self.cisco_access_token
+    
+    async def run_cisco_token_refresher(self):
+        """Background task that refreshes the Cisco token shortly before it expires"""
+        if not (settings.CISCO_CLIENT_ID and settings.CISCO_CLIENT_SECRET):
+            return
+        while True:
+            # cisco_token_expires_at already includes a 5 minute safety buffer
+            delay = (self.cisco_token_expires_at or 0) - time.time()
+            await asyncio.sleep(max(delay, 60))
+            if time.time() >= (self.cisco_token_expires_at or 0):
+                logger.info("Proactively refreshing Cisco token before expiry")
+                await self.refresh_cisco_token(stale_token=self.cisco_access_token)
+    
     def _load_available_models(self) -> List[Dict]:
         """Load all available models from configuration - Only Cisco GPT-4.1 for RAG/chat"""
         models = []
@@ -97,7 +406,45 @@ class ModelManager:
         return models
     
     def get_chat_model(self, model_id: Optional[str] = None, temperature: float = 0) -> Union[ChatOpenAI, AzureChatOpenAI, ChatBedrock, BedrockLLM]:
-        """Get a chat model instance"""
+        """Get a chat model instance
+        
+        The model carries an `_invoker` coroutine (see _make_invoker) that sends a formatted
+        prompt with the right message format and retry policy for its class.
+        """
+        llm = self._create_chat_model(model_id=model_id, temperature=temperature)
+        # LangChain models are pydantic objects that reject unknown attributes, so bypass __setattr__
+        object.__setattr__(llm, "_invoker", _make_invoker(self, llm, model_id, temperature))
+        return llm
+    
+    async def astream(self, llm, messages, model_id: Optional[str] = None, temperature: float = 0, **invoke_kwargs) -> AsyncIterator[Any]:
+        """Stream llm's reply with the retry policy its _invoker uses for one-shot calls
+        
+        Throttling backoff/region failover (Bedrock) and token refresh (Cisco) only apply before
+        the first chunk: text already yielded can't be taken back.
+        """
+        if isinstance(llm, (ChatBedrock, BedrockLLM)):
+            stream, first = await _start_bedrock_stream(self, llm, messages)
+        else:
+            try:
+                stream, first = await _start_stream(llm.astream(messages, **invoke_kwargs))
+            except Exception as e:
+                if not (isinstance(llm, AzureChatOpenAI) and _is_auth_error(e)):
+                    raise
+                logger.warning("Cisco token expired before streaming, refreshing and retrying...")
+                token = await self.refresh_cisco_token(stale_token=getattr(llm, "_cisco_token", None))
+                if not token:
+                    raise ValueError("Failed to refresh Cisco token after expiration")
+                # The openai client captures the key at construction, so get a model bound to the new token
+                llm = self.get_chat_model(model_id=model_id, temperature=temperature)
+                stream, first = await _start_stream(llm.astream(messages, **invoke_kwargs))
+        if first is None:
+            return
+        yield first
+        async for chunk in stream:
+            yield chunk
+    
+    def _create_chat_model(self, model_id: Optional[str] = None, temperature: float = 0) -> Union[ChatOpenAI, AzureChatOpenAI, ChatBedrock, BedrockLLM]:
+        """Create the chat model instance for model_id"""
         # If no model_id or "auto", default to cisco-gpt-4.1
         if model_id == "auto" or not model_id:
             model_id = "cisco-gpt-4.1"
@@ -118,24 +465,9 @@ class ModelManager:
             if not token:
                 raise ValueError("Failed to obtain Cisco access token. Check CISCO_CLIENT_ID and CISCO_CLIENT_SECRET.")
             
-            # Extract deployment name from endpoint or use configured override
-            # Endpoint format: https://chat-ai.cisco.com/openai/deployments/gpt-4.1/chat/completions
-            # Deployment name: gpt-4.1 (or gpt-4o-mini, etc.)
-            if settings.CISCO_DEPLOYMENT:
-                # Use explicitly configured deployment name
-                deployment_name = settings.CISCO_DEPLOYMENT
-            else:
-                # Extract from endpoint URL
-                endpoint_parts = settings.CISCO_ENDPOINT.split("/")
-                deployment_name = None
-                for i, part in enumerate(endpoint_parts):
-                    if part == "deployments" and i + 1 < len(endpoint_parts):
-                        deployment_name = endpoint_parts[i + 1]
-                        break
-                
-                if not deployment_name:
-                    # Fallback: use model_identifier or default to gpt-4.1
-                    deployment_name = model_identifier if model_identifier else "gpt-4.1"
+            # Configured override or the name parsed from CISCO_ENDPOINT (resolved once at import)
+            # Fallback: use model_identifier or default to gpt-4.1
+            deployment_name = self.CISCO_DEPLOYMENT_RESOLVED or model_identifier or "gpt-4.1"
             
             import logging
             logger = logging.getLogger(__name__)
@@ -146,13 +478,16 @@ class ModelManager:
             azure_endpoint = "https://chat-ai.cisco.com"
             api_version = "2024-08-01-preview"
             
-            return AzureChatOpenAI(
+            llm = AzureChatOpenAI(
                 azure_endpoint=azure_endpoint,
                 azure_deployment=deployment_name,
                 openai_api_key=token,  # This will be used as api-key header
                 openai_api_version=api_version,
                 temperature=temperature
             )
+            # Remember the token this model was built with so an auth failure can tell whether it's stale
+            object.__setattr__(llm, "_cisco_token", token)
+            return llm
         elif provider == "openai":
             return ChatOpenAI(
                 model_name=model_identifier,
@@ -182,7 +517,8 @@ class ModelManager:
                     use_region = settings.AWS_REGION
             else:
                 actual_model_id = model_identifier
-                use_region = settings.AWS_REGION
+                # Spread load across AWS_BEDROCK_REGIONS (just AWS_REGION when unset)
+                use_region = self._next_bedrock_region()
             
             # Remove region prefixes like "us.", "eu.", etc. from model ID
             # Format might be: us.meta.llama3-1-8b-instruct-v1:0
@@ -206,16 +542,8 @@ class ModelManager:
                 import logging
                 logger = logging.getLogger(__name__)
                 
-                # Create bedrock client with correct region if needed
-                if use_region != settings.AWS_REGION:
-                    bedrock_client = boto3.client(
-                        'bedrock-runtime',
-                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                        region_name=use_region
-                    )
-                else:
-                    bedrock_client = self.bedrock_client
+                # Reuse the pooled client for the model's region (created on first use)
+                bedrock_client = self._get_bedrock_client(use_region)
                 
                 # Use LLM interface for models that don't support chat
                 if requires_llm:
@@ -4,10 +4,9 @@ Has its own configuration, parameters, and LLM settings
 """
 import logging
 import asyncio
-import json
 from typing import Dict, Any, Optional, Tuple
 from app.services.model_manager import model_manager
-from app.core.config import settings
+from app.services._llm_utils import extract_text
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +66,7 @@ class PodcastService:
             response = await self._invoke_llm(llm, dialogue_prompt)
             
             # Extract and validate dialogue
-            dialogue = self._extract_response(response)
+            dialogue = extract_text(response)
             dialogue = self._validate_dialogue_format(dialogue)
             
             logger.info(f"PodcastService: Generated script ({len(dialogue)} characters)")
@@ -140,9 +139,8 @@ Now create an engaging, intelligent podcast dialogue that transforms this inform
         invoke_kwargs = {}
         
         # Add Cisco appkey if needed
-        if isinstance(llm, AzureChatOpenAI) and settings.CISCO_APPKEY:
-            user_data = {"appkey": settings.CISCO_APPKEY}
-            invoke_kwargs["user"] = json.dumps(user_data)
+        if isinstance(llm, AzureChatOpenAI) and model_manager.CISCO_USER_JSON:
+            invoke_kwargs["user"] = model_manager.CISCO_USER_JSON
         
         # Set max_tokens using this service's configuration
         max_tokens_value = self.config.MAX_TOKENS
@@ -184,15 +182,6 @@ Now create an engaging, intelligent podcast dialogue that transforms this inform
         
         return response
     
-    def _extract_response(self, response) -> str:
-        """Extract text from LLM response"""
-        if hasattr(response, 'content'):
-            return response.content
-        elif isinstance(response, str):
-            return response
-        else:
-            return str(response)
-    
     def _validate_dialogue_format(self, dialogue: str) -> str:
         """Validate and fix dialogue format issues"""
         if not dialogue:
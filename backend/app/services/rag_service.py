@@ -1,16 +1,26 @@
 import os
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
 
 # Disable ChromaDB telemetry warnings BEFORE any chromadb imports
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
 os.environ["CHROMA_CLIENT_TELEMETRY"] = "False"
 os.environ["CHROMA_TELEMETRY"] = "False"
 
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, AsyncIterator, List, Dict, Optional, Set, Tuple
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
 from langchain.prompts import PromptTemplate
 from app.core.config import settings
 from app.services.model_manager import model_manager
+from app.services._llm_utils import extract_text
 
 import chromadb
 
@@ -22,29 +32,377 @@ chromadb_telemetry_logger.disabled = True
 chromadb_logger = logging.getLogger("chromadb.telemetry")
 chromadb_logger.setLevel(logging.CRITICAL)
 chromadb_logger.disabled = True
-try:
-    from openai import AuthenticationError
-except ImportError:
-    AuthenticationError = Exception  # Fallback if openai not available
-
 # Import LLM types for isinstance checks
 try:
-    from langchain_openai import ChatOpenAI, AzureChatOpenAI
+    from langchain_openai import AzureChatOpenAI
 except ImportError:
-    ChatOpenAI = None
     AzureChatOpenAI = None
 
+# Optional FAISS read path (see RAGService._build_faiss_index)
 try:
-    from langchain_aws import ChatBedrock, BedrockLLM
+    import faiss
+    import numpy as np
 except ImportError:
-    ChatBedrock = None
-    BedrockLLM = None
+    faiss = None
+    np = None
+
+# STRICT: No RAG context = No answer (don't use training data)
+NO_CONTEXT_ANSWER = "I cannot find this information in the uploaded documents. The RAG system (Retrieval-Augmented Generation) is my only source of truth, and I do not have access to this information in the uploaded documents. Please upload relevant documents or rephrase your question."
+
+# Below this many vectors Chroma's HNSW index is fast enough and IVF-PQ can't be trained well
+FAISS_MIN_VECTORS = 10000
+
+# Answers for repeated (model, question, context) triples, so re-asked questions skip the LLM.
+# Bounded LRU with a TTL so re-uploaded documents or prompt changes age out within the hour.
+ANSWER_CACHE_MAXSIZE = 1000
+ANSWER_CACHE_TTL = 3600  # seconds
+_ANSWER_CACHE: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+
+
+def _answer_cache_key(model_id: Optional[str], question: str, context: str) -> bytes:
+    return hashlib.blake2b(f"{model_id or 'auto'}||{question}||{context}".encode(), digest_size=16).digest()
+
+
+def _answer_cache_get(key: bytes) -> Optional[str]:
+    entry = _ANSWER_CACHE.get(key)
+    if entry is None:
+        return None
+    stored_at, answer = entry
+    if time.monotonic() - stored_at > ANSWER_CACHE_TTL:
+        del _ANSWER_CACHE[key]
+        return None
+    _ANSWER_CACHE.move_to_end(key)
+    return answer
+
+
+def _answer_cache_put(key: bytes, answer: str):
+    _ANSWER_CACHE[key] = (time.monotonic(), answer)
+    _ANSWER_CACHE.move_to_end(key)
+    if len(_ANSWER_CACHE) > ANSWER_CACHE_MAXSIZE:
+        _ANSWER_CACHE.popitem(last=False)
+
+# PROACTIVE RAG PROMPT: Extract and present information directly.
+# Parsed once at import; query() only fills in the variables.
+RAG_PROMPT_TEMPLATE = """You are an AI assistant for GSSO AI Center. Your role is to be extremely helpful by extracting, synthesizing, and presenting information directly from the uploaded documents.
+
+CRITICAL INSTRUCTIONS:
+1. **USE CONVERSATION HISTORY**: If the user refers to "it", "this", "that", or uses pronouns, look at the previous conversation to understand what they're referring to. For example:
+   - If they previously asked "What is Cloud Edge?" and now say "save it as doc", "it" refers to the previous answer about Cloud Edge
+   - If they say "create a podcast about this", "this" refers to the topic discussed in previous messages
+   - Always check the conversation history to resolve references and pronouns
+
+2. **EXTRACT AND PRESENT DIRECTLY**: Your primary goal is to extract key information from the documents and present it directly to the user. Do NOT just tell them to "refer to this document" - actually provide the information they need.
+
+3. **BE COMPREHENSIVE**: Dig deep into the context provided. Extract all relevant information, key points, features, benefits, and details. Synthesize information from multiple document sections when relevant.
+
+4. **BE HELPFUL AND PROACTIVE**: 
+   - If the user asks about a topic, provide a complete, detailed answer based on the documents
+   - Include all relevant details, not just a summary
+   - Extract specific examples, numbers, features, and technical details
+   - If creating content (like speeches, summaries, presentations), include ALL key points from the documents
+   - If the user asks to "save as doc", "save as PDF", "save it as doc", "save it as PDF", or similar:
+     * First, identify what "it" or "this" refers to by checking the conversation history
+     * Acknowledge that you understand they want to save the previous answer/content
+     * Provide the content in a format ready for document generation
+     * Mention that they can use the document generation feature to create the file
+
+5. **SYNTHESIZE INFORMATION**: Combine information from multiple document sections to provide comprehensive answers. Don't just cite sources - actually extract and present the information.
+
+6. **USE ONLY DOCUMENT CONTEXT**: Base your answer ONLY on the information provided in the "Context from documents" section below. Do not use general knowledge or training data.
+
+7. **CITE SOURCES AT THE END**: After providing a comprehensive answer, you may include a brief note about which documents the information came from, but do NOT use citations as a way to avoid providing information.
+
+8. **IF INFORMATION IS MISSING**: Only if the context truly doesn't contain relevant information, then state that. But first, make sure you've thoroughly searched the context for any related information.
+
+{history_context}
+
+Context from documents (extract and synthesize information from this):
+{context}
+
+Current Question: {question}
+
+IMPORTANT: Before answering, check if the question contains pronouns or references like "it", "this", "that". If so, refer to the conversation history above to understand what the user is referring to. Then provide a comprehensive, detailed answer by extracting and presenting all relevant information directly from the documents above. Be thorough and helpful:"""
+
+RAG_PROMPT = PromptTemplate(
+    template=RAG_PROMPT_TEMPLATE,
+    input_variables=["context", "question", "history_context"]
+)
+
+# Words ignored by the answer/context overlap heuristic in query()
+COMMON_WORDS = frozenset({
+    'the', 'and', 'but', 'for', 'with', 'are', 'was', 'were', 'been', 'have', 'has', 'had',
+    'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that',
+    'these', 'those', 'you', 'she', 'they'
+})
+# Tokens of 3+ letters; shorter words are never meaningful for the overlap check
+_TOKEN_RE = re.compile(r"[a-z]{3,}")
+
+
+def _word_set(text: str) -> frozenset:
+    """Distinct meaningful lowercase words in text"""
+    return frozenset(_TOKEN_RE.findall(text.lower())) - COMMON_WORDS
+
+
+def _check_context_overlap(answer: str, context: str):
+    """Log a warning when an answer shares almost no words with the RAG context
+    
+    Minimal overlap suggests the model answered from general knowledge instead of the documents.
+    The answer isn't modified, this is only for monitoring.
+    """
+    # The heuristic is only meaningful for long answers over a substantial context
+    if len(answer) < 200 or len(context) < 500:
+        return
+    answer_unique_words = _word_set(answer)
+    if len(answer_unique_words) <= 5:
+        return
+    # Context (the larger text) is only tokenized once the answer qualifies
+    context_unique_words = _word_set(context)
+    
+    # If there's minimal overlap, the answer might not be based on context
+    overlap = len(context_unique_words & answer_unique_words)
+    if len(context_unique_words) > 0 and overlap < 2:
+        logging.getLogger(__name__).warning(f"Answer may not be based on RAG context. Overlap: {overlap}/{len(context_unique_words)} unique words")
+
+
+def _sources_payload(context_docs: List[Dict]) -> List[Dict]:
+    """Source snippets returned alongside an answer (top 5 chunks, content truncated)
+    
+    Metadata keys starting with "_" are internal search keys (see add_document) and are left out.
+    """
+    return [
+        {
+            "content": doc["content"][:200],
+            "metadata": {key: value for key, value in doc["metadata"].items() if not key.startswith("_")}
+        }
+        for doc in context_docs[:5]
+    ]
+
+
+class SplitThenMergeSplitter(RecursiveCharacterTextSplitter):
+    """Recursive splitter that merges undersized neighbouring chunks and re-splits oversized ones
+    
+    The recursive split can leave tiny, context-poor fragments (a lone heading, the tail of a
+    section) that waste retrieval slots and embedding calls. After the normal split, adjacent
+    chunks whose combined length stays under `merge_size` are folded together (the shared
+    overlap is kept once), and any chunk longer than `max_size` is split again.
+    """
+    
+    def __init__(self, merge_size: int = 1150, max_size: int = 1100, **kwargs):
+        super().__init__(**kwargs)
+        self._merge_size = merge_size
+        self._max_size = max_size
+    
+    def _merge_pair(self, first: str, second: str) -> str:
+        """Join two adjacent chunks, dropping the overlap they share"""
+        for size in range(min(self._chunk_overlap, len(first), len(second)), 0, -1):
+            if first.endswith(second[:size]):
+                return first + second[size:]
+        return f"{first}\n{second}"
+    
+    def split_text(self, text: str) -> List[str]:
+        merged = []
+        for chunk in super().split_text(text):
+            if merged and len(merged[-1]) + len(chunk) < self._merge_size:
+                merged[-1] = self._merge_pair(merged[-1], chunk)
+            else:
+                merged.append(chunk)
+        
+        chunks = []
+        for chunk in merged:
+            if len(chunk) > self._max_size:
+                chunks.extend(super().split_text(chunk))
+            else:
+                chunks.append(chunk)
+        return chunks
+
+
+def _score_and_diversify(candidates: List[Tuple[Any, float]], query_terms: Set[str], limit: int, boosted_docs_set: Optional[Set] = None) -> Tuple[List[Dict], int]:
+    """Boost, deduplicate and diversify raw similarity results
+    
+    Returns the top `limit` chunks and the number of distinct documents they came from.
+    """
+    logger = logging.getLogger(__name__)
+    
+    # Remove duplicates and apply document-level relevance boosting
+    seen_ids = set()
+    unique_results = []
+    
+    for doc, score in candidates:
+        doc_id = doc.metadata.get('document_id')
+        chunk_id = f"{doc_id}_{doc.page_content[:50]}"  # Use content hash for uniqueness
+        if chunk_id not in seen_ids:
+            seen_ids.add(chunk_id)
+            
+            # DOCUMENT-LEVEL RELEVANCE BOOSTING
+            # If query terms match document filename/title/tags, boost this chunk's relevance
+            # Lowercased copies are stored at add time; older chunks fall back to lowering here
+            metadata = doc.metadata
+            filename = metadata.get('_filename_lc')
+            if filename is None:
+                filename = (metadata.get('filename') or '').lower()
+            title = metadata.get('_title_lc')
+            if title is None:
+                title = (metadata.get('title') or '').lower()
+            tags = metadata.get('_tag_tokens_lc')
+            if tags is None:
+                tags = ','.join(tag.strip() for tag in (metadata.get('tags') or '').lower().split(','))
+            
+            # Check if query terms appear in document name
+            filename_match_score = 0.0
+            if filename:
+                # Count how many query terms appear in filename
+                matching_terms = sum(1 for term in query_terms if term in filename)
+                if matching_terms > 0:
+                    # Strong boost: reduce score (lower = better) by up to 0.4 for strong matches
+                    # This ensures documents with matching names rank much higher
+                    match_ratio = matching_terms / max(len(query_terms), 1)
+                    if match_ratio >= 0.5:  # 50%+ of terms match
+                        filename_match_score = -0.4  # Strong boost
+                    else:
+                        filename_match_score = -0.25 * match_ratio  # Moderate boost
+                
+                # Also check for phrase matches (e.g., "ai protection" in "ai model protection")
+                filename_words = set(filename.split())
+                if len(query_terms) >= 2 and all(term in filename_words for term in query_terms):
+                    # All query terms are in filename - very strong boost
+                    filename_match_score = -0.5
+            
+            title_match_score = 0.0
+            if title:
+                matching_terms = sum(1 for term in query_terms if term in title)
+                if matching_terms > 0:
+                    match_ratio = matching_terms / max(len(query_terms), 1)
+                    if match_ratio >= 0.5:
+                        title_match_score = -0.35  # Strong boost
+                    else:
+                        title_match_score = -0.2 * match_ratio
+                
+                # Phrase match in title
+                title_words = set(title.split())
+                if len(query_terms) >= 2 and all(term in title_words for term in query_terms):
+                    title_match_score = -0.45
+            
+            # TAG MATCHING - Boost documents with matching tags
+            tag_match_score = 0.0
+            if tags:
+                # Split tags (comma-separated)
+                tag_list = tags.split(',')
+                matching_tags = sum(1 for term in query_terms if any(term in tag for tag in tag_list))
+                if matching_tags > 0:
+                    # Tags are important metadata - give good boost
+                    match_ratio = matching_tags / max(len(query_terms), 1)
+                    if match_ratio >= 0.5:
+                        tag_match_score = -0.3  # Strong boost for tag matches
+                    else:
+                        tag_match_score = -0.15 * match_ratio
+            
+            # Apply boosting (subtract from score since lower = better)
+            boosted_score = score + filename_match_score + title_match_score + tag_match_score
+            
+            unique_results.append((doc, boosted_score, score))  # Keep original score for logging
+    
+    # Sort by boosted score (lower distance = better match)
+    unique_results.sort(key=lambda x: x[1])
+    
+    # Results are already permission-filtered by Chroma; just shape them
+    permission_filtered = [
+        {
+            "content": doc.page_content,
+            "score": boosted_score,  # Use boosted score for ranking
+            "original_score": original_score,  # Keep original for logging
+            "metadata": doc.metadata
+        }
+        for doc, boosted_score, original_score in unique_results
+    ]
+    
+    # PRIORITIZE BOOSTED DOCUMENTS: Documents with matching names should come first
+    # Also prioritize documents used in previous conversation messages
+    # Group by document and identify boosted documents
+    document_chunks = {}  # {document_id: [chunks]}
+    boosted_documents = set()  # Track which documents got boosted
+    conversation_relevant_docs = boosted_docs_set or frozenset()  # Documents used in previous messages
+    
+    if conversation_relevant_docs:
+        logger.info(f"Prioritizing {len(conversation_relevant_docs)} documents from previous conversation context")
+    
+    for result in permission_filtered:
+        doc_id = result["metadata"].get("document_id")
+        if doc_id not in document_chunks:
+            document_chunks[doc_id] = []
+        document_chunks[doc_id].append(result)
+        
+        # Check if this document was boosted (original_score > score means boost was applied)
+        original = result.get("original_score", result["score"])
+        if original - result["score"] > 0.01:  # Boost was applied
+            boosted_documents.add(doc_id)
+        
+        # Apply additional boost for documents used in previous conversation
+        if doc_id in conversation_relevant_docs:
+            # Boost chunks from previously used documents
+            result["score"] = result["score"] - 0.3  # Strong boost for conversation continuity
+            boosted_documents.add(doc_id)  # Treat as boosted
+            logger.debug(f"Boosting document {doc_id} (used in previous conversation)")
+    
+    filtered_results = []
+    
+    # FIRST PRIORITY: Take top chunks from boosted documents (documents with matching names)
+    boosted_chunks = []
+    for doc_id in boosted_documents:
+        chunks = document_chunks[doc_id]
+        chunks.sort(key=lambda x: x["score"])  # Sort by boosted score
+        boosted_chunks.extend(chunks)
+    
+    # Sort all boosted chunks by score and add them first
+    boosted_chunks.sort(key=lambda x: x["score"])
+    for chunk in boosted_chunks:
+        if len(filtered_results) < limit:
+            filtered_results.append(chunk)
+    
+    # SECOND PRIORITY: Diversify across remaining documents (non-boosted)
+    non_boosted_docs = [doc_id for doc_id in document_chunks.keys() if doc_id not in boosted_documents]
+    if non_boosted_docs and len(filtered_results) < limit:
+        chunks_per_doc = max(1, (limit - len(filtered_results)) // max(len(non_boosted_docs), 1))
+        
+        for doc_id in non_boosted_docs:
+            chunks = document_chunks[doc_id]
+            chunks.sort(key=lambda x: x["score"])
+            for chunk in chunks[:chunks_per_doc]:
+                if len(filtered_results) < limit:
+                    filtered_results.append(chunk)
+    
+    # THIRD PRIORITY: Fill remaining slots with best chunks across all documents
+    if len(filtered_results) < limit:
+        remaining_chunks = []
+        added_content = {r["content"][:50] for r in filtered_results}
+        
+        for doc_id, chunks in document_chunks.items():
+            for chunk in chunks:
+                if chunk["content"][:50] not in added_content:
+                    remaining_chunks.append(chunk)
+        
+        remaining_chunks.sort(key=lambda x: x["score"])
+        for chunk in remaining_chunks:
+            if len(filtered_results) < limit:
+                filtered_results.append(chunk)
+    
+    # Final sort by score to ensure best matches are first
+    filtered_results.sort(key=lambda x: x["score"])
+    
+    return filtered_results, len(document_chunks)
+
 
 class RAGService:
     def __init__(self):
         self.embeddings = None
+        self._embed_query = None  # LRU-cached embeddings.embed_query
         self.vector_store = None
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self._faiss_index = None
+        self._faiss_docs = []  # FAISS id -> (text, metadata), None once deleted
+        # Searches run in worker threads while add/delete change the index and _faiss_docs
+        self._faiss_lock = threading.Lock()
+        # Caps LLM calls in flight across all requests and batches so bursts stay under account TPS limits
+        self._llm_semaphore = asyncio.Semaphore(settings.BEDROCK_MAX_PARALLEL)
+        self.text_splitter = SplitThenMergeSplitter(
             chunk_size=1000,
             chunk_overlap=200
         )
@@ -55,6 +413,9 @@ class RAGService:
         """Initialize embeddings model - Only OpenAI embeddings"""
         try:
             self.embeddings = model_manager.get_embedding_model()
+            # The same query strings (and their normalized/hyphenated variants) repeat
+            # across searches, so keep recent query embeddings instead of re-embedding
+            self._embed_query = lru_cache(maxsize=1024)(self.embeddings.embed_query)
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
@@ -71,6 +432,57 @@ class RAGService:
             persist_directory=settings.VECTOR_DB_PATH,
             embedding_function=self.embeddings
         )
+        
+        if settings.FAISS_INDEX_PATH:
+            if faiss is None:
+                logging.getLogger(__name__).warning("FAISS_INDEX_PATH is set but faiss is not installed; using Chroma for search")
+            else:
+                try:
+                    self._build_faiss_index()
+                except Exception as e:
+                    logging.getLogger(__name__).warning(f"Could not build FAISS index, using Chroma for search: {e}", exc_info=True)
+                    self._faiss_index = None
+                    self._faiss_docs = []
+    
+    def _build_faiss_index(self):
+        """Load (or build) the IVF-PQ FAISS index used for the read path
+        
+        The index is memory-mapped from FAISS_INDEX_PATH when it still matches the Chroma
+        collection, otherwise it is trained on the stored vectors and written back. Writes keep
+        going to Chroma and add_document appends new chunks to the in-memory index as well.
+        """
+        logger = logging.getLogger(__name__)
+        
+        collection = self.vector_store._collection
+        # One get so documents, metadatas and embeddings are guaranteed to line up with ids
+        stored = collection.get(include=["documents", "metadatas", "embeddings"])
+        ids = stored["ids"]
+        if len(ids) < FAISS_MIN_VECTORS:
+            logger.info(f"Only {len(ids)} vectors stored, using Chroma for search")
+            return
+        
+        ids_path = f"{settings.FAISS_INDEX_PATH}.ids.json"
+        if os.path.exists(settings.FAISS_INDEX_PATH) and os.path.exists(ids_path):
+            with open(ids_path) as f:
+                saved_ids = json.load(f)
+            if saved_ids == ids:
+                self._faiss_index = faiss.read_index(settings.FAISS_INDEX_PATH, faiss.IO_FLAG_MMAP)
+        
+        if self._faiss_index is None:
+            logger.info(f"Building FAISS IVF-PQ index for {len(ids)} vectors...")
+            vectors = np.asarray(stored["embeddings"], dtype="float32")
+            nlist = min(4096, len(ids) // 39)  # FAISS wants ~39 training points per list
+            index = faiss.index_factory(vectors.shape[1], f"IVF{nlist},PQ32", faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.add(vectors)
+            faiss.write_index(index, settings.FAISS_INDEX_PATH)
+            with open(ids_path, "w") as f:
+                json.dump(ids, f)
+            self._faiss_index = index
+        
+        self._faiss_index.nprobe = 16
+        self._faiss_docs = list(zip(stored["documents"], stored["metadatas"]))
+        logger.info(f"FAISS read path enabled with {len(self._faiss_docs)} vectors")
     
     def add_document(self, text: str, metadata: Dict) -> List[str]:
         """Add a document to the vector store and return chunk IDs"""
@@ -92,6 +504,12 @@ class RAGService:
                 logger.warning("No text chunks created, using empty text")
                 texts = [" "]
             
+            # Store lowercased filename/title/tags once so search() doesn't re-lower them per query
+            metadata = dict(metadata)
+            metadata["_filename_lc"] = (metadata.get("filename") or "").lower()
+            metadata["_title_lc"] = (metadata.get("title") or "").lower()
+            metadata["_tag_tokens_lc"] = ",".join(t.strip().lower() for t in (metadata.get("tags") or "").split(","))
+            
             metadatas = [metadata for _ in texts]
             ids = [f"{metadata['document_id']}_{i}" for i in range(len(texts))]
             
@@ -102,11 +520,41 @@ class RAGService:
                 ids=ids
             )
             logger.info(f"Successfully added {len(ids)} chunks to vector store")
+            if self._faiss_index is not None:
+                self._add_to_faiss_index(ids, texts, metadatas)
             return ids
         except Exception as e:
             logger.error(f"Error adding document to vector store: {e}", exc_info=True)
             raise
     
+    def _add_to_faiss_index(self, ids: List[str], texts: List[str], metadatas: List[Dict]):
+        """Append freshly stored chunks to the FAISS read path so they are searchable right away
+        
+        If the index can't take them (e.g. it is memory-mapped read-only), FAISS is dropped and
+        searches go back to Chroma, which always has every chunk.
+        """
+        logger = logging.getLogger(__name__)
+        try:
+            # Reuse the embeddings Chroma just computed; get() doesn't promise to keep the ids order
+            stored = self.vector_store._collection.get(ids=ids, include=["embeddings"])
+            by_id = dict(zip(stored["ids"], stored["embeddings"]))
+            vectors = np.asarray([by_id[chunk_id] for chunk_id in ids], dtype="float32")
+            with self._faiss_lock:
+                if self._faiss_index is None:
+                    return
+                try:
+                    self._faiss_index.add(vectors)
+                    self._faiss_docs.extend(zip(texts, metadatas))
+                except Exception:
+                    self._faiss_index = None
+                    self._faiss_docs = []
+                    raise
+        except Exception as e:
+            logger.warning(f"Could not add chunks to the FAISS index, using Chroma for search: {e}", exc_info=True)
+            with self._faiss_lock:
+                self._faiss_index = None
+                self._faiss_docs = []
+    
     def delete_document(self, document_id: int):
         """Delete all chunks for a document"""
         # Get all IDs for this document
@@ -114,8 +562,66 @@ class RAGService:
         results = collection.get(where={"document_id": document_id})
         if results and results.get("ids"):
             collection.delete(ids=results["ids"])
+        
+        # FAISS can't cheaply remove PQ-encoded vectors; hide them until the next rebuild
+        with self._faiss_lock:
+            for i, entry in enumerate(self._faiss_docs):
+                if entry is not None and entry[1].get("document_id") == document_id:
+                    self._faiss_docs[i] = None
+    
+    @staticmethod
+    def _access_filter(user_role: str) -> Dict:
+        """Build a Chroma metadata filter that mirrors the document access rules"""
+        # Chroma can't substring-match metadata values, so documents shared with
+        # several roles are covered by the exact-role clause or the owner clause
+        return {
+            "$or": [
+                {"is_public": True},
+                {"allowed_roles": user_role},
+                {"owner_id": {"$gt": 0}},  # Owner always has access (will be checked at API level)
+            ]
+        }
     
-    def search(self, query: str, user_role: str, limit: int = 10, previously_used_docs: Optional[set] = None) -> List[Dict]:
+    @staticmethod
+    def _has_access(metadata: Dict, user_role: str) -> bool:
+        """Python equivalent of _access_filter for results that don't come from Chroma"""
+        return bool(
+            metadata.get("is_public", False) or
+            user_role in (metadata.get("allowed_roles", "") or "").split(",") or
+            metadata.get("owner_id")  # Owner always has access (will be checked at API level)
+        )
+    
+    def _similarity_search(self, embedding: List[float], k: int, user_role: str) -> List[Tuple[Any, float]]:
+        """Similarity search by query embedding (returns (doc, distance) pairs)"""
+        # The index and _faiss_docs are read under the lock so a concurrent add/delete/reset
+        # can't leave them out of step mid-search (FAISS add and search aren't safe together)
+        with self._faiss_lock:
+            index = self._faiss_index
+            if index is not None:
+                # FAISS has no metadata filtering, so over-fetch and check permissions here
+                scores, positions = index.search(np.asarray([embedding], dtype="float32"), k * 4)
+                docs = self._faiss_docs
+                entries = [
+                    (score, docs[position]) for score, position in zip(scores[0], positions[0])
+                    if 0 <= position < len(docs)
+                ]
+        if index is None:
+            return self.vector_store.similarity_search_by_vector_with_relevance_scores(
+                embedding, k=k, filter=self._access_filter(user_role)
+            )
+        
+        from langchain.schema import Document
+        results = []
+        for score, entry in entries:
+            if entry is None or not self._has_access(entry[1], user_role):
+                continue
+            # OpenAI embeddings are unit length, so squared L2 (Chroma's distance) = 2 - 2 * inner product
+            results.append((Document(page_content=entry[0], metadata=entry[1]), 2.0 - 2.0 * float(score)))
+            if len(results) == k:
+                break
+        return results
+    
+    def search(self, query: str, user_role: str, limit: int = 10, previously_used_docs: Optional[frozenset] = None) -> List[Dict]:
         """Search for relevant documents based on query and user permissions"""
         import logging
         logger = logging.getLogger(__name__)
@@ -127,16 +633,19 @@ class RAGService:
         # Also try with hyphens
         hyphenated_query = query.lower().replace(" ", "-")
         
-        # Expand search to get more results, then filter
-        # Use a larger k value to ensure we get enough results after filtering
-        search_k = limit * 4  # Search for 4x the limit to account for filtering
+        # Permissions are enforced inside the vector search, so every returned chunk is
+        # usable and there's no need to over-fetch to make up for filtered-out results
+        search_k = limit
+        # Bind hot-path callables once; each strategy below embeds and searches
+        embed_query = self._embed_query
+        similarity_search = self._similarity_search
         
         # Try multiple search strategies for better retrieval
         all_results = []
         
         # Strategy 1: Direct similarity search with original query
         try:
-            results = self.vector_store.similarity_search_with_score(query, k=search_k)
+            results = similarity_search(embed_query(query), k=search_k, user_role=user_role)
             all_results.extend([(doc, score) for doc, score in results])
         except Exception as e:
             logger.warning(f"Similarity search failed: {e}")
@@ -144,7 +653,7 @@ class RAGService:
         # Strategy 2: Search with normalized query (spaces instead of hyphens)
         if normalized_query != query.lower():
             try:
-                results = self.vector_store.similarity_search_with_score(normalized_query, k=search_k)
+                results = similarity_search(embed_query(normalized_query), k=search_k, user_role=user_role)
                 all_results.extend([(doc, score * 0.95) for doc, score in results])  # Slightly lower weight
             except Exception as e:
                 logger.debug(f"Normalized query search failed: {e}")
@@ -152,7 +661,7 @@ class RAGService:
         # Strategy 3: Search with hyphenated query
         if hyphenated_query != query.lower():
             try:
-                results = self.vector_store.similarity_search_with_score(hyphenated_query, k=search_k)
+                results = similarity_search(embed_query(hyphenated_query), k=search_k, user_role=user_role)
                 all_results.extend([(doc, score * 0.95) for doc, score in results])  # Slightly lower weight
             except Exception as e:
                 logger.debug(f"Hyphenated query search failed: {e}")
@@ -166,7 +675,7 @@ class RAGService:
         if important_terms:
             for term in important_terms[:3]:  # Try top 3 important terms
                 try:
-                    term_results = self.vector_store.similarity_search_with_score(term, k=search_k // 2)
+                    term_results = similarity_search(embed_query(term), k=max(search_k // 2, 1), user_role=user_role)
                     all_results.extend([(doc, score * 0.7) for doc, score in term_results])  # Lower weight for term-only searches
                 except Exception as e:
                     logger.debug(f"Term search for '{term}' failed: {e}")
@@ -174,22 +683,24 @@ class RAGService:
         # Strategy 5: Search by filename if query mentions document names
         # Check if query contains common document name patterns
         try:
-            collection = self.vector_store._collection
-            all_docs = collection.get()  # Get all documents metadata
+            coll_get = self.vector_store._collection.get
+            all_docs = coll_get(where=self._access_filter(user_role))  # Get accessible documents metadata
             if all_docs and "metadatas" in all_docs:
                 for metadata in all_docs["metadatas"]:
-                    filename = metadata.get("filename", "").lower()
+                    filename = metadata.get("_filename_lc")
+                    if filename is None:
+                        filename = (metadata.get("filename") or "").lower()
                     # If query mentions part of filename, include those documents
                     if filename and any(term in filename for term in important_terms if len(term) > 4):
                         # Get chunks for this document
                         doc_id = metadata.get("document_id")
                         if doc_id:
-                            doc_results = collection.get(where={"document_id": doc_id})
+                            doc_results = coll_get(where={"document_id": doc_id})
                             if doc_results and "ids" in doc_results:
                                 # Add these chunks with a moderate score
                                 for i, chunk_id in enumerate(doc_results["ids"][:5]):  # Limit to 5 chunks per doc
                                     try:
-                                        chunk_data = collection.get(ids=[chunk_id])
+                                        chunk_data = coll_get(ids=[chunk_id])
                                         if chunk_data and "documents" in chunk_data and chunk_data["documents"]:
                                             # Create a document-like object
                                             from langchain.schema import Document
@@ -203,178 +714,13 @@ class RAGService:
         except Exception as e:
             logger.debug(f"Filename-based search failed: {e}")
         
-        # Remove duplicates and apply document-level relevance boosting
-        seen_ids = set()
-        unique_results = []
-        
         # Extract key terms from query for document matching
-        query_lower = normalized_query.lower()
-        query_terms = set([term for term in query_lower.split() if len(term) > 3])
-        
-        for doc, score in all_results:
-            doc_id = doc.metadata.get('document_id')
-            chunk_id = f"{doc_id}_{doc.page_content[:50]}"  # Use content hash for uniqueness
-            if chunk_id not in seen_ids:
-                seen_ids.add(chunk_id)
-                
-                # DOCUMENT-LEVEL RELEVANCE BOOSTING
-                # If query terms match document filename/title/tags, boost this chunk's relevance
-                filename = doc.metadata.get('filename', '').lower()
-                title = doc.metadata.get('title', '').lower()
-                tags = doc.metadata.get('tags', '').lower()
-                
-                # Check if query terms appear in document name
-                filename_match_score = 0.0
-                if filename:
-                    # Count how many query terms appear in filename
-                    matching_terms = sum(1 for term in query_terms if term in filename)
-                    if matching_terms > 0:
-                        # Strong boost: reduce score (lower = better) by up to 0.4 for strong matches
-                        # This ensures documents with matching names rank much higher
-                        match_ratio = matching_terms / max(len(query_terms), 1)
-                        if match_ratio >= 0.5:  # 50%+ of terms match
-                            filename_match_score = -0.4  # Strong boost
-                        else:
-                            filename_match_score = -0.25 * match_ratio  # Moderate boost
-                    
-                    # Also check for phrase matches (e.g., "ai protection" in "ai model protection")
-                    query_phrase = ' '.join(sorted(query_terms))  # Normalize phrase
-                    filename_words = set(filename.split())
-                    if len(query_terms) >= 2 and all(term in filename_words for term in query_terms):
-                        # All query terms are in filename - very strong boost
-                        filename_match_score = -0.5
-                
-                title_match_score = 0.0
-                if title:
-                    matching_terms = sum(1 for term in query_terms if term in title)
-                    if matching_terms > 0:
-                        match_ratio = matching_terms / max(len(query_terms), 1)
-                        if match_ratio >= 0.5:
-                            title_match_score = -0.35  # Strong boost
-                        else:
-                            title_match_score = -0.2 * match_ratio
-                    
-                    # Phrase match in title
-                    title_words = set(title.split())
-                    if len(query_terms) >= 2 and all(term in title_words for term in query_terms):
-                        title_match_score = -0.45
-                
-                # TAG MATCHING - Boost documents with matching tags
-                tag_match_score = 0.0
-                if tags:
-                    # Split tags (comma-separated)
-                    tag_list = [tag.strip().lower() for tag in tags.split(',')]
-                    matching_tags = sum(1 for term in query_terms if any(term in tag for tag in tag_list))
-                    if matching_tags > 0:
-                        # Tags are important metadata - give good boost
-                        match_ratio = matching_tags / max(len(query_terms), 1)
-                        if match_ratio >= 0.5:
-                            tag_match_score = -0.3  # Strong boost for tag matches
-                        else:
-                            tag_match_score = -0.15 * match_ratio
-                
-                # Apply boosting (subtract from score since lower = better)
-                boosted_score = score + filename_match_score + title_match_score + tag_match_score
-                
-                unique_results.append((doc, boosted_score, score))  # Keep original score for logging
-        
-        # Sort by boosted score (lower distance = better match)
-        unique_results.sort(key=lambda x: x[1])
-        
-        # Filter by permissions first
-        permission_filtered = []
-        for doc, boosted_score, original_score in unique_results:
-            metadata = doc.metadata
-            has_access = (
-                metadata.get("is_public", False) or
-                user_role in (metadata.get("allowed_roles", "") or "").split(",") or
-                metadata.get("owner_id")  # Owner always has access (will be checked at API level)
-            )
-            if has_access:
-                permission_filtered.append({
-                    "content": doc.page_content,
-                    "score": boosted_score,  # Use boosted score for ranking
-                    "original_score": original_score,  # Keep original for logging
-                    "metadata": metadata
-                })
-        
-        # PRIORITIZE BOOSTED DOCUMENTS: Documents with matching names should come first
-        # Also prioritize documents used in previous conversation messages
-        # Group by document and identify boosted documents
-        document_chunks = {}  # {document_id: [chunks]}
-        boosted_documents = set()  # Track which documents got boosted
-        conversation_relevant_docs = set()  # Documents used in previous messages
-        
-        if previously_used_docs:
-            conversation_relevant_docs = previously_used_docs
-            logger.info(f"Prioritizing {len(conversation_relevant_docs)} documents from previous conversation context")
-        
-        for result in permission_filtered:
-            doc_id = result["metadata"].get("document_id")
-            if doc_id not in document_chunks:
-                document_chunks[doc_id] = []
-            document_chunks[doc_id].append(result)
-            
-            # Check if this document was boosted (original_score > score means boost was applied)
-            original = result.get("original_score", result["score"])
-            if original - result["score"] > 0.01:  # Boost was applied
-                boosted_documents.add(doc_id)
-            
-            # Apply additional boost for documents used in previous conversation
-            if doc_id in conversation_relevant_docs:
-                # Boost chunks from previously used documents
-                result["score"] = result["score"] - 0.3  # Strong boost for conversation continuity
-                boosted_documents.add(doc_id)  # Treat as boosted
-                logger.debug(f"Boosting document {doc_id} (used in previous conversation)")
-        
-        filtered_results = []
-        
-        # FIRST PRIORITY: Take top chunks from boosted documents (documents with matching names)
-        boosted_chunks = []
-        for doc_id in boosted_documents:
-            chunks = document_chunks[doc_id]
-            chunks.sort(key=lambda x: x["score"])  # Sort by boosted score
-            boosted_chunks.extend(chunks)
-        
-        # Sort all boosted chunks by score and add them first
-        boosted_chunks.sort(key=lambda x: x["score"])
-        for chunk in boosted_chunks:
-            if len(filtered_results) < limit:
-                filtered_results.append(chunk)
-        
-        # SECOND PRIORITY: Diversify across remaining documents (non-boosted)
-        non_boosted_docs = [doc_id for doc_id in document_chunks.keys() if doc_id not in boosted_documents]
-        if non_boosted_docs and len(filtered_results) < limit:
-            chunks_per_doc = max(1, (limit - len(filtered_results)) // max(len(non_boosted_docs), 1))
-            
-            for doc_id in non_boosted_docs:
-                chunks = document_chunks[doc_id]
-                chunks.sort(key=lambda x: x["score"])
-                for chunk in chunks[:chunks_per_doc]:
-                    if len(filtered_results) < limit:
-                        filtered_results.append(chunk)
-        
-        # THIRD PRIORITY: Fill remaining slots with best chunks across all documents
-        if len(filtered_results) < limit:
-            remaining_chunks = []
-            added_content = {r["content"][:50] for r in filtered_results}
-            
-            for doc_id, chunks in document_chunks.items():
-                for chunk in chunks:
-                    if chunk["content"][:50] not in added_content:
-                        remaining_chunks.append(chunk)
-            
-            remaining_chunks.sort(key=lambda x: x["score"])
-            for chunk in remaining_chunks:
-                if len(filtered_results) < limit:
-                    filtered_results.append(chunk)
-        
-        # Final sort by score to ensure best matches are first
-        filtered_results.sort(key=lambda x: x["score"])
+        query_terms = {term for term in normalized_query.split() if len(term) > 3}
+        filtered_results, document_count = _score_and_diversify(all_results, query_terms, limit, previously_used_docs)
         
         # Log what we found for debugging
         if filtered_results:
-            logger.info(f"Found {len(filtered_results)} relevant chunks from {len(document_chunks)} documents for query: '{query}'")
+            logger.info(f"Found {len(filtered_results)} relevant chunks from {document_count} documents for query: '{query}'")
             for i, result in enumerate(filtered_results[:5]):  # Log top 5
                 doc_name = result["metadata"].get("filename", result["metadata"].get("title", "Unknown"))
                 original = result.get("original_score", result["score"])
@@ -385,20 +731,12 @@ class RAGService:
                 else:
                     logger.info(f"  {i+1}. {doc_name} (score: {boosted:.4f})")
         else:
-            logger.warning(f"No documents found for query: '{query}' (searched {len(unique_results)} total chunks)")
+            logger.warning(f"No documents found for query: '{query}' (searched {len(all_results)} total chunks)")
         
         return filtered_results
     
-    def query(self, question: str, user_role: str, model_id: Optional[str] = None, conversation_history: Optional[List[Dict[str, str]]] = None, content_type: Optional[str] = None) -> Dict:
-        """Query the RAG system with a question and optional conversation history
-        
-        Args:
-            question: The user's question
-            user_role: User role for access control
-            model_id: Optional model ID to use
-            conversation_history: Optional conversation history for context
-            content_type: Optional content type (doc, ppt, mp4, podcast, speech) to streamline retrieval
-        """
+    def _retrieve_context(self, question: str, user_role: str, conversation_history: Optional[List[Dict[str, str]]] = None, content_type: Optional[str] = None) -> List[Dict]:
+        """Retrieve the document chunks used to answer a question, taking conversation history into account"""
         import logging
         logger = logging.getLogger(__name__)
         
@@ -427,39 +765,41 @@ class RAGService:
         # Extract previously used documents from conversation history
         # This helps maintain context - if we discussed "zone segmentation" before,
         # we should prioritize those documents for follow-up questions
-        previously_used_docs = set()
+        used_doc_ids = []
         topic_keywords = []
         
-        if conversation_history and len(conversation_history) > 0:
-            # Look through previous assistant messages to find which documents were cited
-            for msg in reversed(conversation_history[-10:]):  # Check last 10 messages
-                if msg.get("role") == "assistant":
-                    # Check if metadata contains sources
-                    if isinstance(msg, dict) and "metadata" in msg:
-                        sources = msg.get("metadata", {}).get("sources", [])
-                        for source in sources:
-                            doc_id = source.get("metadata", {}).get("document_id")
-                            filename = source.get("metadata", {}).get("filename", "")
-                            if doc_id:
-                                previously_used_docs.add(doc_id)
-                            if filename:
-                                # Extract keywords from filename for topic matching
-                                filename_lower = filename.lower()
-                                # Extract meaningful words (not common words)
-                                words = [w for w in filename_lower.replace(".", " ").replace("-", " ").split() 
-                                        if len(w) > 3 and w not in ["study", "guide", "demo", "script", "deck", "document"]]
-                                topic_keywords.extend(words)
-            
-            # Also extract topic from previous user questions
-            for msg in reversed(conversation_history[-10:]):
-                if msg.get("role") == "user":
-                    content = msg.get("content", "").strip()
-                    # Skip short responses
-                    if len(content) > 20 and not content.lower() in ["yes", "no", "ok", "thanks", "thank you"]:
-                        # Extract key terms from the question
-                        words = [w for w in content.lower().split() if len(w) > 3]
-                        topic_keywords.extend(words)
-                        break  # Use the most recent substantial question
+        recent = conversation_history[-10:] if conversation_history else []
+        found_topic_question = False
+        # Single pass over the last 10 messages: previous assistant messages tell us which
+        # documents were cited, and the most recent substantial user question gives the topic
+        for msg in reversed(recent):
+            role = msg.get("role")
+            if role == "assistant":
+                # Check if metadata contains sources
+                if isinstance(msg, dict) and "metadata" in msg:
+                    sources = msg.get("metadata", {}).get("sources", [])
+                    for source in sources:
+                        doc_id = source.get("metadata", {}).get("document_id")
+                        filename = source.get("metadata", {}).get("filename", "")
+                        if doc_id:
+                            used_doc_ids.append(doc_id)
+                        if filename:
+                            # Extract keywords from filename for topic matching
+                            filename_lower = filename.lower()
+                            # Extract meaningful words (not common words)
+                            words = [w for w in filename_lower.replace(".", " ").replace("-", " ").split() 
+                                    if len(w) > 3 and w not in ["study", "guide", "demo", "script", "deck", "document"]]
+                            topic_keywords.extend(words)
+            elif role == "user" and not found_topic_question:
+                content = msg.get("content", "").strip()
+                # Skip short responses
+                if len(content) > 20 and not content.lower() in ["yes", "no", "ok", "thanks", "thank you"]:
+                    # Extract key terms from the question
+                    words = [w for w in content.lower().split() if len(w) > 3]
+                    topic_keywords.extend(words)
+                    found_topic_question = True  # Use the most recent substantial question
+        
+        previously_used_docs = frozenset(used_doc_ids)
         
         # Build enhanced search query
         search_query = question
@@ -504,7 +844,53 @@ class RAGService:
         else:
             logger.warning(f"No context found for question: '{question}' (searched using: '{search_query}')")
         
+        return context_docs
+    
+    def _format_prompt(self, question: str, context: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> str:
+        """Build the RAG prompt from retrieved context and conversation history"""
+        # Build conversation history context if available
+        history_context = ""
+        if conversation_history and len(conversation_history) > 0:
+            history_parts = ["\n\nIMPORTANT - Previous Conversation Context:\n"]
+            # Include more messages and more content for better context
+            for msg in conversation_history[-10:]:  # Last 10 messages (5 exchanges)
+                role_label = "User" if msg.get("role") == "user" else "Assistant"
+                content = msg.get('content', '')
+                # Include more content (up to 1000 chars) to preserve full context
+                if len(content) > 1000:
+                    content = content[:1000] + "..."
+                history_parts.append(f"{role_label}: {content}\n")
+            history_parts.append("\nNOTE: When the user refers to 'it', 'this', 'that', or uses pronouns, refer to the previous conversation to understand what they're referring to. For example, if they previously asked about a topic and now say 'save it as doc', 'it' refers to the previous answer about that topic.\n")
+            history_context = "".join(history_parts)
+        
+        # Format the prompt
+        formatted_prompt = RAG_PROMPT.format(
+            context=context, 
+            question=question,
+            history_context=history_context
+        )
+        
+        return formatted_prompt
+    
+    async def query(self, question: str, user_role: str, model_id: Optional[str] = None, conversation_history: Optional[List[Dict[str, str]]] = None, content_type: Optional[str] = None) -> Dict:
+        """Query the RAG system with a question and optional conversation history
+        
+        Args:
+            question: The user's question
+            user_role: User role for access control
+            model_id: Optional model ID to use
+            conversation_history: Optional conversation history for context
+            content_type: Optional content type (doc, ppt, mp4, podcast, speech) to streamline retrieval
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        # Retrieval (Chroma + embeddings) is blocking, keep it off the event loop
+        context_docs = await asyncio.to_thread(self._retrieve_context, question, user_role, conversation_history, content_type)
+        
         context = "\n\n".join([doc["content"] for doc in context_docs])
+        # Source payload returned with every answer (error paths return the first 3)
+        sources_payload = _sources_payload(context_docs)
         
         # Get the LLM model
         try:
@@ -516,13 +902,7 @@ class RAGService:
                 # Return context-based answer even without LLM
                 return {
                     "answer": f"Based on the available documents, here's what I found:\n\n{context[:500]}...\n\nNote: AI chat models are not configured. Please set OPENAI_API_KEY or AWS Bedrock credentials to enable full AI responses.",
-                    "sources": [
-                        {
-                            "content": doc["content"][:200],
-                            "metadata": doc["metadata"]
-                        }
-                        for doc in context_docs[:3]
-                    ]
+                    "sources": sources_payload[:3]
                 }
             else:
                 return {
@@ -535,313 +915,42 @@ class RAGService:
         if not context_docs:
             # STRICT: No RAG context = No answer (don't use training data)
             return {
-                "answer": "I cannot find this information in the uploaded documents. The RAG system (Retrieval-Augmented Generation) is my only source of truth, and I do not have access to this information in the uploaded documents. Please upload relevant documents or rephrase your question.",
+                "answer": NO_CONTEXT_ANSWER,
                 "sources": []
             }
         
-        # Build conversation history context if available
-        history_context = ""
-        if conversation_history and len(conversation_history) > 0:
-            history_context = "\n\nIMPORTANT - Previous Conversation Context:\n"
-            # Include more messages and more content for better context
-            for msg in conversation_history[-10:]:  # Last 10 messages (5 exchanges)
-                role_label = "User" if msg.get("role") == "user" else "Assistant"
-                content = msg.get('content', '')
-                # Include more content (up to 1000 chars) to preserve full context
-                if len(content) > 1000:
-                    content = content[:1000] + "..."
-                history_context += f"{role_label}: {content}\n"
-            history_context += "\nNOTE: When the user refers to 'it', 'this', 'that', or uses pronouns, refer to the previous conversation to understand what they're referring to. For example, if they previously asked about a topic and now say 'save it as doc', 'it' refers to the previous answer about that topic.\n"
-        
-        # Create prompt with context and conversation history
-        # PROACTIVE RAG PROMPT: Extract and present information directly
-        prompt_template = """You are an AI assistant for GSSO AI Center. Your role is to be extremely helpful by extracting, synthesizing, and presenting information directly from the uploaded documents.
-
-CRITICAL INSTRUCTIONS:
-1. **USE CONVERSATION HISTORY**: If the user refers to "it", "this", "that", or uses pronouns, look at the previous conversation to understand what they're referring to. For example:
-   - If they previously asked "What is Cloud Edge?" and now say "save it as doc", "it" refers to the previous answer about Cloud Edge
-   - If they say "create a podcast about this", "this" refers to the topic discussed in previous messages
-   - Always check the conversation history to resolve references and pronouns
-
-2. **EXTRACT AND PRESENT DIRECTLY**: Your primary goal is to extract key information from the documents and present it directly to the user. Do NOT just tell them to "refer to this document" - actually provide the information they need.
-
-3. **BE COMPREHENSIVE**: Dig deep into the context provided. Extract all relevant information, key points, features, benefits, and details. Synthesize information from multiple document sections when relevant.
-
-4. **BE HELPFUL AND PROACTIVE**: 
-   - If the user asks about a topic, provide a complete, detailed answer based on the documents
-   - Include all relevant details, not just a summary
-   - Extract specific examples, numbers, features, and technical details
-   - If creating content (like speeches, summaries, presentations), include ALL key points from the documents
-   - If the user asks to "save as doc", "save as PDF", "save it as doc", "save it as PDF", or similar:
-     * First, identify what "it" or "this" refers to by checking the conversation history
-     * Acknowledge that you understand they want to save the previous answer/content
-     * Provide the content in a format ready for document generation
-     * Mention that they can use the document generation feature to create the file
-
-5. **SYNTHESIZE INFORMATION**: Combine information from multiple document sections to provide comprehensive answers. Don't just cite sources - actually extract and present the information.
-
-6. **USE ONLY DOCUMENT CONTEXT**: Base your answer ONLY on the information provided in the "Context from documents" section below. Do not use general knowledge or training data.
-
-7. **CITE SOURCES AT THE END**: After providing a comprehensive answer, you may include a brief note about which documents the information came from, but do NOT use citations as a way to avoid providing information.
-
-8. **IF INFORMATION IS MISSING**: Only if the context truly doesn't contain relevant information, then state that. But first, make sure you've thoroughly searched the context for any related information.
-
-{history_context}
-
-Context from documents (extract and synthesize information from this):
-{context}
-
-Current Question: {question}
-
-IMPORTANT: Before answering, check if the question contains pronouns or references like "it", "this", "that". If so, refer to the conversation history above to understand what the user is referring to. Then provide a comprehensive, detailed answer by extracting and presenting all relevant information directly from the documents above. Be thorough and helpful:"""
-        
-        prompt = PromptTemplate(
-            template=prompt_template,
-            input_variables=["context", "question", "history_context"]
-        )
+        # Answers that depend on the conversation so far are never cached
+        cache_key = None if conversation_history else _answer_cache_key(model_id, question, context)
+        cached_answer = _answer_cache_get(cache_key) if cache_key else None
+        if cached_answer is not None:
+            logger.info("Returning cached answer for repeated question")
+            return {
+                "answer": cached_answer,
+                "sources": sources_payload
+            }
         
-        # Format the prompt
-        formatted_prompt = prompt.format(
-            context=context, 
-            question=question,
-            history_context=history_context
-        )
+        formatted_prompt = self._format_prompt(question, context, conversation_history)
         
         # Generate answer using LLM
         try:
-            from langchain_aws import ChatBedrock, BedrockLLM
-            from langchain_openai import AzureChatOpenAI, ChatOpenAI
-            import logging
-            logger = logging.getLogger(__name__)
-            
-            # Check model type and invoke appropriately
-            if isinstance(llm, AzureChatOpenAI):
-                # AzureChatOpenAI (Cisco) - use messages format
-                from langchain.schema import HumanMessage
-                messages = [HumanMessage(content=formatted_prompt)]
-                logger.info(f"Invoking AzureChatOpenAI (Cisco) with {len(messages)} message(s)")
-                try:
-                    # Add user parameter with appkey if configured
-                    from app.core.config import settings
-                    invoke_kwargs = {}
-                    if settings.CISCO_APPKEY:
-                        import json
-                        user_data = {"appkey": settings.CISCO_APPKEY}
-                        invoke_kwargs["user"] = json.dumps(user_data)
-                    
-                    response = llm.invoke(messages, **invoke_kwargs)
-                except Exception as auth_error:
-                    # Check if it's an authentication error (token expired)
-                    error_str = str(auth_error)
-                    is_auth_error = (
-                        isinstance(auth_error, AuthenticationError) or
-                        "401" in error_str or
-                        "expired" in error_str.lower() or
-                        "authentication" in error_str.lower() or
-                        "Token has expired" in error_str
-                    )
-                    if is_auth_error:
-                        logger.warning("Cisco token expired during request, refreshing and retrying...")
-                        # Refresh token and retry once
-                        model_manager._initialize_cisco()  # Force refresh
-                        # Recreate the LLM with new token
-                        token = model_manager._get_cisco_token()
-                        if token:
-                            # Recreate the LLM instance with fresh token
-                            deployment_name = settings.CISCO_DEPLOYMENT
-                            if not deployment_name:
-                                endpoint_parts = settings.CISCO_ENDPOINT.split("/")
-                                for i, part in enumerate(endpoint_parts):
-                                    if part == "deployments" and i + 1 < len(endpoint_parts):
-                                        deployment_name = endpoint_parts[i + 1]
-                                        break
-                            if not deployment_name:
-                                deployment_name = "gpt-4.1"
-                            
-                            llm = AzureChatOpenAI(
-                                azure_endpoint="https://chat-ai.cisco.com",
-                                azure_deployment=deployment_name,
-                                openai_api_key=token,
-                                openai_api_version="2024-08-01-preview",
-                                temperature=0
-                            )
-                            # Retry the request
-                            try:
-                                response = llm.invoke(messages, **invoke_kwargs)
-                            except Exception as retry_error:
-                                logger.error(f"Azure/Cisco API error on retry: {retry_error}", exc_info=True)
-                                raise
-                        else:
-                            raise ValueError("Failed to refresh Cisco token after expiration")
-                    else:
-                        logger.error(f"Azure/Cisco API error: {auth_error}", exc_info=True)
-                        raise
-            elif isinstance(llm, BedrockLLM):
-                # BedrockLLM (for models that don't support chat) - use string prompt
-                import time
-                logger.info("Invoking BedrockLLM with string prompt")
-                
-                # Retry logic for Bedrock with exponential backoff
-                max_retries = 5
-                base_delay = 2  # Start with 2 seconds
-                
-                for attempt in range(max_retries):
-                    try:
-                        response = llm.invoke(formatted_prompt)
-                        break  # Success, exit retry loop
-                    except Exception as bedrock_error:
-                        error_str = str(bedrock_error)
-                        
-                        # Check if it's a throttling error
-                        is_throttling = (
-                            "ThrottlingException" in error_str or 
-                            "Too many requests" in error_str or
-                            "throttl" in error_str.lower()
-                        )
-                        
-                        if is_throttling and attempt < max_retries - 1:
-                            # Calculate exponential backoff delay
-                            delay = base_delay * (2 ** attempt) + (attempt * 0.5)  # Exponential backoff with jitter
-                            logger.warning(
-                                f"Bedrock throttling detected (attempt {attempt + 1}/{max_retries}). "
-                                f"Retrying in {delay:.1f} seconds..."
-                            )
-                            time.sleep(delay)
-                            continue
-                        
-                        # Handle throttling after max retries
-                        if is_throttling:
-                            error_msg = (
-                                f"AWS Bedrock rate limit exceeded. Please wait a moment and try again.\n\n"
-                                f"The system attempted {max_retries} times with exponential backoff.\n"
-                                f"Please wait 30-60 seconds before trying again."
-                            )
-                            logger.error(error_msg)
-                            raise ValueError(error_msg)
-                        
-                        raise
-            elif isinstance(llm, ChatBedrock):
-                # ChatBedrock - use messages format
-                from langchain.schema import HumanMessage
-                import time
-                messages = [HumanMessage(content=formatted_prompt)]
-                logger.info(f"Invoking ChatBedrock with {len(messages)} message(s)")
-                
-                # Retry logic for Bedrock with exponential backoff
-                max_retries = 5
-                base_delay = 2  # Start with 2 seconds
-                
-                for attempt in range(max_retries):
-                    try:
-                        response = llm.invoke(messages)
-                        break  # Success, exit retry loop
-                    except Exception as bedrock_error:
-                        error_str = str(bedrock_error)
-                        
-                        # Check if it's a throttling error
-                        is_throttling = (
-                            "ThrottlingException" in error_str or 
-                            "Too many requests" in error_str or
-                            "throttl" in error_str.lower()
-                        )
-                        
-                        if is_throttling and attempt < max_retries - 1:
-                            # Calculate exponential backoff delay
-                            delay = base_delay * (2 ** attempt) + (attempt * 0.5)  # Exponential backoff with jitter
-                            logger.warning(
-                                f"Bedrock throttling detected (attempt {attempt + 1}/{max_retries}). "
-                                f"Retrying in {delay:.1f} seconds..."
-                            )
-                            time.sleep(delay)
-                            continue
-                        
-                        # Log the actual error from Bedrock
-                        logger.error(f"Bedrock API error: {bedrock_error}", exc_info=True)
-                        
-                        # Check if it's a response parsing error (NoneType subscriptable)
-                        if "'NoneType' object is not subscriptable" in error_str or "outputs" in error_str.lower():
-                            error_msg = (
-                                f"Bedrock model returned an invalid response. This usually means:\n"
-                                f"1. The model ID format is incorrect (try using just 'model:version' instead of full ARN)\n"
-                                f"2. The model is not available in your AWS account or region\n"
-                                f"3. AWS credentials don't have Bedrock access permissions\n"
-                                f"4. The model request format is incompatible\n\n"
-                                f"Original error: {bedrock_error}\n\n"
-                                f"Try using a simple model ID format like 'mistral.mistral-large-2407-v1:0' "
-                                f"instead of an ARN, or verify the model is available in region {settings.AWS_REGION}."
-                            )
-                            logger.error(error_msg)
-                            raise ValueError(error_msg)
-                        
-                        # Handle throttling after max retries
-                        if is_throttling:
-                            error_msg = (
-                                f"AWS Bedrock rate limit exceeded. Please wait a moment and try again.\n\n"
-                                f"The system attempted {max_retries} times with exponential backoff.\n"
-                                f"This usually happens when:\n"
-                                f"1. Too many requests are being made in a short time\n"
-                                f"2. Your AWS account has rate limits on Bedrock usage\n"
-                                f"3. Multiple users are using the system simultaneously\n\n"
-                                f"Please wait 30-60 seconds before trying again."
-                            )
-                            logger.error(error_msg)
-                            raise ValueError(error_msg)
-                        
-                        raise
-            elif isinstance(llm, ChatOpenAI):
-                # Regular ChatOpenAI - use messages format
-                from langchain.schema import HumanMessage
-                messages = [HumanMessage(content=formatted_prompt)]
-                logger.info(f"Invoking ChatOpenAI with {len(messages)} message(s)")
-                response = llm.invoke(messages)
-            else:
-                # Other models can take string directly
-                response = llm.invoke(formatted_prompt)
+            # Message format and retry policy were chosen for this model class in get_chat_model
+            async with self._llm_semaphore:
+                response = await llm._invoker(formatted_prompt)
             
             # Handle different response types
             if response is None:
                 raise ValueError("LLM returned None response")
             
-            # Try to get content from response
-            if hasattr(response, 'content'):
-                answer = response.content
-            elif isinstance(response, str):
-                answer = response
-            elif hasattr(response, 'text'):
-                answer = response.text
-            elif isinstance(response, dict):
-                # Some models return dict with 'text' or 'content' key
-                answer = response.get('text') or response.get('content') or str(response)
-            else:
-                # Fallback: convert to string
-                answer = str(response)
+            answer = extract_text(response)
                 
             if not answer or not answer.strip():
                 raise ValueError("LLM returned empty response")
             
             # Post-processing: Validate that answer references RAG context
-            # If the answer seems to be generic knowledge without referencing the context,
-            # add a reminder that RAG is the source
-            answer_lower = answer.lower()
-            context_lower = context.lower()
+            _check_context_overlap(answer, context)
             
-            # Check if answer might be using general knowledge instead of RAG
-            # If context is provided but answer doesn't seem to reference it, add a note
-            if context and len(context) > 100:
-                # Simple heuristic: if answer doesn't contain any words from context (beyond common words)
-                # it might be using general knowledge
-                context_words = set(context_lower.split())
-                answer_words = set(answer_lower.split())
-                common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'}
-                context_unique_words = context_words - common_words
-                answer_unique_words = answer_words - common_words
-                
-                # If there's minimal overlap, the answer might not be based on context
-                overlap = len(context_unique_words & answer_unique_words)
-                if len(context_unique_words) > 0 and overlap < 2 and len(answer_unique_words) > 5:
-                    # Answer might be using general knowledge - add a reminder
-                    logger.warning(f"Answer may not be based on RAG context. Overlap: {overlap}/{len(context_unique_words)} unique words")
-                    # Don't modify the answer, but log it for monitoring
+            if cache_key:
+                _answer_cache_put(cache_key, answer)
                 
         except Exception as e:
             import logging
@@ -850,25 +959,203 @@ IMPORTANT: Before answering, check if the question contains pronouns or referenc
             # Return a helpful error message instead of crashing
             return {
                 "answer": f"I encountered an error while generating a response: {str(e)}. Please check your model configuration and AWS Bedrock credentials.",
-                "sources": [
-                    {
-                        "content": doc["content"][:200],
-                        "metadata": doc["metadata"]
-                    }
-                    for doc in context_docs[:3]
-                ]
+                "sources": sources_payload[:3]
             }
         
         return {
             "answer": answer,
-            "sources": [
-                {
-                    "content": doc["content"][:200],
-                    "metadata": doc["metadata"]
+            "sources": sources_payload
+        }
+
+    async def stream_answer(self, question: str, user_role: str, model_id: Optional[str] = None, conversation_history: Optional[List[Dict[str, str]]] = None, content_type: Optional[str] = None, sources: Optional[List[Dict]] = None) -> AsyncIterator[str]:
+        """Stream the answer to a question as text chunks (same retrieval and prompt as query())
+        
+        If a `sources` list is passed, it is filled with the source payloads before the first chunk
+        is yielded. The context-overlap check runs on the full answer once the stream completes.
+        """
+        import logging
+        from langchain.schema import HumanMessage
+        logger = logging.getLogger(__name__)
+        
+        context_docs = await asyncio.to_thread(self._retrieve_context, question, user_role, conversation_history, content_type)
+        if not context_docs:
+            yield NO_CONTEXT_ANSWER
+            return
+        
+        if sources is not None:
+            sources.extend(_sources_payload(context_docs))
+        
+        context = "\n\n".join([doc["content"] for doc in context_docs])
+        try:
+            llm = model_manager.get_chat_model(model_id=model_id, temperature=0)
+        except ValueError as e:
+            logger.warning(f"No chat models available: {e}")
+            yield f"Based on the available documents, here's what I found:\n\n{context[:500]}...\n\nNote: AI chat models are not configured. Please set OPENAI_API_KEY or AWS Bedrock credentials to enable full AI responses."
+            return
+        
+        messages = [HumanMessage(content=self._format_prompt(question, context, conversation_history))]
+        invoke_kwargs = {}
+        if AzureChatOpenAI is not None and isinstance(llm, AzureChatOpenAI) and model_manager.CISCO_USER_JSON:
+            invoke_kwargs["user"] = model_manager.CISCO_USER_JSON
+        
+        answer_parts = []
+        # The slot is held for the whole stream: the LLM call is in flight until the last chunk
+        async with self._llm_semaphore:
+            # Same token refresh / throttling backoff as query()'s invoker, up to the first chunk
+            async for chunk in model_manager.astream(llm, messages, model_id=model_id, temperature=0, **invoke_kwargs):
+                text = extract_text(chunk)
+                if text:
+                    answer_parts.append(text)
+                    yield text
+        
+        _check_context_overlap("".join(answer_parts), context)
+    
+    async def batch_answer(self, questions: List[str], user_role: str, model_id: Optional[str] = None) -> List[Dict]:
+        """Answer many independent questions, using a Bedrock batch inference job for large batches
+        
+        Bedrock batch jobs are cheaper and aren't subject to on-demand throttling, but they need
+        BEDROCK_USE_BATCH plus an S3 bucket and service role, and at least BEDROCK_BATCH_MIN_RECORDS
+        records. Smaller batches (or batch mode disabled) are answered concurrently with asyncio.gather.
+        Results are returned in the same order as `questions`.
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        if not settings.BEDROCK_USE_BATCH or len(questions) < settings.BEDROCK_BATCH_MIN_RECORDS:
+            return await self._abatch_answer(questions, user_role, model_id)
+        
+        results: List[Optional[Dict]] = [None] * len(questions)
+        records = {}  # recordId -> (index, context_docs)
+        lines = []
+        all_context_docs = await asyncio.gather(
+            *(asyncio.to_thread(self._retrieve_context, question, user_role) for question in questions)
+        )
+        for i, (question, context_docs) in enumerate(zip(questions, all_context_docs)):
+            if not context_docs:
+                # STRICT: No RAG context = No answer (don't use training data)
+                results[i] = {
+                    "answer": NO_CONTEXT_ANSWER,
+                    "sources": []
                 }
-                for doc in context_docs[:5]
-            ]
+                continue
+            context = "\n\n".join([doc["content"] for doc in context_docs])
+            record_id = uuid.uuid4().hex
+            records[record_id] = (i, context_docs)
+            lines.append(json.dumps({
+                "recordId": record_id,
+                "modelInput": {
+                    "anthropic_version": "bedrock-2023-05-31",
+                    "max_tokens": 4096,
+                    "temperature": 0,
+                    "messages": [{"role": "user", "content": [{"type": "text", "text": self._format_prompt(question, context)}]}],
+                },
+            }))
+        
+        if records:
+            logger.info(f"Submitting Bedrock batch inference job with {len(records)} records")
+            outputs = await self._run_bedrock_batch_job(lines)
+            for record_id, (i, context_docs) in records.items():
+                output = outputs.get(record_id)
+                if output is None:
+                    answer = "I encountered an error while generating a response: the batch inference job returned no output for this question."
+                else:
+                    answer = "".join(part.get("text", "") for part in output.get("content", []))
+                results[i] = {
+                    "answer": answer,
+                    "sources": _sources_payload(context_docs)
+                }
+        
+        return results
+    
+    async def _abatch_answer(self, questions: List[str], user_role: str, model_id: Optional[str] = None) -> List[Dict]:
+        """Answer questions concurrently on one shared LLM, within the BEDROCK_MAX_PARALLEL in-flight limit"""
+        llm = model_manager.get_chat_model(model_id=model_id, temperature=0)
+        all_context_docs = await asyncio.gather(
+            *(asyncio.to_thread(self._retrieve_context, question, user_role) for question in questions)
+        )
+        
+        async def answer_one(question: str, context_docs: List[Dict]) -> Dict:
+            if not context_docs:
+                return {"answer": NO_CONTEXT_ANSWER, "sources": []}
+            context = "\n\n".join([doc["content"] for doc in context_docs])
+            try:
+                # The invoker keeps the per-model retry policy (token refresh, throttling backoff)
+                async with self._llm_semaphore:
+                    response = await llm._invoker(self._format_prompt(question, context))
+                answer = extract_text(response)
+            except Exception as e:
+                answer = f"I encountered an error while generating a response: {str(e)}. Please check your model configuration and AWS Bedrock credentials."
+            return {
+                "answer": answer,
+                "sources": _sources_payload(context_docs)
+            }
+        
+        # gather preserves order, so results line up with `questions`
+        return list(await asyncio.gather(
+            *(answer_one(question, context_docs) for question, context_docs in zip(questions, all_context_docs))
+        ))
+    
+    async def _run_bedrock_batch_job(self, lines: List[str]) -> Dict[str, Dict]:
+        """Upload JSONL records to S3, run a Bedrock batch inference job and return modelOutput by recordId"""
+        import logging
+        import tempfile
+        import boto3
+        logger = logging.getLogger(__name__)
+        
+        aws_kwargs = {
+            "aws_access_key_id": settings.AWS_ACCESS_KEY_ID,
+            "aws_secret_access_key": settings.AWS_SECRET_ACCESS_KEY,
+            "region_name": settings.AWS_REGION,
         }
+        s3 = boto3.client("s3", **aws_kwargs)
+        bedrock = boto3.client("bedrock", **aws_kwargs)
+        
+        job_name = f"rag-batch-{uuid.uuid4().hex[:12]}"
+        input_key = f"{settings.BEDROCK_BATCH_S3_PREFIX}/{job_name}/input.jsonl"
+        output_prefix = f"{settings.BEDROCK_BATCH_S3_PREFIX}/{job_name}/output/"
+        bucket = settings.BEDROCK_BATCH_S3_BUCKET
+        
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write("\n".join(lines))
+            input_path = f.name
+        try:
+            await asyncio.to_thread(s3.upload_file, input_path, bucket, input_key)
+        finally:
+            os.unlink(input_path)
+        
+        job = await asyncio.to_thread(
+            bedrock.create_model_invocation_job,
+            jobName=job_name,
+            roleArn=settings.BEDROCK_BATCH_ROLE_ARN,
+            modelId=settings.BEDROCK_BATCH_MODEL_ID,
+            inputDataConfig={"s3InputDataConfig": {"s3Uri": f"s3://{bucket}/{input_key}"}},
+            outputDataConfig={"s3OutputDataConfig": {"s3Uri": f"s3://{bucket}/{output_prefix}"}},
+        )
+        job_arn = job["jobArn"]
+        
+        # Batch jobs take minutes to hours; back off up to 5 minutes between polls
+        delay = 30
+        while True:
+            await asyncio.sleep(delay)
+            status = (await asyncio.to_thread(bedrock.get_model_invocation_job, jobIdentifier=job_arn))["status"]
+            if status == "Completed":
+                break
+            if status in ("Failed", "Stopped", "Expired"):
+                raise ValueError(f"Bedrock batch inference job {job_name} ended with status {status}")
+            logger.info(f"Bedrock batch job {job_name} is {status}, checking again in {delay}s")
+            delay = min(delay * 2, 300)
+        
+        # Output lands in <output prefix>/<job id>/input.jsonl.out
+        job_id = job_arn.rsplit("/", 1)[-1]
+        output_key = f"{output_prefix}{job_id}/input.jsonl.out"
+        body = await asyncio.to_thread(lambda: s3.get_object(Bucket=bucket, Key=output_key)["Body"].read())
+        outputs = {}
+        for line in body.decode("utf-8").splitlines():
+            if line.strip():
+                record = json.loads(line)
+                if "modelOutput" in record:
+                    outputs[record["recordId"]] = record["modelOutput"]
+        return outputs
 
 # Global instance
 rag_service = RAGService()
@@ -3,14 +3,39 @@ Speech Service - Completely independent service for speech/monologue generation
 Has its own configuration, parameters, and LLM settings
 """
 import logging
-import asyncio
-import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, Optional
 from app.services.model_manager import model_manager
-from app.core.config import settings
+from app.services._llm_utils import extract_text
 
 logger = logging.getLogger(__name__)
 
+# Static speech prompt fragments; _create_prompt only joins in the topic and content
+_SPEECH_PROMPT_PREFIX = """Create a compelling, comprehensive, and well-structured speech or monologue by extracting ALL key information from the content below.
+
+CRITICAL INSTRUCTIONS:
+1. **EXTRACT ALL KEY POINTS**: Dig deep and extract ALL important information, features, benefits, details, and examples from the content. Don't just summarize - include specific details.
+
+2. **BE COMPREHENSIVE**: Include all relevant information that would be valuable to the audience. Extract numbers, statistics, specific features, benefits, use cases, and technical details.
+
+3. **STRUCTURE WELL**: Organize the speech logically with:
+   - An engaging introduction that hooks the audience
+   - Clear main points with supporting details
+   - Compelling examples and real-world applications
+   - A strong conclusion that reinforces key takeaways
+
+4. **MAKE IT ENGAGING**: Use varied language, rhetorical devices, and enthusiasm. Make it sound like a professional speaker addressing an audience.
+
+5. **BE THOROUGH**: Cover ALL major topics and details from the content. Don't skip important information.
+
+**TOPIC:** """
+_SPEECH_PROMPT_MID = """
+
+**CONTENT TO LEARN FROM:**
+"""
+_SPEECH_PROMPT_SUFFIX = """
+
+Now create a comprehensive, engaging speech that transforms this information into a compelling monologue suitable for presentation."""
+
 class SpeechServiceConfig:
     """Independent configuration for Speech Service"""
     # LLM Configuration
@@ -46,9 +71,19 @@ class SpeechService:
         user_context: Optional[Dict[str, Any]] = None
     ) -> str:
         """Generate speech script - completely independent from other services"""
+        logger.info(f"SpeechService: Generating script from {len(content)} characters")
+        speech = "".join([chunk async for chunk in self.stream_script(content, topic, user_context)])
+        logger.info(f"SpeechService: Generated script ({len(speech)} characters)")
+        return speech
+    
+    async def stream_script(
+        self,
+        content: str,
+        topic: Optional[str] = None,
+        user_context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream the speech script as it is generated, so consumers can start before the LLM finishes"""
         try:
-            logger.info(f"SpeechService: Generating script from {len(content)} characters")
-            
             # Create prompt using this service's own configuration
             speech_prompt = self._create_prompt(content, topic)
             
@@ -59,13 +94,8 @@ class SpeechService:
             )
             
             # Generate speech using this service's own max_tokens setting
-            response = await self._invoke_llm(llm, speech_prompt)
-            
-            # Extract speech text
-            speech = self._extract_response(response)
-            
-            logger.info(f"SpeechService: Generated script ({len(speech)} characters)")
-            return speech
+            async for chunk in self._invoke_llm(llm, speech_prompt):
+                yield chunk
             
         except Exception as e:
             logger.error(f"SpeechService error: {e}", exc_info=True)
@@ -73,32 +103,10 @@ class SpeechService:
     
     def _create_prompt(self, content: str, topic: Optional[str] = None) -> str:
         """Create speech prompt using this service's configuration"""
-        return f"""Create a compelling, comprehensive, and well-structured speech or monologue by extracting ALL key information from the content below.
-
-CRITICAL INSTRUCTIONS:
-1. **EXTRACT ALL KEY POINTS**: Dig deep and extract ALL important information, features, benefits, details, and examples from the content. Don't just summarize - include specific details.
-
-2. **BE COMPREHENSIVE**: Include all relevant information that would be valuable to the audience. Extract numbers, statistics, specific features, benefits, use cases, and technical details.
-
-3. **STRUCTURE WELL**: Organize the speech logically with:
-   - An engaging introduction that hooks the audience
-   - Clear main points with supporting details
-   - Compelling examples and real-world applications
-   - A strong conclusion that reinforces key takeaways
-
-4. **MAKE IT ENGAGING**: Use varied language, rhetorical devices, and enthusiasm. Make it sound like a professional speaker addressing an audience.
-
-5. **BE THOROUGH**: Cover ALL major topics and details from the content. Don't skip important information.
-
-**TOPIC:** {topic or 'the subject matter'}
-
-**CONTENT TO LEARN FROM:**
-{content}
-
-Now create a comprehensive, engaging speech that transforms this information into a compelling monologue suitable for presentation."""
+        return "".join((_SPEECH_PROMPT_PREFIX, topic or 'the subject matter', _SPEECH_PROMPT_MID, content, _SPEECH_PROMPT_SUFFIX))
     
-    async def _invoke_llm(self, llm, prompt: str):
-        """Invoke LLM with this service's max_tokens configuration"""
+    async def _invoke_llm(self, llm, prompt: str) -> AsyncIterator[str]:
+        """Stream LLM output with this service's max_tokens configuration"""
         from langchain.schema import HumanMessage
         from langchain_openai import AzureChatOpenAI
         
@@ -106,33 +114,28 @@ Now create a comprehensive, engaging speech that transforms this information int
         invoke_kwargs = {}
         
         # Add Cisco appkey if needed
-        if isinstance(llm, AzureChatOpenAI) and settings.CISCO_APPKEY:
-            user_data = {"appkey": settings.CISCO_APPKEY}
-            invoke_kwargs["user"] = json.dumps(user_data)
+        if isinstance(llm, AzureChatOpenAI) and model_manager.CISCO_USER_JSON:
+            invoke_kwargs["user"] = model_manager.CISCO_USER_JSON
         
         # Set max_tokens using this service's configuration
         max_tokens_value = self.config.MAX_TOKENS
         
         # Try to set max_tokens
+        started = False
         try:
             llm_with_max_tokens = llm.bind(max_tokens=max_tokens_value)
-            response = await asyncio.to_thread(llm_with_max_tokens.invoke, messages, **invoke_kwargs)
+            async for chunk in llm_with_max_tokens.astream(messages, **invoke_kwargs):
+                started = True
+                yield extract_text(chunk)
             logger.debug(f"SpeechService: Set max_tokens={max_tokens_value} via bind()")
         except Exception:
+            # Text already yielded can't be taken back, so only fall back before the first chunk
+            if started:
+                raise
             # Fallback - use default
-            response = await asyncio.to_thread(llm.invoke, messages, **invoke_kwargs)
             logger.debug(f"SpeechService: Using default max_tokens")
-        
-        return response
-    
-    def _extract_response(self, response) -> str:
-        """Extract text from LLM response"""
-        if hasattr(response, 'content'):
-            return response.content
-        elif isinstance(response, str):
-            return response
-        else:
-            return str(response)
+            async for chunk in llm.astream(messages, **invoke_kwargs):
+                yield extract_text(chunk)
 
 # Global instance - can be customized per service
 speech_service = SpeechService()
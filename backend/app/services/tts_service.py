@@ -1,32 +1,158 @@
 import os
+import asyncio
 import base64
+import hashlib
 import logging
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
 import warnings
-from typing import Tuple, Optional, List
+from collections import OrderedDict
+from typing import AsyncIterator, Tuple, Optional, List
 from io import BytesIO
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter
 from app.core.config import settings
 
-# Suppress pydub/ffmpeg warnings at module level
+# Suppress pydub/ffmpeg warnings once at module level (covers the pydub merge/convert paths)
 warnings.filterwarnings("ignore", category=RuntimeWarning, module="pydub")
 
 logger = logging.getLogger(__name__)
 
+# Pause inserted between dialogue segments when merging
+SEGMENT_PAUSE_SECONDS = 0.5
+# OpenAI TTS returns 24 kHz mono audio; the ffmpeg silence clip must match for stream-copy concat
+OPENAI_TTS_SAMPLE_RATE = 24000
+
+# pydub AudioSegment decoder per audio format (MP3 as default); new formats only need an entry here.
+# Method names rather than bound methods because pydub is only imported when merging
+_AUDIO_DECODERS = {"mp3": "from_mp3", "wav": "from_wav"}
+
+# Speaker label lines: "[Host]" on its own line, "[Host]: text" (inline) or "Host: text" / "Guest: text"
+_SPEAKER_RE = re.compile(r"\[(?P<bracket>[^\]]*)\](?::\s*(?P<bracket_text>.*))?|(?P<plain>Host|Guest):\s*(?P<plain_text>.*)")
+
+# Consecutive same-voice segments are merged into one request up to this length (OpenAI TTS limit is 4096)
+TTS_SEGMENT_MAX_CHARS = 4000
+
+TTS_MODEL = "tts-1"  # or "tts-1-hd" for higher quality (more expensive)
+
+# Audio for repeated lines (intros, "Exactly!", ...) keyed by voice/model/format/text digest,
+# evicted least-recently-used once the total size passes TTS_CACHE_MAX_MB
+_tts_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+_tts_cache_bytes = 0
+_tts_cache_lock = threading.Lock()
+
+
+def _tts_cache_key(voice: str, text: str, audio_format: str) -> bytes:
+    return hashlib.blake2b(f"{voice}|{TTS_MODEL}|{audio_format}|{text}".encode(), digest_size=16).digest()
+
+
+def _tts_cache_get(key: bytes) -> Optional[bytes]:
+    with _tts_cache_lock:
+        audio = _tts_cache.get(key)
+        if audio is not None:
+            _tts_cache.move_to_end(key)
+        return audio
+
+
+def _tts_cache_put(key: bytes, audio: bytes):
+    global _tts_cache_bytes
+    if not audio:
+        return
+    max_bytes = settings.TTS_CACHE_MAX_MB * 1024 * 1024
+    with _tts_cache_lock:
+        if key not in _tts_cache:
+            _tts_cache[key] = audio
+            _tts_cache_bytes += len(audio)
+        while _tts_cache_bytes > max_bytes and _tts_cache:
+            _, evicted = _tts_cache.popitem(last=False)
+            _tts_cache_bytes -= len(evicted)
+
+
+# Caps OpenAI TTS requests in flight across all concurrent dialogue generations (rate limits)
+_async_tts_semaphore = asyncio.Semaphore(max(1, settings.TTS_CONCURRENCY))
+
+
+# Parallel TTS calls from one process get intermittent errors under load, so retry each segment
+@retry(stop=stop_after_attempt(3), wait=wait_exponential_jitter(initial=1, max=8), reraise=True)
+async def _acreate_speech(client, voice: str, text: str, audio_format: str) -> bytes:
+    async with _async_tts_semaphore:
+        response = await client.audio.speech.create(
+            model=TTS_MODEL,
+            voice=voice,
+            input=text[:4096],  # OpenAI TTS limit
+            response_format=audio_format  # Use requested format directly
+        )
+    # The body is already buffered by the SDK; take it whole instead of re-concatenating chunks
+    return response.content
+
+
+async def _speech_audio_async(client, voice: str, text: str, audio_format: str) -> bytes:
+    """OpenAI TTS audio for text, served from the in-memory cache when the same line was already spoken"""
+    if not settings.TTS_CACHE_ENABLED:
+        return await _acreate_speech(client, voice, text, audio_format)
+    key = _tts_cache_key(voice, text, audio_format)
+    audio = _tts_cache_get(key)
+    if audio is None:
+        audio = await _acreate_speech(client, voice, text, audio_format)
+        _tts_cache_put(key, audio)
+    return audio
+
+
+async def _stream_speech_async(client, voice: str, text: str, audio_format: str) -> AsyncIterator[bytes]:
+    """Yield OpenAI TTS audio as it arrives over the wire (cached audio comes back as one chunk)"""
+    key = _tts_cache_key(voice, text, audio_format) if settings.TTS_CACHE_ENABLED else None
+    cached = _tts_cache_get(key) if key else None
+    if cached is not None:
+        yield cached
+        return
+    
+    chunks = []
+    async with _async_tts_semaphore:
+        async with client.audio.speech.with_streaming_response.create(
+            model=TTS_MODEL,
+            voice=voice,
+            input=text[:4096],  # OpenAI TTS limit
+            response_format=audio_format
+        ) as response:
+            async for chunk in response.iter_bytes():
+                chunks.append(chunk)
+                yield chunk
+    if key:
+        _tts_cache_put(key, b"".join(chunks))
+
+
 class TTSService:
     """Service for converting text to speech audio files with OpenAI TTS"""
     
     def __init__(self):
-        self.supported_formats = ["mp3", "wav"]
+        self.supported_formats = frozenset(("mp3", "wav"))
         self.default_language = "en"
         # OpenAI TTS voices: alloy, echo, fable, onyx, nova, shimmer
         self.openai_voices = {
             "host": settings.OPENAI_TTS_VOICE_HOST or "nova",
             "guest": settings.OPENAI_TTS_VOICE_GUEST or "onyx"
         }
+        # Probed once; None means merging falls back to pydub / plain byte concatenation
+        self._ffmpeg = shutil.which("ffmpeg")
+        self._silence_files = {}  # audio_format -> path of the pre-rendered pause clip
+        self._silence_audio = {}  # audio_format -> bytes of that clip, shared by every stream
+        self._async_openai_client = None  # Created on first use, see async_openai_client
     
-    def text_to_speech(
-        self, 
-        text: str, 
-        audio_format: str = "mp3", 
+    @property
+    def async_openai_client(self):
+        """Shared AsyncOpenAI client, so every TTS request (and parallel segment) reuses one keep-alive pool"""
+        if self._async_openai_client is None and settings.OPENAI_API_KEY:
+            from openai import AsyncOpenAI
+            # No SDK retries: _acreate_speech's tenacity policy is the only retry layer
+            self._async_openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0, timeout=60)
+        return self._async_openai_client
+    
+    async def text_to_speech_async(
+        self,
+        text: str,
+        audio_format: str = "mp3",
         language: str = "en",
         slow: bool = False,
         use_dialogue: bool = True
@@ -34,6 +160,9 @@ class TTSService:
         """
         Convert text to speech audio
         
+        OpenAI calls are awaited on AsyncOpenAI and the blocking parts (merging, gTTS fallback)
+        run in worker threads, so the event loop stays free.
+        
         Args:
             text: Text to convert to speech
             audio_format: Output format ("mp3" or "wav")
@@ -44,66 +173,116 @@ class TTSService:
             bytes: Audio file data
         """
         if audio_format not in self.supported_formats:
-            raise ValueError(f"Unsupported audio format: {audio_format}. Supported: {self.supported_formats}")
+            raise ValueError(f"Unsupported audio format: {audio_format}. Supported: {sorted(self.supported_formats)}")
         
         # Try OpenAI TTS first (high quality, multiple voices)
         if settings.OPENAI_API_KEY:
             try:
-                return self._text_to_speech_openai(text, audio_format, use_dialogue)
+                return await self._text_to_speech_openai_async(text, audio_format, use_dialogue)
             except Exception as e:
                 logger.warning(f"OpenAI TTS failed: {e}. Falling back to gTTS.")
         
         # Fallback to gTTS if OpenAI not available
         try:
-            return self._text_to_speech_gtts(text, audio_format, language, slow)
+            return await asyncio.to_thread(self._text_to_speech_gtts, text, audio_format, language, slow)
         except Exception as e:
             logger.error(f"TTS conversion failed: {e}", exc_info=True)
             raise ValueError(f"TTS conversion failed: {str(e)}")
     
-    def _text_to_speech_openai(
-        self, 
-        text: str, 
-        audio_format: str = "mp3",
-        use_dialogue: bool = True
-    ) -> bytes:
-        """Convert text to speech using OpenAI TTS API with dialogue support"""
+    def _has_dialogue(self, text: str, use_dialogue: bool) -> bool:
+        """Check if text contains dialogue markers"""
+        return use_dialogue and ("[Host]" in text or "[Guest]" in text or "Host:" in text or "Guest:" in text)
+    
+    async def text_to_speech_stream(self, text: str, use_dialogue: bool = True) -> AsyncIterator[bytes]:
+        """
+        Stream MP3 audio segment by segment, in dialogue order, as soon as each one is ready
+        
+        All segments are requested up front (bounded by TTS_CONCURRENCY) and read with the SDK's
+        streaming response. The segment being played is forwarded chunk by chunk as OpenAI sends it,
+        later ones are buffered until their turn. MP3 frames are self-synchronizing, so the yielded
+        chunks can be concatenated and played as one stream.
+        """
+        client = self.async_openai_client
+        if client is None:
+            raise ValueError("Streaming TTS requires OPENAI_API_KEY")
+        
+        if self._has_dialogue(text, use_dialogue):
+            jobs = self._segment_jobs(self._parse_dialogue(text))
+        else:
+            jobs = [(0, "Host", text, self.openai_voices["host"], "Host")]
+        
+        async def fill(queue: asyncio.Queue, voice: str, segment_text: str):
+            # Chunks, then None when the segment is complete, or the exception that stopped it
+            started = False
+            try:
+                async for chunk in _stream_speech_async(client, voice, segment_text, "mp3"):
+                    started = True
+                    queue.put_nowait(chunk)
+            except Exception as e:
+                if started:
+                    queue.put_nowait(e)
+                    return
+                # Nothing sent yet, so the retrying non-streaming call can still take over
+                try:
+                    queue.put_nowait(await _speech_audio_async(client, voice, segment_text, "mp3"))
+                except Exception as retry_error:
+                    queue.put_nowait(retry_error)
+                    return
+            queue.put_nowait(None)
+        
+        queues = [asyncio.Queue() for _ in jobs]
+        tasks = [
+            asyncio.create_task(fill(queue, voice, segment_text))
+            for queue, (_, _, segment_text, voice, _) in zip(queues, jobs)
+        ]
         try:
-            from openai import OpenAI
+            pause = None
+            if self._ffmpeg and len(tasks) > 1:
+                pause = self._silence_audio.get("mp3") or await asyncio.to_thread(self._silence_clip_audio, "mp3")
             
-            client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            
-            # Check if text contains dialogue markers
-            has_dialogue = use_dialogue and ("[Host]" in text or "[Guest]" in text or "Host:" in text or "Guest:" in text)
+            sent_any = False
+            # Reading queues in index order buffers segments that arrive early while later ones keep running
+            for (i, speaker, _, _, speaker_label), queue in zip(jobs, queues):
+                segment_started = failed = False
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        failed = True
+                        logger.error(f"✗ Failed to generate audio for segment {i+1} ({speaker}): {item}", exc_info=item)
+                        break
+                    if not item:
+                        continue
+                    if not segment_started:
+                        if sent_any and pause:
+                            yield pause
+                        segment_started = True
+                    yield item
+                    sent_any = True
+                if not segment_started and not failed:
+                    logger.warning(f"Empty audio segment {i+1} for {speaker_label}")
             
-            if has_dialogue:
-                # Parse dialogue and generate with different voices
-                return self._generate_dialogue_audio(client, text, audio_format)
-            else:
-                # Single voice generation
-                response = client.audio.speech.create(
-                    model="tts-1",  # or "tts-1-hd" for higher quality (more expensive)
-                    voice=self.openai_voices["host"],
-                    input=text[:4096],  # OpenAI TTS limit
-                    response_format=audio_format
-                )
-                
-                audio_data = b""
-                for chunk in response.iter_bytes():
-                    audio_data += chunk
-                
-                logger.info(f"Successfully converted {len(text)} characters to {audio_format.upper()} audio using OpenAI TTS")
-                return audio_data
-                
-        except ImportError:
-            raise ValueError("OpenAI library not installed. Install with: pip install openai")
-        except Exception as e:
-            logger.error(f"OpenAI TTS error: {e}", exc_info=True)
-            raise
+            if not sent_any:
+                raise ValueError("No audio segments generated")
+        finally:
+            # Client disconnected or generation failed - don't leave segment requests running
+            for task in tasks:
+                task.cancel()
     
-    def _generate_dialogue_audio(self, client, dialogue_text: str, audio_format: str) -> bytes:
-        """Generate audio with different voices for Host and Guest"""
-        # Parse dialogue into segments
-        dialogue_segments = self._parse_dialogue(dialogue_text)
+    async def _text_to_speech_openai_async(self, text: str, audio_format: str, use_dialogue: bool) -> bytes:
+        """Convert text to speech using OpenAI TTS with dialogue support, requesting segments concurrently"""
+        client = self.async_openai_client
+        if client is None:
+            raise ValueError("OpenAI TTS requires OPENAI_API_KEY")
+        
+        if not self._has_dialogue(text, use_dialogue):
+            # Single voice generation
+            audio_data = await _speech_audio_async(client, self.openai_voices["host"], text, audio_format)
+            logger.info(f"Successfully converted {len(text)} characters to {audio_format.upper()} audio using OpenAI TTS")
+            return audio_data
+        
+        dialogue_segments = self._parse_dialogue(text)
         
         # Debug logging: show what speakers were detected
         speakers_found = [seg["speaker"] for seg in dialogue_segments]
@@ -112,60 +291,36 @@ class TTSService:
         logger.info(f"Parsed {len(dialogue_segments)} dialogue segments: {host_count} Host, {guest_count} Guest")
         if guest_count == 0:
             logger.warning(f"⚠ No Guest segments detected! Speakers found: {set(speakers_found)}")
-            logger.debug(f"First 500 chars of dialogue: {dialogue_text[:500]}")
+            logger.debug(f"First 500 chars of dialogue: {text[:500]}")
         
-        audio_data_list = []
-        
-        for i, segment in enumerate(dialogue_segments):
-            speaker = segment["speaker"]
-            text = segment["text"]
-            
-            if not text.strip():
-                continue
-            
-            # Determine voice based on speaker (case-insensitive, handle variations)
-            speaker_lower = speaker.lower().strip()
-            if speaker_lower in ["host", "host:"] or "host" in speaker_lower:
-                voice = self.openai_voices["host"]
-                speaker_label = "Host"
-            elif speaker_lower in ["guest", "guest:"] or "guest" in speaker_lower:
-                voice = self.openai_voices["guest"]
-                speaker_label = "Guest"
-            else:
-                # Default to host voice if unclear
-                voice = self.openai_voices["host"]
-                speaker_label = "Host"
-                logger.warning(f"Unknown speaker '{speaker}', defaulting to Host voice")
-            
-            # Generate audio for this segment
-            try:
-                response = client.audio.speech.create(
-                    model="tts-1",  # or "tts-1-hd" for higher quality
-                    voice=voice,
-                    input=text[:4096],
-                    response_format=audio_format  # Use requested format directly
-                )
-                
-                segment_audio = b""
-                for chunk in response.iter_bytes():
-                    segment_audio += chunk
-                
-                if segment_audio:
-                    audio_data_list.append(segment_audio)
-                    logger.info(f"✓ Generated audio segment {i+1}/{len(dialogue_segments)} for {speaker_label} ({len(segment_audio)} bytes)")
-                else:
-                    logger.warning(f"Empty audio segment {i+1} for {speaker_label}")
-                
-            except Exception as e:
-                logger.error(f"✗ Failed to generate audio for segment {i+1} ({speaker}): {e}", exc_info=True)
-                continue
+        jobs = self._segment_jobs(dialogue_segments)
+        # Results come back in submission order, keeping the dialogue sequence
+        results = await asyncio.gather(*(
+            self._synthesize_segment_async(client, i, len(dialogue_segments), speaker, segment_text, voice, speaker_label, audio_format)
+            for i, speaker, segment_text, voice, speaker_label in jobs
+        ))
+        audio_data_list = [audio for audio in results if audio]
         
         if not audio_data_list:
             logger.error(f"No audio segments generated from {len(dialogue_segments)} dialogue segments")
             raise ValueError("No audio segments generated")
         
+        # Merging shells out to ffmpeg / decodes PCM, keep it off the event loop
+        return await asyncio.to_thread(self._merge_dialogue_audio, audio_data_list, audio_format)
+    
+    def _merge_dialogue_audio(self, audio_data_list: List[bytes], audio_format: str) -> bytes:
+        """Merge generated segments, trying ffmpeg concat, then pydub, then plain concatenation"""
         logger.info(f"Successfully generated {len(audio_data_list)} audio segments, attempting to merge...")
         
+        # Fastest path: ffmpeg concat demuxer stream-copies the segments without decoding/re-encoding
+        if self._ffmpeg:
+            try:
+                merged_audio = self._concat_with_ffmpeg(audio_data_list, audio_format)
+                logger.info(f"✓ Successfully merged {len(audio_data_list)} segments using ffmpeg concat")
+                return merged_audio
+            except Exception as ffmpeg_error:
+                logger.warning(f"⚠ ffmpeg concat failed: {ffmpeg_error}. Falling back to pydub")
+        
         # Try to merge using pydub if available and ffmpeg is installed
         try:
             merged_audio = self._merge_audio_segments(audio_data_list, audio_format)
@@ -185,15 +340,131 @@ class TTSService:
                 logger.warning(f"⚠ Returning first segment only ({len(audio_data_list[0])} bytes)")
                 return audio_data_list[0]
     
+    def _segment_jobs(self, dialogue_segments: List[dict]) -> List[Tuple[int, str, str, str, str]]:
+        """
+        (index, speaker, text, voice, speaker_label) for every dialogue segment with text
+        
+        Segments with nothing to pronounce (blank or punctuation only) are dropped, and consecutive
+        segments in the same voice are merged into one request, so short acknowledgements and split
+        paragraphs don't each pay a TTS round-trip.
+        """
+        jobs = []
+        for i, segment in enumerate(dialogue_segments):
+            speaker = segment["speaker"]
+            text = segment["text"].strip()
+            
+            if not any(ch.isalnum() for ch in text):
+                continue
+            
+            # Determine voice based on speaker (case-insensitive, handle variations)
+            speaker_lower = speaker.lower().strip()
+            if speaker_lower in ["host", "host:"] or "host" in speaker_lower:
+                voice = self.openai_voices["host"]
+                speaker_label = "Host"
+            elif speaker_lower in ["guest", "guest:"] or "guest" in speaker_lower:
+                voice = self.openai_voices["guest"]
+                speaker_label = "Guest"
+            else:
+                # Default to host voice if unclear
+                voice = self.openai_voices["host"]
+                speaker_label = "Host"
+                logger.warning(f"Unknown speaker '{speaker}', defaulting to Host voice")
+            
+            if jobs and jobs[-1][3] == voice and len(jobs[-1][2]) + 1 + len(text) <= TTS_SEGMENT_MAX_CHARS:
+                prev_index, prev_speaker, prev_text, _, _ = jobs[-1]
+                jobs[-1] = (prev_index, prev_speaker, f"{prev_text} {text}", voice, speaker_label)
+            else:
+                jobs.append((i, speaker, text, voice, speaker_label))
+        
+        return jobs
+    
+    def _silence_clip(self, audio_format: str) -> str:
+        """Path to a pause clip in audio_format, rendered by ffmpeg on first use"""
+        path = self._silence_files.get(audio_format)
+        if path and os.path.exists(path):
+            return path
+        fd, path = tempfile.mkstemp(prefix="tts_silence_", suffix=f".{audio_format}")
+        os.close(fd)
+        subprocess.run(
+            [
+                self._ffmpeg, "-y", "-loglevel", "error",
+                "-f", "lavfi", "-i", f"anullsrc=r={OPENAI_TTS_SAMPLE_RATE}:cl=mono",
+                "-t", str(SEGMENT_PAUSE_SECONDS), path
+            ],
+            check=True,
+            capture_output=True
+        )
+        self._silence_files[audio_format] = path
+        return path
+    
+    def _silence_clip_audio(self, audio_format: str) -> bytes:
+        """Bytes of the pause clip, read from disk once and then served from memory"""
+        audio = self._silence_audio.get(audio_format)
+        if audio is None:
+            with open(self._silence_clip(audio_format), "rb") as f:
+                audio = f.read()
+            self._silence_audio[audio_format] = audio
+        return audio
+    
+    def _concat_with_ffmpeg(self, audio_data_list: List[bytes], audio_format: str) -> bytes:
+        """Merge segments (with pauses) via the ffmpeg concat demuxer and -c copy, no transcoding"""
+        silence_path = self._silence_clip(audio_format)
+        with tempfile.TemporaryDirectory(prefix="tts_concat_") as tmp_dir:
+            entries = []
+            for i, audio_data in enumerate(audio_data_list):
+                segment_path = os.path.join(tmp_dir, f"seg{i}.{audio_format}")
+                with open(segment_path, "wb") as f:
+                    f.write(audio_data)
+                if entries:
+                    entries.append(silence_path)
+                entries.append(segment_path)
+            
+            list_path = os.path.join(tmp_dir, "concat.txt")
+            with open(list_path, "w") as f:
+                f.write("".join(f"file '{path}'\n" for path in entries))
+            
+            output_path = os.path.join(tmp_dir, f"merged.{audio_format}")
+            result = subprocess.run(
+                [
+                    self._ffmpeg, "-y", "-loglevel", "error",
+                    "-f", "concat", "-safe", "0", "-i", list_path,
+                    "-c", "copy", output_path
+                ],
+                capture_output=True
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"ffmpeg exited with {result.returncode}: {result.stderr.decode(errors='replace')[-500:]}")
+            
+            with open(output_path, "rb") as f:
+                return f.read()
+    
+    async def _synthesize_segment_async(
+        self,
+        client,
+        index: int,
+        total: int,
+        speaker: str,
+        text: str,
+        voice: str,
+        speaker_label: str,
+        audio_format: str
+    ) -> Optional[bytes]:
+        """Generate audio for one dialogue segment (None if it failed or came back empty)"""
+        try:
+            segment_audio = await _speech_audio_async(client, voice, text, audio_format)
+            if segment_audio:
+                logger.info(f"✓ Generated audio segment {index+1}/{total} for {speaker_label} ({len(segment_audio)} bytes)")
+                return segment_audio
+            logger.warning(f"Empty audio segment {index+1} for {speaker_label}")
+        except Exception as e:
+            logger.error(f"✗ Failed to generate audio for segment {index+1} ({speaker}): {e}", exc_info=True)
+        return None
+    
     def _merge_audio_segments(self, audio_data_list: List[bytes], audio_format: str) -> bytes:
         """Merge multiple audio segments into one file"""
         try:
-            import warnings
-            # Suppress pydub/ffmpeg warnings
-            warnings.filterwarnings("ignore", category=RuntimeWarning, module="pydub")
-            
+            import numpy as np
             from pydub import AudioSegment
-            from io import BytesIO
             
             # Try to set pydub to use ffmpeg
             try:
@@ -202,31 +473,47 @@ class TTSService:
                 pass
             
             audio_segments = []
+            decoder = getattr(AudioSegment, _AUDIO_DECODERS.get(audio_format, "from_mp3"))
             
             for i, audio_data in enumerate(audio_data_list):
                 try:
                     # Load audio segment
-                    if audio_format == "mp3":
-                        audio_seg = AudioSegment.from_mp3(BytesIO(audio_data))
-                    elif audio_format == "wav":
-                        audio_seg = AudioSegment.from_wav(BytesIO(audio_data))
-                    else:
-                        # Try MP3 as default
-                        audio_seg = AudioSegment.from_mp3(BytesIO(audio_data))
-                    
-                    # Add small pause between speakers (500ms) except for first segment
-                    if audio_segments:
-                        pause = AudioSegment.silent(duration=500)
-                        audio_seg = pause + audio_seg
-                    
-                    audio_segments.append(audio_seg)
+                    audio_segments.append(decoder(BytesIO(audio_data)))
                 except Exception as e:
                     logger.warning(f"Failed to load audio segment {i+1}: {e}. This may require ffmpeg installation.")
                     # If pydub fails, we'll fall back to simple concatenation
                     raise
             
-            # Combine all audio segments
-            combined_audio = sum(audio_segments)
+            # Combine all audio segments into one preallocated PCM sample buffer: adding AudioSegments
+            # pairwise copies the whole growing result for every segment
+            first = audio_segments[0]
+            frame_rate, sample_width, channels = first.frame_rate, first.sample_width, first.channels
+            # 8-bit PCM is unsigned, wider PCM signed; widths numpy has no dtype for (24-bit) become 16-bit
+            sample_dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+            if sample_width not in sample_dtypes:
+                logger.info(f"Converting {sample_width * 8}-bit audio to 16-bit for merging")
+                sample_width = 2
+            sample_dtype = sample_dtypes[sample_width]
+            sample_arrays = [
+                np.frombuffer(
+                    seg.set_frame_rate(frame_rate).set_sample_width(sample_width).set_channels(channels).raw_data,
+                    dtype=sample_dtype
+                )
+                for seg in audio_segments
+            ]
+            # Small pause between speakers (500ms); the buffer starts as silence (128 for unsigned 8-bit,
+            # 0 otherwise), so pauses are just skipped over
+            pause_samples = int(frame_rate * SEGMENT_PAUSE_SECONDS) * channels
+            combined = np.full(
+                sum(len(a) for a in sample_arrays) + pause_samples * (len(sample_arrays) - 1),
+                128 if sample_width == 1 else 0,
+                dtype=sample_dtype
+            )
+            offset = 0
+            for samples in sample_arrays:
+                combined[offset:offset + len(samples)] = samples
+                offset += len(samples) + pause_samples
+            combined_audio = AudioSegment(data=combined.tobytes(), sample_width=sample_width, frame_rate=frame_rate, channels=channels)
             
             # Export in requested format
             output_buffer = BytesIO()
@@ -254,11 +541,10 @@ class TTSService:
     def _parse_dialogue(self, text: str) -> List[dict]:
         """Parse dialogue text into speaker segments"""
         segments = []
-        lines = text.split('\n')
         current_speaker = None
         current_text = []
         
-        for line in lines:
+        for line in text.splitlines():
             line = line.strip()
             if not line:
                 # Empty line - save current segment if any
@@ -270,63 +556,29 @@ class TTSService:
                     current_text = []
                 continue
             
-            # Check for speaker labels: [Host], [Guest], [Host]:, [Guest]:, Host:, Guest:
-            # First check for [Host] or [Guest] on their own line (most common format)
-            if line.startswith('[') and line.endswith(']'):
-                # Format: [Host] or [Guest] on its own line
-                speaker = line.strip('[]').strip()
-                # Save previous segment
+            # Labels always start with "[", "H" or "G"; skip the regex for ordinary text lines
+            match = _SPEAKER_RE.fullmatch(line) if line[0] in "[HG" else None
+            if match:
+                # Save previous segment and start a new one; text is inline or on the next lines
                 if current_speaker and current_text:
                     segments.append({
                         "speaker": current_speaker,
                         "text": " ".join(current_text)
                     })
-                # Start new segment (text will be on next lines)
-                current_speaker = speaker
-                current_text = []
-                
-            elif line.startswith('[') and ']:' in line:
-                # Format: [Host]: text or [Guest]: text (inline format)
-                parts = line.split(']:', 1)
-                speaker = parts[0].strip('[').strip()
-                text_content = parts[1].strip() if len(parts) > 1 else ""
-                
-                # Save previous segment
-                if current_speaker and current_text:
-                    segments.append({
-                        "speaker": current_speaker,
-                        "text": " ".join(current_text)
-                    })
-                
-                # Start new segment
-                current_speaker = speaker
-                current_text = [text_content] if text_content else []
-                
-            elif line.startswith(('Host:', 'Guest:')):
-                # Format: Host: text or Guest: text
-                parts = line.split(':', 1)
-                speaker = parts[0].strip()
-                text_content = parts[1].strip() if len(parts) > 1 else ""
-                
-                # Save previous segment
-                if current_speaker and current_text:
-                    segments.append({
-                        "speaker": current_speaker,
-                        "text": " ".join(current_text)
-                    })
-                
-                # Start new segment
-                current_speaker = speaker
-                current_text = [text_content] if text_content else []
-                
-            else:
-                # Continuation of current speaker's text
-                if current_speaker:
-                    current_text.append(line)
+                if match.group("plain"):
+                    current_speaker = match.group("plain")
+                    text_content = match.group("plain_text")
                 else:
-                    # No speaker identified, treat as host
-                    current_speaker = "Host"
-                    current_text = [line]
+                    current_speaker = match.group("bracket").strip()
+                    text_content = match.group("bracket_text")
+                current_text = [text_content.strip()] if text_content and text_content.strip() else []
+            elif current_speaker:
+                # Continuation of current speaker's text
+                current_text.append(line)
+            else:
+                # No speaker identified, treat as host
+                current_speaker = "Host"
+                current_text = [line]
         
         # Save last segment
         if current_speaker and current_text:
@@ -373,30 +625,25 @@ class TTSService:
     
     def _clean_dialogue_text(self, text: str) -> str:
         """Clean dialogue text for TTS by removing speaker labels and formatting"""
-        lines = text.split('\n')
         cleaned_lines = []
+        append = cleaned_lines.append
         
-        for line in lines:
+        for line in text.splitlines():
             line = line.strip()
             if not line:
                 continue
             
-            # Remove speaker labels like [Host]: or [Guest]:
-            if line.startswith('[') and ']:' in line:
-                # Extract text after the label
-                parts = line.split(']:', 1)
-                if len(parts) > 1:
-                    line = parts[1].strip()
-                else:
-                    # If no text after label, skip this line
-                    continue
+            # Remove speaker labels like [Host]: or [Guest]: (keep the text after the label)
+            if line[0] == '[':
+                match = _SPEAKER_RE.fullmatch(line)
+                if match and match.group("bracket_text") is not None:
+                    line = match.group("bracket_text").strip()
             
             # Skip markdown-style headers or metadata
-            if line.startswith('#') or line.startswith('---') or line.startswith('Note:'):
+            if not line or line.startswith(('#', '---', 'Note:')):
                 continue
             
-            if line:
-                cleaned_lines.append(line)
+            append(line)
         
         # Join with periods for natural pauses
         cleaned_text = '. '.join(cleaned_lines)
@@ -409,13 +656,21 @@ class TTSService:
     
     def _convert_mp3_to_wav(self, mp3_data: bytes) -> bytes:
         """Convert MP3 audio data to WAV format"""
+        # One ffmpeg process decoding pipe-to-pipe, no temp files or pydub AudioSegment in between
+        if self._ffmpeg:
+            try:
+                result = subprocess.run(
+                    [self._ffmpeg, "-loglevel", "error", "-f", "mp3", "-i", "pipe:0", "-f", "wav", "pipe:1"],
+                    input=mp3_data,
+                    capture_output=True,
+                    check=True
+                )
+                return result.stdout
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.warning(f"ffmpeg MP3 to WAV conversion failed: {e}. Trying pydub.")
+        
         try:
-            import warnings
-            # Suppress pydub/ffmpeg warnings
-            warnings.filterwarnings("ignore", category=RuntimeWarning, module="pydub")
-            
             from pydub import AudioSegment
-            from io import BytesIO
             
             # Load MP3 from bytes
             audio = AudioSegment.from_mp3(BytesIO(mp3_data))
@@ -434,7 +689,7 @@ class TTSService:
             # Return MP3 as fallback
             return mp3_data
     
-    def text_to_speech_dialogue(
+    async def text_to_speech_dialogue(
         self,
         text: str,
         audio_format: str = "mp3",
@@ -442,19 +697,19 @@ class TTSService:
         use_dialogue: bool = True
     ) -> bytes:
         """
-        Wrapper for text_to_speech that supports dialogue parsing control.
+        Wrapper for text_to_speech_async that supports dialogue parsing control.
         Use use_dialogue=False for monologue/speech generation (single voice).
         """
-        return self.text_to_speech(text, audio_format, language, slow=False, use_dialogue=use_dialogue)
+        return await self.text_to_speech_async(text, audio_format, language, slow=False, use_dialogue=use_dialogue)
     
-    def text_to_speech_base64(
+    async def text_to_speech_base64(
         self, 
         text: str, 
         audio_format: str = "mp3", 
         language: str = "en"
     ) -> str:
         """Convert text to speech and return as base64 encoded string"""
-        audio_data = self.text_to_speech(text, audio_format, language)
+        audio_data = await self.text_to_speech_async(text, audio_format, language)
         return base64.b64encode(audio_data).decode('utf-8')
 
 # Global instance
@@ -1,5 +1,5 @@
 """Script to create a default admin user"""
-from app.core.database import SessionLocal, Base, engine
+from app.core.database import SessionLocal, Base, engine, insert_ignore
 from app.models import user, document, chat  # Import all models to register relationships
 from app.models.user import User, UserRole
 from app.core.security import get_password_hash
@@ -11,22 +11,25 @@ def create_admin_user():
     """Create default admin user if it doesn't exist"""
     db = SessionLocal()
     try:
-        # Check if admin already exists
-        admin = db.query(User).filter(User.email == "thiachan@pseudo-ai.com").first()
-        if admin:
+        # Cheap lookup first so the bcrypt hash below is only computed when the admin is missing
+        if db.query(User.id).filter(User.email == "thiachan@pseudo-ai.com").first():
             print("Admin user already exists!")
             return
         
-        # Create admin user
-        admin = User(
-            email="thiachan@pseudo-ai.com",
-            hashed_password=get_password_hash("password123"),
-            full_name="Admin User",
-            role=UserRole.ADMIN,
-            is_active=True
+        # INSERT ... ON CONFLICT DO NOTHING covers another process creating it in between
+        result = db.execute(
+            insert_ignore(User, index_elements=["email"]).values(
+                email="thiachan@pseudo-ai.com",
+                hashed_password=get_password_hash("password123"),
+                full_name="Admin User",
+                role=UserRole.ADMIN,
+                is_active=True
+            )
         )
-        db.add(admin)
         db.commit()
+        if result.rowcount == 0:
+            print("Admin user already exists!")
+            return
         print("Admin user created successfully!")
         print("   Email: thiachan@pseudo-ai.com")
         print("   Password: password123")
@@ -1,4 +1,4 @@
-from app.core.database import Base, engine, SessionLocal
+from app.core.database import Base, engine, SessionLocal, insert_ignore
 from app.models import user, document, chat, knowledge_base
 from app.models.user import User, UserRole
 from app.core.security import get_password_hash
@@ -11,9 +11,14 @@ def init_db():
     # Create default admin user if it doesn't exist
     db = SessionLocal()
     try:
-        admin = db.query(User).filter(User.email == "thiachan@pseudo-ai.com").first()
-        if not admin:
-            admin = User(
+        # Cheap lookup first so the bcrypt hash below is only computed when the admin is missing
+        if db.query(User.id).filter(User.email == "thiachan@pseudo-ai.com").first():
+            print("Admin user already exists")
+            return
+        
+        # INSERT ... ON CONFLICT DO NOTHING; safe when several processes initialize at once
+        result = db.execute(
+            insert_ignore(User, index_elements=["email"]).values(
                 email="thiachan@pseudo-ai.com",
                 hashed_password=get_password_hash("password123"),
                 full_name="Admin User",
@@ -21,8 +26,9 @@ def init_db():
                 is_active=True,
                 is_verified=True  # Admin created programmatically, no need to verify
             )
-            db.add(admin)
-            db.commit()
+        )
+        db.commit()
+        if result.rowcount:
             print("Default admin user created!")
             print("   Email: thiachan@pseudo-ai.com")
             print("   Password: password123")
@@ -12,10 +12,11 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import auth, documents, chat, agents, upload, generate, models, knowledge_bases
 from app.core.config import settings
+import asyncio
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (LOG_LEVEL=DEBUG also enables the request logging middleware below)
+logging.basicConfig(level=settings.LOG_LEVEL.upper())
 logger = logging.getLogger(__name__)
 
 # Suppress ChromaDB telemetry errors - these are harmless but cluttering logs
@@ -44,16 +45,33 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Middleware to log Authorization header for debugging
-@app.middleware("http")
+# Middleware to log Authorization header presence for debugging
+# Only registered when DEBUG logging is on, so normal requests skip the extra middleware hop
 async def log_requests(request: Request, call_next):
-    auth_header = request.headers.get("Authorization")
-    if auth_header:
-        logger.info(f"Request to {request.url.path} has Authorization header: {auth_header[:20]}...")
+    if "authorization" in request.headers:
+        logger.debug("Request to %s has Authorization header", request.url.path)
     else:
-        logger.warning(f"Request to {request.url.path} has NO Authorization header")
-    response = await call_next(request)
-    return response
+        logger.debug("Request to %s has NO Authorization header", request.url.path)
+    return await call_next(request)
+
+if logger.isEnabledFor(logging.DEBUG):
+    app.middleware("http")(log_requests)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    from app.services.model_manager import model_manager
+    # Keep the Cisco token fresh so requests don't all hit the OAuth endpoint when it expires
+    app.state.cisco_token_refresher = asyncio.create_task(model_manager.run_cisco_token_refresher())
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    refresher = getattr(app.state, "cisco_token_refresher", None)
+    if refresher is not None:
+        refresher.cancel()
+        try:
+            await refresher
+        except asyncio.CancelledError:
+            pass
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
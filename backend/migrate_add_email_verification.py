@@ -9,6 +9,29 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _migrate_sqlite(conn):
+    """Add the columns on SQLite and backfill is_verified (caller owns the transaction)"""
+    # SQLite migration
+    columns_to_add = [
+        ("is_verified", "BOOLEAN DEFAULT 0"),
+        ("verification_token", "TEXT"),
+        ("verification_token_expires", "DATETIME"),
+        ("reset_token", "TEXT"),
+        ("reset_token_expires", "DATETIME"),
+    ]
+    
+    # SQLite doesn't support IF NOT EXISTS in ALTER TABLE, so skip columns that are already there
+    existing = {row[1] for row in conn.execute(text("PRAGMA table_info(users)"))}
+    for column_name, column_def in columns_to_add:
+        if column_name in existing:
+            logger.warning(f"  Column {column_name} already exists, skipping")
+            continue
+        conn.execute(text(f"ALTER TABLE users ADD COLUMN {column_name} {column_def}"))
+        logger.info(f"✓ Added column: {column_name}")
+    
+    # Set existing users as verified (for backward compatibility)
+    conn.execute(text("UPDATE users SET is_verified = 1 WHERE is_verified IS NULL"))
+
 def migrate_database():
     """Add email verification and password reset columns to users table"""
     db = SessionLocal()
@@ -21,38 +44,20 @@ def migrate_database():
         
         logger.info(f"Database type: {'SQLite' if is_sqlite else 'PostgreSQL' if is_postgres else 'Unknown'}")
         
+        # All ALTERs and the backfill run in one transaction with a single commit,
+        # so the users table is locked once and a failure leaves it untouched
         if is_sqlite:
-            # SQLite migration
-            columns_to_add = [
-                ("is_verified", "BOOLEAN DEFAULT 0"),
-                ("verification_token", "TEXT"),
-                ("verification_token_expires", "DATETIME"),
-                ("reset_token", "TEXT"),
-                ("reset_token_expires", "DATETIME"),
-            ]
-            
-            for column_name, column_def in columns_to_add:
+            # pysqlite doesn't open a transaction before DDL (each ALTER would commit on its own),
+            # so take over transaction control and issue BEGIN/COMMIT explicitly
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.exec_driver_sql("BEGIN")
                 try:
-                    # SQLite doesn't support IF NOT EXISTS in ALTER TABLE
-                    # So we'll try to add and catch error if exists
-                    db.execute(text(f"ALTER TABLE users ADD COLUMN {column_name} {column_def}"))
-                    db.commit()
-                    logger.info(f"✓ Added column: {column_name}")
-                except Exception as e:
-                    if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
-                        logger.warning(f"  Column {column_name} already exists, skipping")
-                    else:
-                        logger.error(f"  Error adding {column_name}: {e}")
-                        db.rollback()
-            
-            # Set existing users as verified (for backward compatibility)
-            try:
-                db.execute(text("UPDATE users SET is_verified = 1 WHERE is_verified IS NULL"))
-                db.commit()
-                logger.info("✓ Set existing users as verified")
-            except Exception as e:
-                logger.warning(f"  Could not update existing users: {e}")
-                db.rollback()
+                    _migrate_sqlite(conn)
+                    conn.exec_driver_sql("COMMIT")
+                except Exception:
+                    conn.exec_driver_sql("ROLLBACK")
+                    raise
+            logger.info("✓ Set existing users as verified")
         
         elif is_postgres:
             # PostgreSQL migration
@@ -64,23 +69,18 @@ def migrate_database():
                 ("reset_token_expires", "TIMESTAMP"),
             ]
             
-            for column_name, column_def in columns_to_add:
-                try:
-                    db.execute(text(f"ALTER TABLE users ADD COLUMN IF NOT EXISTS {column_name} {column_def}"))
-                    db.commit()
-                    logger.info(f"✓ Added column: {column_name}")
-                except Exception as e:
-                    logger.error(f"  Error adding {column_name}: {e}")
-                    db.rollback()
+            # One ALTER with several ADD COLUMNs: a single lock and at most one table rewrite
+            add_columns = ", ".join(
+                f"ADD COLUMN IF NOT EXISTS {column_name} {column_def}"
+                for column_name, column_def in columns_to_add
+            )
+            db.execute(text(f"ALTER TABLE users {add_columns}"))
+            logger.info(f"✓ Ensured columns: {', '.join(name for name, _ in columns_to_add)}")
             
             # Set existing users as verified
-            try:
-                db.execute(text("UPDATE users SET is_verified = TRUE WHERE is_verified IS NULL"))
-                db.commit()
-                logger.info("✓ Set existing users as verified")
-            except Exception as e:
-                logger.warning(f"  Could not update existing users: {e}")
-                db.rollback()
+            db.execute(text("UPDATE users SET is_verified = TRUE WHERE is_verified IS NULL"))
+            db.commit()
+            logger.info("✓ Set existing users as verified")
         
         else:
             logger.error("Unsupported database type. Please migrate manually.")
@@ -0,0 +1,42 @@
+"""
+Disk cache for slow-changing remote listings (HeyGen avatars/voices) shared by the scripts
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+
+CACHE_DIR = Path.home() / ".cache" / "heygen"
+
+# Catalogs change on the order of days
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def _account_tag() -> str:
+    """Short hash of the configured HeyGen URL and key, so switching accounts doesn't reuse another's catalog"""
+    return hashlib.sha256(f"{settings.HEYGEN_API_URL}\0{settings.HEYGEN_API_KEY}".encode()).hexdigest()[:16]
+
+
+async def cached_fetch(name: str, ttl: float, fetcher: Callable[[], Awaitable[Any]], refresh: bool = False) -> Any:
+    """Return the JSON cached under name if younger than ttl seconds, otherwise await fetcher() and cache it"""
+    path = CACHE_DIR / f"{name}-{_account_tag()}.json"
+    if not refresh:
+        try:
+            if time.time() - path.stat().st_mtime < ttl:
+                return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pass  # Missing or unreadable cache: fetch fresh
+
+    data = await fetcher()
+    # Empty results usually mean the request failed; don't pin them for a whole TTL
+    if data:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data), encoding="utf-8")
+        except OSError:
+            pass
+    return data
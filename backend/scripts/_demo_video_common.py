@@ -0,0 +1,107 @@
+"""
+Helpers shared by the demo video document scripts
+(enhance_demo_videos_comprehensive.py and improve_demo_videos.py)
+"""
+
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict
+
+from docx import Document as DocxDocument
+from docx.oxml.ns import qn
+
+
+# Patterns compiled once at import; these run for every document processed
+# One alternation covers watch, embed and short links, with or without scheme, in a single scan
+YT_UNION_RE = re.compile(
+    r'(?:https?://)?(?:www\.)?(?:youtube\.com/(?:watch\?v=|embed/)|youtu\.be/)([a-zA-Z0-9_-]+)',
+    re.IGNORECASE
+)
+_DEMO_SUFFIX_RE = re.compile(r'\s*demo\s*video\s*$', re.IGNORECASE)
+
+# Section headers the content builders emit; rendered as Heading 1
+SECTION_HEADERS = frozenset({'OVERVIEW', 'KEY FEATURES', 'DEMO VIDEO', 'SUMMARY'})
+
+# Lines rendered bold in the generated docx
+EMPHASIS_RE = re.compile(r'demo video:|source:', re.IGNORECASE)
+
+# Text-bearing run children, read straight from the XML
+_W_P = qn('w:p')
+_W_R = qn('w:r')
+_W_HYPERLINK = qn('w:hyperlink')
+_W_T = qn('w:t')
+_W_TAB = qn('w:tab')
+_W_BR = qn('w:br')
+_W_CR = qn('w:cr')
+_W_PTAB = qn('w:ptab')
+_W_NO_BREAK_HYPHEN = qn('w:noBreakHyphen')
+_W_TYPE = qn('w:type')
+
+
+def read_docx_text(path: str) -> str:
+    """
+    Text of a .docx, one line per body paragraph (same as joining doc.paragraphs' text)
+    
+    Walks the lxml tree directly instead of building python-docx Paragraph/Run objects. Like
+    Paragraph.text, only the paragraph's own runs (direct or inside a hyperlink) are read, so
+    text boxes and other nested content are left out.
+    """
+    body = DocxDocument(path).element.body
+    paragraphs = []
+    for p in body.iterchildren(_W_P):
+        parts = []
+        for child in p.iterchildren(_W_R, _W_HYPERLINK):
+            runs = child.iterchildren(_W_R) if child.tag == _W_HYPERLINK else (child,)
+            for run in runs:
+                for el in run.iterchildren():
+                    tag = el.tag
+                    if tag == _W_T:
+                        parts.append(el.text or '')
+                    elif tag == _W_TAB or tag == _W_PTAB:
+                        parts.append('\t')
+                    elif tag == _W_NO_BREAK_HYPHEN:
+                        parts.append('-')
+                    elif tag == _W_CR or (tag == _W_BR and el.get(_W_TYPE) in (None, 'textWrapping')):
+                        # Line breaks; page/column breaks carry no text
+                        parts.append('\n')
+        paragraphs.append(''.join(parts))
+    return '\n'.join(paragraphs)
+
+
+def extract_youtube_links(text: str) -> List[Dict[str, str]]:
+    """Extract YouTube links from text"""
+    links = []
+    seen_ids = set()
+    
+    for match in YT_UNION_RE.finditer(text):
+        video_id = match.group(1)
+        if video_id not in seen_ids:
+            seen_ids.add(video_id)
+            url = f"https://www.youtube.com/watch?v={video_id}"
+            links.append({"video_id": video_id, "url": url})
+    
+    return links
+
+
+@lru_cache(maxsize=512)
+def extract_title_from_filename(filename: str) -> str:
+    """Extract a readable title from filename"""
+    name = Path(filename).stem
+    # Replace underscores with spaces
+    name = name.replace('_', ' ')
+    # Remove 'demo-video' suffix
+    name = _DEMO_SUFFIX_RE.sub('', name)
+    # Clean up multiple spaces
+    name = ' '.join(name.split())
+    return name.strip()
+
+
+def list_docx_files(directory: Path) -> List[Path]:
+    """.docx files in directory, skipping Word's ~$ lock files (names come from scandir, no per-entry stat)"""
+    with os.scandir(directory) as entries:
+        return [
+            Path(entry.path) for entry in entries
+            if entry.name.endswith('.docx') and not entry.name.startswith('~$') and entry.is_file(follow_symlinks=False)
+        ]
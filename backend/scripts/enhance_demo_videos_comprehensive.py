@@ -9,12 +9,22 @@ Comprehensive script to enhance demo video documents:
 
 import os
 import sys
+import logging
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache
+from io import BytesIO
+from itertools import repeat
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Errors (with tracebacks) go through logging so they can be routed to a file; configured at
+# import so worker processes get it too
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 try:
     from docx import Document as DocxDocument
     from docx.shared import Pt, RGBColor
@@ -23,6 +33,20 @@ except ImportError:
     print("ERROR: python-docx not installed. Install it with: pip install python-docx")
     sys.exit(1)
 
+from scripts._demo_video_common import (
+    EMPHASIS_RE,
+    SECTION_HEADERS,
+    extract_title_from_filename,
+    extract_youtube_links,
+    list_docx_files,
+    read_docx_text,
+)
+
+
+# Shared run colors (RGBColor is immutable), instead of one per line
+_GRAY = RGBColor(100, 100, 100)  # Metadata
+_LINK_BLUE = RGBColor(0, 102, 204)  # Links
+
 
 # Category mappings for consistent tagging
 CATEGORY_MAPPINGS = {
@@ -45,68 +69,82 @@ PRODUCT_MAPPINGS = {
 }
 
 
-def extract_category_from_filename(filename: str) -> Tuple[str, List[str]]:
-    """Extract category and tags from filename"""
-    name_lower = filename.lower()
+# Category rules in priority order: (keywords that must all appear, category, tags)
+_CATEGORY_RULES = (
+    ({'dc', 'edge'}, "DC Edge", ['DC Edge', 'Data Center Edge', 'Edge Security']),
+    ({'cloud', 'edge'}, "Cloud Edge", ['Cloud Edge', 'Cloud Security', 'Edge Security']),
+    ({'zone', 'seg'}, "Zone Segmentation", ['Zone Segmentation', 'Segmentation', 'Network Segmentation']),
+    ({'macro', 'micro'}, "Macro/Micro Segmentation", ['Macro Segmentation', 'Micro Segmentation', 'Segmentation']),
+    ({'smart', 'switch'}, "Smart Switch", ['Smart Switch', 'L4 Switch', 'Switch']),
+    ({'ai', 'model'}, "AI Model Protection", ['AI Model Protection', 'AI Security', 'Model Protection']),
+)
+
+# Product/feature tags, added for any matching keyword, in this order
+KW_TAGS = (
+    ({'snort'}, ['SnortML', 'Zero Day Threat Defense', 'Machine Learning']),
+    ({'eve'}, ['EVE', 'Encrypted Visibility Engine']),
+    ({'aiops'}, ['AIOps', 'Security Cloud Control', 'SCC']),
+    ({'rtc'}, ['RTC', 'Rapid Threat Containment']),
+    ({'sgt', 'tag'}, ['SGT', 'Security Group Tags', 'Tag-based Policy']),
+    ({'hypershield'}, ['Hypershield', 'L4 Segmentation']),
+    ({'l4'}, ['L4 Switch', 'Layer 4']),
+    ({'mcd'}, ['MCD', 'Automated Cloud Security Orchestration']),
+)
+
+# Any product keyword at all; most filenames have none, so the tag table is skipped for them
+_PRODUCT_KEYWORDS = frozenset(kw for kws, _ in KW_TAGS for kw in kws)
+
+# Keywords that contain a shorter keyword at the same position; the lookahead only reports
+# the longest alternative there, so the shorter one is added back
+_KW_IMPLIES = {'snortml': 'snort', 'aiops': 'ai'}
+
+# Every keyword as a substring match (like `in`), overlapping hits included, in one scan
+_KW_RE = re.compile('(?=(%s))' % '|'.join(sorted(
+    {kw for kws, *_ in _CATEGORY_RULES + KW_TAGS for kw in kws} | set(_KW_IMPLIES),
+    key=len, reverse=True
+)), re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def extract_category_from_filename(filename: str) -> Tuple[str, Tuple[str, ...]]:
+    """Extract category and tags from filename (cached; tags come back as a tuple so they can't be mutated)"""
+    hits = {hit.lower() for hit in _KW_RE.findall(filename)}
+    hits.update(_KW_IMPLIES[kw] for kw in hits & _KW_IMPLIES.keys())
     tags = []
     category = ""
     
     # Determine category
-    if 'dc' in name_lower and 'edge' in name_lower:
-        category = "DC Edge"
-        tags.extend(['DC Edge', 'Data Center Edge', 'Edge Security'])
-    elif 'cloud' in name_lower and 'edge' in name_lower:
-        category = "Cloud Edge"
-        tags.extend(['Cloud Edge', 'Cloud Security', 'Edge Security'])
-    elif 'zone' in name_lower and 'seg' in name_lower:
-        category = "Zone Segmentation"
-        tags.extend(['Zone Segmentation', 'Segmentation', 'Network Segmentation'])
-    elif 'macro' in name_lower and 'micro' in name_lower:
-        category = "Macro/Micro Segmentation"
-        tags.extend(['Macro Segmentation', 'Micro Segmentation', 'Segmentation'])
-    elif 'smart' in name_lower and 'switch' in name_lower:
-        category = "Smart Switch"
-        tags.extend(['Smart Switch', 'L4 Switch', 'Switch'])
-    elif 'ai' in name_lower and 'model' in name_lower:
-        category = "AI Model Protection"
-        tags.extend(['AI Model Protection', 'AI Security', 'Model Protection'])
+    for required, rule_category, rule_tags in _CATEGORY_RULES:
+        if required <= hits:
+            category = rule_category
+            tags.extend(rule_tags)
+            break
     
     # Extract product/feature tags
-    if 'snortml' in name_lower or 'snort' in name_lower:
-        tags.extend(['SnortML', 'Zero Day Threat Defense', 'Machine Learning'])
-    if 'eve' in name_lower:
-        tags.extend(['EVE', 'Encrypted Visibility Engine'])
-    if 'aiops' in name_lower:
-        tags.extend(['AIOps', 'Security Cloud Control', 'SCC'])
-    if 'rtc' in name_lower:
-        tags.extend(['RTC', 'Rapid Threat Containment'])
-    if 'sgt' in name_lower or 'tag' in name_lower:
-        tags.extend(['SGT', 'Security Group Tags', 'Tag-based Policy'])
-    if 'hypershield' in name_lower:
-        tags.extend(['Hypershield', 'L4 Segmentation'])
-    if 'l4' in name_lower:
-        tags.extend(['L4 Switch', 'Layer 4'])
-    if 'mcd' in name_lower:
-        tags.extend(['MCD', 'Automated Cloud Security Orchestration'])
+    if hits & _PRODUCT_KEYWORDS:
+        for keywords, kw_tags in KW_TAGS:
+            if keywords & hits:
+                tags.extend(kw_tags)
     
     # Add demo video tag
     tags.append('Demo Video')
     
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_tags = []
+    # Remove duplicates (case-insensitive) while preserving order and first spelling
+    unique_tags = {}
     for tag in tags:
-        if tag.lower() not in seen:
-            seen.add(tag.lower())
-            unique_tags.append(tag)
+        unique_tags.setdefault(tag.lower(), tag)
     
-    return category, unique_tags
+    return category, tuple(unique_tags.values())
+
+
+# "demo" or "video" as a whole word, where words are split on whitespace and underscores
+_HAS_DEMO_VIDEO_RE = re.compile(r'(?:^|[_\s])(?:demo|video)(?=[_\s]|$)', re.IGNORECASE)
 
 
 def improve_filename(filename: str) -> Optional[str]:
     """Suggest filename improvements"""
-    name = Path(filename).stem
-    ext = Path(filename).suffix
+    path = Path(filename)
+    name = path.stem
     
     # Check if filename follows best practices
     issues = []
@@ -116,8 +154,8 @@ def improve_filename(filename: str) -> Optional[str]:
         issues.append("Contains spaces - should use underscores")
     
     # Check for proper structure
-    parts = name.replace('_', ' ').lower().split()
-    if 'demo' not in parts and 'video' not in parts:
+    missing_demo_video = not _HAS_DEMO_VIDEO_RE.search(name)
+    if missing_demo_video:
         issues.append("Missing 'demo-video' suffix")
     
     # Check length
@@ -128,218 +166,261 @@ def improve_filename(filename: str) -> Optional[str]:
         # Suggest improvement
         improved = name
         # Ensure demo-video suffix
-        if 'demo' not in parts and 'video' not in parts:
+        if missing_demo_video:
             improved = f"{improved}_demo-video"
         
-        return f"{improved}{ext}"
+        return f"{improved}{path.suffix}"
     
     return None  # No improvement needed
 
 
-def extract_youtube_links(text: str) -> List[Dict[str, str]]:
-    """Extract YouTube links from text"""
-    patterns = [
-        r'https?://(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]+)',
-        r'https?://(?:www\.)?youtu\.be/([a-zA-Z0-9_-]+)',
-        r'https?://(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]+)',
-        r'youtube\.com/watch\?v=([a-zA-Z0-9_-]+)',
-        r'youtu\.be/([a-zA-Z0-9_-]+)',
-    ]
-    
-    links = []
-    seen_ids = set()
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            video_id = match.group(1)
-            if video_id not in seen_ids:
-                seen_ids.add(video_id)
-                url = f"https://www.youtube.com/watch?v={video_id}"
-                links.append({"video_id": video_id, "url": url})
-    
-    return links
-
-
-def extract_title_from_filename(filename: str) -> str:
-    """Extract a readable title from filename"""
-    name = Path(filename).stem
-    # Replace underscores with spaces
-    name = name.replace('_', ' ')
-    # Remove 'demo-video' suffix
-    name = re.sub(r'\s*demo\s*video\s*$', '', name, flags=re.IGNORECASE)
-    # Clean up multiple spaces
-    name = ' '.join(name.split())
-    return name.strip()
-
-
-def enhance_document_content(original_text: str, filename: str, category: str, tags: List[str]) -> str:
-    """Enhance document content with proper structure and tags"""
-    lines = original_text.split('\n')
-    youtube_links = extract_youtube_links(original_text)
+# Section keywords; "key features" is covered by "features"
+_SECTION_RE = re.compile(r'overview|introduction|features|capabilities|demo video|summary|conclusion', re.IGNORECASE)
+
+# Sections preserved from the original text: (keywords that start it, keywords that end it).
+# A section starts at its first header line, and later headers of the same kind are skipped.
+_SECTION_BOUNDS = {
+    'overview': ({'overview', 'introduction'}, {'features', 'demo video', 'summary'}),
+    'features': ({'features', 'capabilities'}, {'demo video', 'summary', 'overview'}),
+    'summary': ({'summary', 'conclusion'}, set()),  # runs to the end of the document
+}
+
+
+def extract_sections(lines: List[str]) -> Dict[str, List[str]]:
+    """Collect overview/features/summary lines from the original text in a single pass"""
+    sections = {name: [] for name in _SECTION_BOUNDS}
+    state = dict.fromkeys(_SECTION_BOUNDS)  # None = not reached, True = collecting, False = finished
+    for line in lines:
+        hits = {hit.lower() for hit in _SECTION_RE.findall(line)}
+        has_text = bool(line.strip())
+        for name, (starts, stops) in _SECTION_BOUNDS.items():
+            if state[name] is False:
+                continue
+            if hits & starts:
+                state[name] = True
+            elif state[name] and has_text:
+                if hits & stops:
+                    state[name] = False
+                else:
+                    sections[name].append(line)
+    return sections
+
+
+def _classify_line(line: str) -> Tuple[str, str]:
+    """(kind, text) for a line whose content isn't known up front (copied from the source or built from the filename)"""
+    line = line.strip()
+    if not line:
+        return ('blank', '')
+    if line in SECTION_HEADERS:
+        return ('header', line)
+    if line.startswith('TAGS:'):
+        return ('tags', line)
+    if line.startswith('-'):
+        return ('bullet', line[1:].strip())
+    if EMPHASIS_RE.search(line):
+        return ('bold', line)
+    if 'youtube.com' in line or 'youtu.be' in line:
+        return ('link', line)
+    return ('para', line)
+
+
+_BLANK = ('blank', '')
+
+
+def enhance_document_content(
+    lines: List[str],
+    filename: str,
+    category: str,
+    tags: Sequence[str],
+    youtube_links: List[Dict[str, str]]
+) -> List[Tuple[str, str]]:
+    """
+    Enhance document content with proper structure and tags
+    
+    Returned as (kind, text) lines; fixed lines are tagged here and only lines with
+    variable content are classified, so the docx writer just dispatches on kind.
+    """
+    sections = extract_sections(lines)
     title = extract_title_from_filename(filename)
     
     enhanced_lines = []
     
     # Title with category
     if category:
-        enhanced_lines.append(f"{category} | {title}")
+        enhanced_lines.append(_classify_line(f"{category} | {title}"))
     else:
-        enhanced_lines.append(title)
-    enhanced_lines.append("")
+        enhanced_lines.append(_classify_line(title))
+    enhanced_lines.append(_BLANK)
     
     # Add tags as metadata (for RAG to find)
     if tags:
-        enhanced_lines.append("TAGS: " + ", ".join(tags))
-        enhanced_lines.append("")
+        enhanced_lines.append(('tags', "TAGS: " + ", ".join(tags)))
+        enhanced_lines.append(_BLANK)
     
     # Overview section
-    enhanced_lines.append("OVERVIEW")
-    enhanced_lines.append("")
+    enhanced_lines.append(('header', "OVERVIEW"))
+    enhanced_lines.append(_BLANK)
     
     # Try to preserve existing overview
-    overview_content = []
-    in_overview = False
-    for i, line in enumerate(lines):
-        if any(keyword in line.lower() for keyword in ['overview', 'introduction']):
-            in_overview = True
-            continue
-        if in_overview and line.strip():
-            if any(keyword in line.lower() for keyword in ['key features', 'features', 'demo video', 'summary']):
-                break
-            overview_content.append(line)
-    
+    overview_content = sections['overview']
     if overview_content:
-        enhanced_lines.extend(overview_content)
+        enhanced_lines.extend(map(_classify_line, overview_content))
     else:
         # Create overview with category and tags
-        enhanced_lines.append(f"This document provides comprehensive information about {title}.")
+        enhanced_lines.append(_classify_line(f"This document provides comprehensive information about {title}."))
         if category:
-            enhanced_lines.append(f"It is part of the {category} solution portfolio.")
-        enhanced_lines.append("")
+            enhanced_lines.append(('para', f"It is part of the {category} solution portfolio."))
+        enhanced_lines.append(_BLANK)
     
-    enhanced_lines.append("")
-    enhanced_lines.append("KEY FEATURES")
-    enhanced_lines.append("")
+    enhanced_lines.append(_BLANK)
+    enhanced_lines.append(('header', "KEY FEATURES"))
+    enhanced_lines.append(_BLANK)
     
     # Try to preserve existing features
-    features_content = []
-    in_features = False
-    for i, line in enumerate(lines):
-        if any(keyword in line.lower() for keyword in ['key features', 'features', 'capabilities']):
-            in_features = True
-            continue
-        if in_features and line.strip():
-            if any(keyword in line.lower() for keyword in ['demo video', 'summary', 'overview']):
-                break
-            features_content.append(line)
-    
+    features_content = sections['features']
     if features_content:
-        enhanced_lines.extend(features_content)
+        enhanced_lines.extend(map(_classify_line, features_content))
     else:
-        enhanced_lines.append("Key features and capabilities will be detailed here.")
-        enhanced_lines.append("")
+        enhanced_lines.append(('para', "Key features and capabilities will be detailed here."))
+        enhanced_lines.append(_BLANK)
     
-    enhanced_lines.append("")
-    enhanced_lines.append("DEMO VIDEO")
-    enhanced_lines.append("")
+    enhanced_lines.append(_BLANK)
+    enhanced_lines.append(('header', "DEMO VIDEO"))
+    enhanced_lines.append(_BLANK)
     
     # Add video links with context
     if youtube_links:
         for link in youtube_links:
-            enhanced_lines.append(f"Watch the demonstration video to see {title} in action:")
-            enhanced_lines.append("")
-            enhanced_lines.append(f"Demo Video: {link['url']}")
-            enhanced_lines.append("")
-            enhanced_lines.append("This video demonstrates:")
-            enhanced_lines.append("- Key features and capabilities")
-            enhanced_lines.append("- Real-world use cases and scenarios")
-            enhanced_lines.append("- Integration and deployment options")
-            enhanced_lines.append("- Best practices and recommendations")
-            enhanced_lines.append("")
+            enhanced_lines.append(_classify_line(f"Watch the demonstration video to see {title} in action:"))
+            enhanced_lines.append(_BLANK)
+            enhanced_lines.append(('bold', f"Demo Video: {link['url']}"))
+            enhanced_lines.append(_BLANK)
+            enhanced_lines.append(('para', "This video demonstrates:"))
+            enhanced_lines.append(('bullet', "Key features and capabilities"))
+            enhanced_lines.append(('bullet', "Real-world use cases and scenarios"))
+            enhanced_lines.append(('bullet', "Integration and deployment options"))
+            enhanced_lines.append(('bullet', "Best practices and recommendations"))
+            enhanced_lines.append(_BLANK)
     else:
-        enhanced_lines.append("Demo Video: [YouTube link will be added here]")
-        enhanced_lines.append("")
+        enhanced_lines.append(('bold', "Demo Video: [YouTube link will be added here]"))
+        enhanced_lines.append(_BLANK)
     
-    enhanced_lines.append("SUMMARY")
-    enhanced_lines.append("")
+    enhanced_lines.append(('header', "SUMMARY"))
+    enhanced_lines.append(_BLANK)
     
     # Try to preserve existing summary
-    summary_content = []
-    in_summary = False
-    for i, line in enumerate(lines):
-        if 'summary' in line.lower() or 'conclusion' in line.lower():
-            in_summary = True
-            continue
-        if in_summary and line.strip():
-            summary_content.append(line)
-    
+    summary_content = sections['summary']
     if summary_content:
-        enhanced_lines.extend(summary_content)
+        enhanced_lines.extend(map(_classify_line, summary_content))
     else:
-        enhanced_lines.append(f"{title} provides advanced capabilities for modern network security.")
+        enhanced_lines.append(_classify_line(f"{title} provides advanced capabilities for modern network security."))
         if category:
-            enhanced_lines.append(f"As part of the {category} solution, it enables organizations to enhance their security posture.")
-        enhanced_lines.append("")
+            enhanced_lines.append(('para', f"As part of the {category} solution, it enables organizations to enhance their security posture."))
+        enhanced_lines.append(_BLANK)
     
     # Add source line with tags
     if youtube_links:
         source_url = youtube_links[0]['url']
         tag_str = ", ".join(tags[:3]) if tags else ""
-        enhanced_lines.append("")
+        enhanced_lines.append(_BLANK)
         if tag_str:
-            enhanced_lines.append(f"Source: {title} | Tags: {tag_str} | {source_url}")
+            enhanced_lines.append(('bold', f"Source: {title} | Tags: {tag_str} | {source_url}"))
         else:
-            enhanced_lines.append(f"Source: {title} | {source_url}")
+            enhanced_lines.append(('bold', f"Source: {title} | {source_url}"))
     
-    return '\n'.join(enhanced_lines)
+    return enhanced_lines
+
+
+def _add_run_paragraph(doc, text: str, bold: bool = False, italic: bool = False, color=None):
+    """Paragraph holding a single formatted run"""
+    run = doc.add_paragraph().add_run(text)
+    if bold:
+        run.bold = True
+    if italic:
+        run.italic = True
+    if color is not None:
+        run.font.color.rgb = color
 
 
-def create_enhanced_docx(original_path: Path, enhanced_content: str, output_dir: Path, tags: List[str]):
-    """Create an enhanced .docx file with proper formatting"""
+def create_enhanced_docx(
+    original_path: Path,
+    enhanced_lines: List[Tuple[str, str]],
+    output_dir: Path,
+    tags: Sequence[str]
+) -> Tuple[Path, bytes]:
+    """Build an enhanced .docx with proper formatting; returns its output path and bytes for the caller to write"""
     doc = DocxDocument()
-    
-    lines = enhanced_content.split('\n')
-    
-    for line in lines:
-        line = line.strip()
+    # Resolve styles once per document rather than by name for every paragraph
+    heading_style = doc.styles['Heading 1']
+    bullet_style = doc.styles['List Bullet']
+    
+    emit = {
+        'blank': lambda text: doc.add_paragraph(),
+        'header': lambda text: doc.add_paragraph(text, style=heading_style),  # Section headers
+        'tags': lambda text: _add_run_paragraph(doc, text, italic=True, color=_GRAY),  # Tags line
+        'bullet': lambda text: doc.add_paragraph(text, style=bullet_style),  # Bullet points
+        'bold': lambda text: _add_run_paragraph(doc, text, bold=True),  # Important lines (Demo Video, Source)
+        'link': lambda text: _add_run_paragraph(doc, text, bold=True, color=_LINK_BLUE),  # YouTube links
+        'para': lambda text: doc.add_paragraph(text),  # Regular paragraphs
+    }
+    for kind, text in enhanced_lines:
+        emit[kind](text)
+    
+    # Serialize (zip) here; the disk write happens on main()'s writer threads
+    output_path = output_dir / original_path.name
+    buffer = BytesIO()
+    doc.save(buffer)
+    return output_path, buffer.getvalue()
+
+
+def _process_one(path_str: str, output_dir_str: str) -> dict:
+    """Enhance a single document (runs in a worker process); progress lines are returned, not printed"""
+    docx_file = Path(path_str)
+    log = [f"Processing: {docx_file.name}"]
+    result = {"name": docx_file.name, "log": log, "tags": None, "suggestion": None, "output": None}
+    try:
+        # Read document
+        original_text = read_docx_text(path_str)
         
-        if not line:
-            doc.add_paragraph()
-            continue
+        if not original_text.strip():
+            log.append(f"  ⚠️  Warning: Document appears empty, skipping...")
+            return result
         
-        # Section headers
-        if line.isupper() and len(line) > 3 and not line.startswith('HTTP') and 'TAGS:' not in line:
-            p = doc.add_paragraph(line)
-            p.style = 'Heading 1'
-        # Tags line
-        elif line.startswith('TAGS:'):
-            p = doc.add_paragraph()
-            run = p.add_run(line)
-            run.italic = True
-            run.font.color.rgb = RGBColor(100, 100, 100)  # Gray for metadata
-        # Bullet points
-        elif line.startswith('-'):
-            p = doc.add_paragraph(line[1:].strip(), style='List Bullet')
-        # Important lines (Demo Video, Source)
-        elif any(keyword in line.lower() for keyword in ['demo video:', 'source:']):
-            p = doc.add_paragraph()
-            run = p.add_run(line)
-            run.bold = True
-        # YouTube links
-        elif 'youtube.com' in line or 'youtu.be' in line:
-            p = doc.add_paragraph()
-            run = p.add_run(line)
-            run.font.color.rgb = RGBColor(0, 102, 204)  # Blue for links
-            run.bold = True
-        # Regular paragraphs
+        # Extract category and tags
+        category, tags = extract_category_from_filename(docx_file.name)
+        result["tags"] = tags
+        
+        log.append(f"  Category: {category or 'Not identified'}")
+        log.append(f"  Tags: {', '.join(tags[:5])}{'...' if len(tags) > 5 else ''}")
+        
+        # Check filename
+        suggested_name = improve_filename(docx_file.name)
+        if suggested_name:
+            result["suggestion"] = suggested_name
+            log.append(f"  ⚠️  Filename suggestion: {suggested_name}")
+        
+        # Extract YouTube links
+        youtube_links = extract_youtube_links(original_text)
+        if not youtube_links:
+            log.append(f"  ⚠️  Warning: No YouTube links found")
         else:
-            doc.add_paragraph(line)
-    
-    # Save
-    output_path = output_dir / original_path.name
-    doc.save(str(output_path))
-    return output_path
+            log.append(f"  ✓ Found {len(youtube_links)} YouTube link(s)")
+        
+        # Enhance content
+        enhanced_lines = enhance_document_content(original_text.split('\n'), docx_file.name, category, tags, youtube_links)
+        
+        # Create enhanced document
+        output_path, data = create_enhanced_docx(docx_file, enhanced_lines, Path(output_dir_str), tags)
+        result["output"] = (str(output_path), data)
+        
+        log.append(f"  ✅ Created: {output_path.name}")
+        log.append("")
+        
+    except Exception as e:
+        log.append(f"  ❌ Error: {e}")
+        log.append("")
+        logger.exception(f"Failed to enhance {docx_file.name}")
+    return result
 
 
 def main():
@@ -364,7 +445,7 @@ def main():
     print()
     
     # Process files
-    docx_files = [f for f in demo_videos_dir.glob('*.docx') if not f.name.startswith('~$')]
+    docx_files = list_docx_files(demo_videos_dir)
     
     if not docx_files:
         print("No .docx files found.")
@@ -375,52 +456,25 @@ def main():
     filename_suggestions = {}
     all_tags = {}
     
-    for docx_file in docx_files:
-        try:
-            print(f"Processing: {docx_file.name}")
-            
-            # Read document
-            doc = DocxDocument(str(docx_file))
-            original_text = '\n'.join([para.text for para in doc.paragraphs])
-            
-            if not original_text.strip():
-                print(f"  ⚠️  Warning: Document appears empty, skipping...")
-                continue
-            
-            # Extract category and tags
-            category, tags = extract_category_from_filename(docx_file.name)
-            all_tags[docx_file.name] = tags
-            
-            print(f"  Category: {category or 'Not identified'}")
-            print(f"  Tags: {', '.join(tags[:5])}{'...' if len(tags) > 5 else ''}")
-            
-            # Check filename
-            suggested_name = improve_filename(docx_file.name)
-            if suggested_name:
-                filename_suggestions[docx_file.name] = suggested_name
-                print(f"  ⚠️  Filename suggestion: {suggested_name}")
-            
-            # Extract YouTube links
-            youtube_links = extract_youtube_links(original_text)
-            if not youtube_links:
-                print(f"  ⚠️  Warning: No YouTube links found")
-            else:
-                print(f"  ✓ Found {len(youtube_links)} YouTube link(s)")
-            
-            # Enhance content
-            enhanced_content = enhance_document_content(original_text, docx_file.name, category, tags)
-            
-            # Create enhanced document
-            output_path = create_enhanced_docx(docx_file, enhanced_content, output_dir, tags)
-            
-            print(f"  ✅ Created: {output_path.name}")
-            print()
-            
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
-            import traceback
-            traceback.print_exc()
-            print()
+    # Files are independent (read, transform, write), so process them in parallel;
+    # results come back in input order and each file's output is printed in one block.
+    # Finished documents are written on a small thread pool so disk writes overlap with processing.
+    save_futures = {}
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor, ThreadPoolExecutor(max_workers=4) as save_pool:
+        for result in executor.map(_process_one, [str(f) for f in docx_files], repeat(str(output_dir))):
+            print("\n".join(result["log"]))
+            if result["tags"] is not None:
+                all_tags[result["name"]] = result["tags"]
+            if result["suggestion"]:
+                filename_suggestions[result["name"]] = result["suggestion"]
+            if result["output"]:
+                path_str, data = result["output"]
+                save_futures[save_pool.submit(Path(path_str).write_bytes, data)] = result["name"]
+        
+        wait(save_futures)
+    for future, name in save_futures.items():
+        if future.exception():
+            print(f"❌ Error saving {name}: {future.exception()}")
     
     # Summary
     print("=" * 70)
@@ -4,15 +4,24 @@ Script to improve demo video documents according to the format guide.
 Reads existing .docx files, improves their structure, and saves improved versions.
 """
 
+import logging
 import os
 import sys
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from io import BytesIO
+from itertools import repeat
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Errors (with tracebacks) go through logging so they can be routed to a file; configured at
+# import so worker processes get it too
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 try:
     from docx import Document as DocxDocument
     from docx.shared import Pt, RGBColor
@@ -21,51 +30,73 @@ except ImportError:
     print("ERROR: python-docx not installed. Install it with: pip install python-docx")
     sys.exit(1)
 
+from scripts._demo_video_common import (
+    EMPHASIS_RE,
+    SECTION_HEADERS,
+    extract_title_from_filename,
+    extract_youtube_links,
+    list_docx_files,
+    read_docx_text,
+)
+
+
+# Shared run color (RGBColor is immutable), instead of one per line
+_LINK_BLUE = RGBColor(0, 102, 204)  # Links
+
+
+# Section keywords; "feature"/"capability" also cover plurals
+_SECTION_RE = re.compile(r'overview|introduction|summary|conclusion|feature|capability|benefit', re.IGNORECASE)
+
+# Which section each keyword marks the start of
+_SECTION_STARTS = {
+    'overview': {'overview', 'introduction', 'summary'},
+    'features': {'feature', 'capability', 'benefit'},
+    'summary': {'summary', 'conclusion'},
+}
 
-def extract_youtube_links(text: str) -> List[Dict[str, str]]:
-    """Extract YouTube links from text"""
-    patterns = [
-        r'https?://(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]+)',
-        r'https?://(?:www\.)?youtu\.be/([a-zA-Z0-9_-]+)',
-        r'https?://(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]+)',
-        r'youtube\.com/watch\?v=([a-zA-Z0-9_-]+)',
-        r'youtu\.be/([a-zA-Z0-9_-]+)',
-    ]
-    
-    links = []
-    seen_ids = set()
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            video_id = match.group(1)
-            if video_id not in seen_ids:
-                seen_ids.add(video_id)
-                url = f"https://www.youtube.com/watch?v={video_id}"
-                links.append({"video_id": video_id, "url": url})
-    
-    return links
 
+def find_section_starts(lines: List[str]) -> Dict[str, int]:
+    """Index of the first line mentioning each section, found in a single pass"""
+    starts = {}
+    for i, line in enumerate(lines):
+        hits = {hit.lower() for hit in _SECTION_RE.findall(line)}
+        if not hits:
+            continue
+        for name, keywords in _SECTION_STARTS.items():
+            if name not in starts and hits & keywords:
+                starts[name] = i
+        if len(starts) == len(_SECTION_STARTS):
+            break
+    return starts
+
+
+def _classify_line(line: str) -> Tuple[str, str]:
+    """(kind, text) for a line whose content isn't known up front (copied from the source or built from the filename)"""
+    line = line.strip()
+    if not line:
+        return ('blank', '')
+    if line in SECTION_HEADERS:
+        return ('header', line)
+    if line.startswith('-'):
+        return ('bullet', line[1:].strip())
+    if EMPHASIS_RE.search(line):
+        return ('bold', line)
+    if 'youtube.com' in line or 'youtu.be' in line:
+        return ('link', line)
+    return ('para', line)
 
-def extract_title_from_filename(filename: str) -> str:
-    """Extract a readable title from filename"""
-    # Remove extension
-    name = Path(filename).stem
-    # Replace underscores with spaces
-    name = name.replace('_', ' ')
-    # Remove 'demo-video' suffix
-    name = re.sub(r'\s*demo\s*video\s*$', '', name, flags=re.IGNORECASE)
-    # Clean up multiple spaces
-    name = ' '.join(name.split())
-    return name.strip()
 
+_BLANK = ('blank', '')
 
-def improve_document_content(original_text: str, filename: str) -> str:
-    """Improve document content structure"""
-    lines = original_text.split('\n')
+
+def improve_document_content(lines: List[str], filename: str, youtube_links: List[Dict[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Improve document content structure
     
-    # Extract YouTube links
-    youtube_links = extract_youtube_links(original_text)
+    Returned as (kind, text) lines; fixed lines are tagged here and only lines with
+    variable content are classified, so the docx writer just dispatches on kind.
+    """
+    section_starts = find_section_starts(lines)
     
     # Extract title from filename
     title = extract_title_from_filename(filename)
@@ -95,140 +126,165 @@ def improve_document_content(original_text: str, filename: str) -> str:
     
     # Title
     if title:
-        improved_lines.append(title)
-        improved_lines.append("")
+        improved_lines.append(_classify_line(title))
+        improved_lines.append(_BLANK)
     
     # Overview section
-    improved_lines.append("OVERVIEW")
-    improved_lines.append("")
+    improved_lines.append(('header', "OVERVIEW"))
+    improved_lines.append(_BLANK)
     
     # Try to extract existing overview or create one
-    overview_found = False
-    for i, line in enumerate(lines):
-        if any(keyword in line.lower() for keyword in ['overview', 'introduction', 'summary']):
-            # Found overview section, include next few paragraphs
-            improved_lines.append(line)
-            improved_lines.append("")
-            for j in range(i + 1, min(i + 5, len(lines))):
-                if lines[j].strip() and not lines[j].strip().startswith('#'):
-                    improved_lines.append(lines[j])
-                elif lines[j].strip().startswith('#'):
-                    break
-            overview_found = True
-            break
+    overview_found = 'overview' in section_starts
+    if overview_found:
+        # Found overview section, include next few paragraphs
+        i = section_starts['overview']
+        improved_lines.append(_classify_line(lines[i]))
+        improved_lines.append(_BLANK)
+        for j in range(i + 1, min(i + 5, len(lines))):
+            if lines[j].strip() and not lines[j].strip().startswith('#'):
+                improved_lines.append(_classify_line(lines[j]))
+            elif lines[j].strip().startswith('#'):
+                break
     
     if not overview_found:
         # Create a basic overview from filename
-        improved_lines.append(f"This document provides information about {title}.")
-        improved_lines.append("")
+        improved_lines.append(_classify_line(f"This document provides information about {title}."))
+        improved_lines.append(_BLANK)
     
-    improved_lines.append("")
-    improved_lines.append("KEY FEATURES")
-    improved_lines.append("")
+    improved_lines.append(_BLANK)
+    improved_lines.append(('header', "KEY FEATURES"))
+    improved_lines.append(_BLANK)
     
     # Try to extract features or create placeholder
-    features_found = False
-    for i, line in enumerate(lines):
-        if any(keyword in line.lower() for keyword in ['feature', 'capability', 'benefit']):
-            features_found = True
-            # Include feature section
-            for j in range(i, min(i + 10, len(lines))):
-                if lines[j].strip():
-                    improved_lines.append(lines[j])
-            break
+    features_found = 'features' in section_starts
+    if features_found:
+        # Include feature section
+        i = section_starts['features']
+        for j in range(i, min(i + 10, len(lines))):
+            if lines[j].strip():
+                improved_lines.append(_classify_line(lines[j]))
     
     if not features_found:
-        improved_lines.append("Key features and capabilities will be detailed here.")
-        improved_lines.append("")
+        improved_lines.append(('para', "Key features and capabilities will be detailed here."))
+        improved_lines.append(_BLANK)
     
-    improved_lines.append("")
-    improved_lines.append("DEMO VIDEO")
-    improved_lines.append("")
+    improved_lines.append(_BLANK)
+    improved_lines.append(('header', "DEMO VIDEO"))
+    improved_lines.append(_BLANK)
     
     # Add video links
     if youtube_links:
         for link in youtube_links:
-            improved_lines.append(f"Watch the demonstration video:")
-            improved_lines.append("")
-            improved_lines.append(f"Demo Video: {link['url']}")
-            improved_lines.append("")
-            improved_lines.append("This video demonstrates:")
-            improved_lines.append("- Key features and capabilities")
-            improved_lines.append("- Real-world use cases")
-            improved_lines.append("- Integration and deployment")
-            improved_lines.append("")
+            improved_lines.append(('para', "Watch the demonstration video:"))
+            improved_lines.append(_BLANK)
+            improved_lines.append(('bold', f"Demo Video: {link['url']}"))
+            improved_lines.append(_BLANK)
+            improved_lines.append(('para', "This video demonstrates:"))
+            improved_lines.append(('bullet', "Key features and capabilities"))
+            improved_lines.append(('bullet', "Real-world use cases"))
+            improved_lines.append(('bullet', "Integration and deployment"))
+            improved_lines.append(_BLANK)
     else:
-        improved_lines.append("Demo Video: [YouTube link will be added here]")
-        improved_lines.append("")
+        improved_lines.append(('bold', "Demo Video: [YouTube link will be added here]"))
+        improved_lines.append(_BLANK)
     
-    improved_lines.append("SUMMARY")
-    improved_lines.append("")
+    improved_lines.append(('header', "SUMMARY"))
+    improved_lines.append(_BLANK)
     
     # Try to extract summary or create one
-    summary_found = False
-    for i, line in enumerate(lines):
-        if 'summary' in line.lower() or 'conclusion' in line.lower():
-            summary_found = True
-            for j in range(i, len(lines)):
-                if lines[j].strip():
-                    improved_lines.append(lines[j])
-            break
+    summary_found = 'summary' in section_starts
+    if summary_found:
+        for j in range(section_starts['summary'], len(lines)):
+            if lines[j].strip():
+                improved_lines.append(_classify_line(lines[j]))
     
     if not summary_found:
-        improved_lines.append(f"{title} provides advanced capabilities for modern network security.")
-        improved_lines.append("")
+        improved_lines.append(_classify_line(f"{title} provides advanced capabilities for modern network security."))
+        improved_lines.append(_BLANK)
     
     # Add source line
     if youtube_links:
         source_url = youtube_links[0]['url']
-        improved_lines.append("")
-        improved_lines.append(f"Source: {title} | {source_url}")
+        improved_lines.append(_BLANK)
+        improved_lines.append(('bold', f"Source: {title} | {source_url}"))
     
-    return '\n'.join(improved_lines)
+    return improved_lines
+
+
+def _add_run_paragraph(doc, text: str, bold: bool = False, color=None):
+    """Paragraph holding a single formatted run"""
+    run = doc.add_paragraph().add_run(text)
+    if bold:
+        run.bold = True
+    if color is not None:
+        run.font.color.rgb = color
 
 
-def create_improved_docx(original_path: Path, improved_content: str, output_dir: Path):
-    """Create an improved .docx file"""
+def create_improved_docx(original_path: Path, improved_lines: List[Tuple[str, str]], output_dir: Path) -> Tuple[Path, bytes]:
+    """Build an improved .docx file; returns its output path and bytes for the caller to write"""
     doc = DocxDocument()
-    
-    lines = improved_content.split('\n')
-    current_section = None
-    
-    for line in lines:
-        line = line.strip()
+    # Resolve styles once per document rather than by name for every paragraph
+    heading_style = doc.styles['Heading 1']
+    bullet_style = doc.styles['List Bullet']
+    
+    emit = {
+        'blank': lambda text: doc.add_paragraph(),  # Empty paragraph
+        'header': lambda text: doc.add_paragraph(text, style=heading_style),  # Section header
+        'bullet': lambda text: doc.add_paragraph(text, style=bullet_style),  # Bullet point
+        'bold': lambda text: _add_run_paragraph(doc, text, bold=True),  # Important line - make it bold
+        'link': lambda text: _add_run_paragraph(doc, text, color=_LINK_BLUE),  # YouTube link
+        'para': lambda text: doc.add_paragraph(text),  # Regular paragraph
+    }
+    for kind, text in improved_lines:
+        emit[kind](text)
+    
+    # Serialize (zip) here; the disk write happens on main()'s writer threads
+    output_path = output_dir / original_path.name
+    buffer = BytesIO()
+    doc.save(buffer)
+    return output_path, buffer.getvalue()
+
+
+def _process_one(path_str: str, output_dir_str: str) -> Tuple[List[str], Optional[Tuple[str, bytes]]]:
+    """
+    Improve a single document (runs in a worker process)
+    
+    Returns the progress lines (printed by main) and the (output path, docx bytes) to write, if any.
+    """
+    docx_file = Path(path_str)
+    log = [f"Processing: {docx_file.name}"]
+    output = None
+    try:
+        # Read original document
+        original_text = read_docx_text(path_str)
         
-        if not line:
-            # Add empty paragraph
-            doc.add_paragraph()
-            continue
+        if not original_text.strip():
+            log.append(f"  ⚠️  Warning: Document appears to be empty, skipping...")
+            return log, output
         
-        # Check if it's a section header
-        if line.isupper() and len(line) > 3 and not line.startswith('HTTP'):
-            # Section header
-            p = doc.add_paragraph(line)
-            p.style = 'Heading 1'
-            current_section = line
-        elif line.startswith('-'):
-            # Bullet point
-            p = doc.add_paragraph(line[1:].strip(), style='List Bullet')
-        elif any(keyword in line.lower() for keyword in ['demo video:', 'source:']):
-            # Important line - make it bold
-            p = doc.add_paragraph()
-            run = p.add_run(line)
-            run.bold = True
-        elif 'youtube.com' in line or 'youtu.be' in line:
-            # YouTube link
-            p = doc.add_paragraph()
-            run = p.add_run(line)
-            run.font.color.rgb = RGBColor(0, 102, 204)  # Blue color for links
-        else:
-            # Regular paragraph
-            doc.add_paragraph(line)
-    
-    # Save improved document
-    output_path = output_dir / original_path.name
-    doc.save(str(output_path))
-    print(f"✅ Created improved version: {output_path.name}")
+        # Extract YouTube links
+        youtube_links = extract_youtube_links(original_text)
+        if not youtube_links:
+            log.append(f"  ⚠️  Warning: No YouTube links found in document")
+        
+        # Improve content
+        improved_lines = improve_document_content(original_text.split('\n'), docx_file.name, youtube_links)
+        
+        # Create improved document
+        output_path, data = create_improved_docx(docx_file, improved_lines, Path(output_dir_str))
+        output = (str(output_path), data)
+        log.append(f"✅ Created improved version: {output_path.name}")
+        
+        log.append(f"  ✓ Processed successfully")
+        if youtube_links:
+            log.append(f"    Found {len(youtube_links)} YouTube link(s)")
+        log.append("")
+        
+    except Exception as e:
+        log.append(f"  ❌ Error processing {docx_file.name}: {e}")
+        log.append("")
+        logger.exception(f"Failed to improve {docx_file.name}")
+    return log, output
 
 
 def main():
@@ -251,9 +307,8 @@ def main():
     print()
     
     # Process all .docx files
-    docx_files = list(demo_videos_dir.glob('*.docx'))
-    # Filter out temp files (starting with ~$)
-    docx_files = [f for f in docx_files if not f.name.startswith('~$')]
+    # Temp files (starting with ~$) are filtered out
+    docx_files = list_docx_files(demo_videos_dir)
     
     if not docx_files:
         print("No .docx files found in the directory.")
@@ -261,37 +316,21 @@ def main():
     
     print(f"Found {len(docx_files)} document(s) to process:\n")
     
-    for docx_file in docx_files:
-        try:
-            print(f"Processing: {docx_file.name}")
-            
-            # Read original document
-            doc = DocxDocument(str(docx_file))
-            original_text = '\n'.join([para.text for para in doc.paragraphs])
-            
-            if not original_text.strip():
-                print(f"  ⚠️  Warning: Document appears to be empty, skipping...")
-                continue
-            
-            # Extract YouTube links
-            youtube_links = extract_youtube_links(original_text)
-            if not youtube_links:
-                print(f"  ⚠️  Warning: No YouTube links found in document")
-            
-            # Improve content
-            improved_content = improve_document_content(original_text, docx_file.name)
-            
-            # Create improved document
-            create_improved_docx(docx_file, improved_content, output_dir)
-            
-            print(f"  ✓ Processed successfully")
-            if youtube_links:
-                print(f"    Found {len(youtube_links)} YouTube link(s)")
-            print()
-            
-        except Exception as e:
-            print(f"  ❌ Error processing {docx_file.name}: {e}")
-            print()
+    # Files are independent (read, transform, write), so process them in parallel;
+    # results come back in input order and each file's output is printed in one block.
+    # Finished documents are written on a small thread pool so disk writes overlap with processing.
+    save_futures = {}
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor, ThreadPoolExecutor(max_workers=4) as save_pool:
+        for log, output in executor.map(_process_one, [str(f) for f in docx_files], repeat(str(output_dir))):
+            print("\n".join(log))
+            if output:
+                path_str, data = output
+                save_futures[save_pool.submit(Path(path_str).write_bytes, data)] = Path(path_str).name
+        
+        wait(save_futures)
+    for future, name in save_futures.items():
+        if future.exception():
+            print(f"❌ Error saving {name}: {future.exception()}")
     
     print(f"\n✅ Done! Improved documents saved to: {output_dir}")
     print("\nNext steps:")
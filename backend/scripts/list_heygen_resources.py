@@ -3,12 +3,14 @@ Utility script to list available HeyGen avatars and voices
 Run this script to see what avatar IDs and voice IDs are available in your HeyGen account.
 
 Usage:
-    python -m scripts.list_heygen_resources
+    python -m scripts.list_heygen_resources [--refresh]
     or
-    python backend/scripts/list_heygen_resources.py
+    python backend/scripts/list_heygen_resources.py [--refresh]
 """
 
+import argparse
 import asyncio
+import logging
 import sys
 import os
 from pathlib import Path
@@ -22,11 +24,55 @@ if sys.platform == 'win32':
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Fetch errors (with tracebacks) go through logging; LOG_LEVEL=ERROR or above keeps CI/cron runs quiet
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
+logger = logging.getLogger(__name__)
+
+import httpx
 from app.services.heygen_service import heygen_service
 from app.core.config import settings
+from scripts._cache import cached_fetch, DEFAULT_TTL
+
+
+def _avatar_type(avatar: dict) -> str:
+    return avatar.get("type") or avatar.get("avatar_type") or ""
+
+
+def render_avatar_block(i: int, avatar: dict) -> str:
+    """Listing entry for one avatar, ending with the blank separator line"""
+    avatar_id = avatar.get("avatar_id") or avatar.get("id") or "N/A"
+    avatar_name = avatar.get("name") or avatar.get("avatar_name") or "Unnamed"
+    lines = [
+        f"  {i}. {avatar_name}",
+        f"     ID: {avatar_id}",
+        f"     Type: {_avatar_type(avatar) or 'unknown'}",
+        f"     Gender: {avatar.get('gender', 'N/A')}",
+    ]
+    if avatar.get("preview_url"):
+        lines.append(f"     Preview: {avatar.get('preview_url')}")
+    lines.append("")
+    return "\n".join(lines)
 
 
-async def list_resources():
+def render_voice_block(i: int, voice: dict) -> str:
+    """Listing entry for one voice, ending with the blank separator line"""
+    voice_id = voice.get("voice_id") or voice.get("id") or "N/A"
+    voice_name = voice.get("name") or voice.get("voice_name") or ""
+    # Remove emojis and special characters that cause encoding issues ('ignore' can't raise)
+    voice_name = voice_name.encode('ascii', 'ignore').decode('ascii').strip() or "Unnamed"
+    lines = [
+        f"  {i}. {voice_name}",
+        f"     ID: {voice_id}",
+        f"     Gender: {voice.get('gender', 'N/A')}",
+        f"     Language: {voice.get('language') or voice.get('locale', 'N/A')}",
+    ]
+    if voice.get("preview_url"):
+        lines.append(f"     Preview: {voice.get('preview_url')}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+async def list_resources(refresh: bool = False):
     """List available HeyGen avatars and voices"""
     print("=" * 80)
     print("HeyGen Available Resources")
@@ -34,61 +80,51 @@ async def list_resources():
     print()
     
     # Check API key
-    if not settings.HEYGEN_API_KEY:
+    api_key = settings.HEYGEN_API_KEY
+    if not api_key:
         print("[ERROR] HEYGEN_API_KEY not configured!")
         print("   Please set HEYGEN_API_KEY in your .env file or environment variables.")
         return
     
-    print(f"[OK] API Key: {'*' * (len(settings.HEYGEN_API_KEY) - 8)}{settings.HEYGEN_API_KEY[-8:]}")
+    print(f"[OK] API Key: {'*' * (len(api_key) - 8)}{api_key[-8:]}")
     print(f"[OK] API URL: {settings.HEYGEN_API_URL}")
     print()
     
+    # The two catalogs are independent: fetch them together over one client, report failures per section
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        avatars, voices = await asyncio.gather(
+            cached_fetch("avatars", DEFAULT_TTL, lambda: heygen_service.list_avatars(client=client), refresh),
+            cached_fetch("voices", DEFAULT_TTL, lambda: heygen_service.list_voices(client=client), refresh),
+            return_exceptions=True
+        )
+    
     # List Avatars
     print("-" * 80)
     print("AVATARS")
     print("-" * 80)
     try:
-        avatars = await heygen_service.list_avatars()
+        if isinstance(avatars, Exception):
+            raise avatars
         if avatars:
             print(f"\n[OK] Found {len(avatars)} avatar(s):\n")
-            for i, avatar in enumerate(avatars, 1):
-                avatar_id = avatar.get("avatar_id") or avatar.get("id") or "N/A"
-                avatar_name = avatar.get("name") or avatar.get("avatar_name") or "Unnamed"
-                avatar_type = avatar.get("type") or avatar.get("avatar_type") or "unknown"
-                gender = avatar.get("gender", "N/A")
-                
-                print(f"  {i}. {avatar_name}")
-                print(f"     ID: {avatar_id}")
-                print(f"     Type: {avatar_type}")
-                print(f"     Gender: {gender}")
-                if avatar.get("preview_url"):
-                    print(f"     Preview: {avatar.get('preview_url')}")
-                print()
+            sys.stdout.write("\n".join(render_avatar_block(i, a) for i, a in enumerate(avatars, 1)) + "\n")
             
-            # Show recommended configuration
+            # Show recommended configuration: the first photo avatar (scan stops there), else the first avatar
             print("\n" + "=" * 80)
             print("RECOMMENDED CONFIGURATION")
             print("=" * 80)
-            photo_avatars = [a for a in avatars if "photo" in (a.get("type") or a.get("avatar_type") or "").lower()]
-            if photo_avatars:
-                recommended = photo_avatars[0]
-                recommended_id = recommended.get("avatar_id") or recommended.get("id")
-                print(f"\nRecommended Photo Avatar (first found):")
-                print(f"  HEYGEN_AVATAR_ID={recommended_id}")
-                print(f"  Name: {recommended.get('name', 'N/A')}")
-            else:
-                # Use first avatar if no photo avatars found
-                recommended = avatars[0]
-                recommended_id = recommended.get("avatar_id") or recommended.get("id")
-                print(f"\nRecommended Avatar (first available):")
-                print(f"  HEYGEN_AVATAR_ID={recommended_id}")
-                print(f"  Name: {recommended.get('name', 'N/A')}")
+            recommended = next((a for a in avatars if "photo" in _avatar_type(a).lower()), None)
+            label = "Recommended Photo Avatar (first found)"
+            if recommended is None:
+                recommended, label = avatars[0], "Recommended Avatar (first available)"
+            recommended_id = recommended.get("avatar_id") or recommended.get("id")
+            print(f"\n{label}:")
+            print(f"  HEYGEN_AVATAR_ID={recommended_id}")
+            print(f"  Name: {recommended.get('name', 'N/A')}")
         else:
             print("[ERROR] No avatars found. Check your API key and account permissions.")
-    except Exception as e:
-        print(f"[ERROR] Error fetching avatars: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error fetching avatars")
     
     print()
     
@@ -97,33 +133,12 @@ async def list_resources():
     print("VOICES")
     print("-" * 80)
     try:
-        voices = await heygen_service.list_voices()
+        if isinstance(voices, Exception):
+            raise voices
         if voices:
             print(f"\n[OK] Found {len(voices)} voice(s):\n")
             # Show first 10 voices as examples
-            for i, voice in enumerate(voices[:10], 1):
-                try:
-                    voice_id = voice.get("voice_id") or voice.get("id") or "N/A"
-                    voice_name = voice.get("name") or voice.get("voice_name") or "Unnamed"
-                    # Remove emojis and special characters that cause encoding issues
-                    voice_name = voice_name.encode('ascii', 'ignore').decode('ascii').strip()
-                    if not voice_name:
-                        voice_name = "Unnamed"
-                    voice_gender = voice.get("gender", "N/A")
-                    voice_language = voice.get("language") or voice.get("locale", "N/A")
-                    
-                    print(f"  {i}. {voice_name}")
-                    print(f"     ID: {voice_id}")
-                    print(f"     Gender: {voice_gender}")
-                    print(f"     Language: {voice_language}")
-                    if voice.get("preview_url"):
-                        print(f"     Preview: {voice.get('preview_url')}")
-                    print()
-                except Exception as e:
-                    # Skip voices with encoding issues
-                    voice_id = voice.get("voice_id") or voice.get("id") or "N/A"
-                    print(f"  {i}. [Voice ID: {voice_id}] (name encoding issue)")
-                    print()
+            sys.stdout.write("\n".join(render_voice_block(i, v) for i, v in enumerate(voices[:10], 1)) + "\n")
             
             if len(voices) > 10:
                 print(f"  ... and {len(voices) - 10} more voices (total: {len(voices)})\n")
@@ -140,10 +155,8 @@ async def list_resources():
                 print(f"  Name: {recommended_voice.get('name', 'N/A')}")
         else:
             print("[ERROR] No voices found. Check your API key and account permissions.")
-    except Exception as e:
-        print(f"[ERROR] Error fetching voices: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error fetching voices")
     
     print()
     print("=" * 80)
@@ -157,5 +170,15 @@ async def list_resources():
 
 
 if __name__ == "__main__":
-    asyncio.run(list_resources())
+    parser = argparse.ArgumentParser(description="List available HeyGen avatars and voices")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached avatar/voice lists and fetch them again")
+    args = parser.parse_args()
+    # uvloop (installed with uvicorn[standard]) schedules the concurrent requests faster; not available on Windows
+    if sys.platform != 'win32':
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+    asyncio.run(list_resources(refresh=args.refresh))
 
@@ -3,12 +3,14 @@ Test script to find a working HeyGen avatar ID
 This script tests avatars from the listing to find one that actually works for video generation.
 
 Usage:
-    python -m scripts.test_heygen_avatar
+    python -m scripts.test_heygen_avatar [--refresh] [--first-only]
 """
 
+import argparse
 import asyncio
 import sys
 from pathlib import Path
+from typing import Tuple
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -20,37 +22,172 @@ if sys.platform == 'win32':
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import httpx
+import orjson
 from app.services.heygen_service import heygen_service
 from app.core.config import settings
+from scripts._cache import cached_fetch, DEFAULT_TTL
 
 
-async def test_avatars():
+# Avatars probed per run, and how many probe requests are in flight at once
+PROBE_LIMIT = 20
+PROBE_CONCURRENCY = 8
+# Over HTTP/2 the concurrent probes multiplex as streams on a single connection, so a few are plenty
+PROBE_LIMITS = httpx.Limits(max_connections=4, max_keepalive_connections=4, keepalive_expiry=60.0)
+
+TEST_SCRIPT = "Hello, this is a test video."
+
+# Listing types usable as a "type": "avatar" character; others (talking_photo, studio, ...) always fail.
+# Entries without a type are still probed
+_TESTABLE_TYPES = {"avatar", "normal"}
+
+
+# Stands in for the avatar ID while the request body template is serialized
+_AVATAR_ID_SLOT = "__avatar_id__"
+
+
+def build_payload_parts(voice_id: str) -> Tuple[bytes, bytes]:
+    """Serialize the generate request once, split around the avatar ID so each probe only splices its ID in"""
+    payload = {
+        "video_inputs": [
+            {
+                "character": {
+                    "type": "avatar",
+                    "avatar_id": _AVATAR_ID_SLOT,
+                    "avatar_style": "normal"
+                },
+                "voice": {
+                    "type": "text",
+                    "input_text": TEST_SCRIPT,
+                    "voice_id": voice_id
+                },
+                "background": {
+                    "type": "color",
+                    "value": "#FAFAFA"
+                }
+            }
+        ]
+    }
+    prefix, suffix = orjson.dumps(payload).split(orjson.dumps(_AVATAR_ID_SLOT))
+    return prefix, suffix
+
+
+async def probe(avatar: dict, sem: asyncio.Semaphore, client: httpx.AsyncClient,
+                endpoint: str, headers: dict, payload_parts: Tuple[bytes, bytes]) -> dict:
+    """Try one avatar against the video generate endpoint and report how it went"""
+    avatar_id = avatar.get("avatar_id") or avatar.get("id")
+    avatar_name = avatar.get("name", "Unnamed")
+    
+    prefix, suffix = payload_parts
+    body = prefix + orjson.dumps(avatar_id) + suffix
+    
+    result = {"ok": False, "id": avatar_id, "name": avatar_name}
+    try:
+        async with sem:
+            response = await client.post(endpoint, content=body, headers=headers)
+        result["http_version"] = response.http_version
+        
+        if response.status_code == 200:
+            try:
+                video_id = orjson.loads(response.content).get("data", {}).get("video_id")
+            except orjson.JSONDecodeError:
+                video_id = None
+            if video_id:
+                result.update(ok=True, video_id=video_id, message="[OK] Works!")
+            else:
+                result.update(reason="No video_id", message="[WARNING] 200 but no video_id")
+        elif response.status_code == 404:
+            try:
+                error_code = orjson.loads(response.content).get("error", {}).get("code", "")
+            except orjson.JSONDecodeError:
+                error_code = response.text[:50]
+            if error_code == "avatar_not_found":
+                result.update(reason="Not found", message="[FAIL] Avatar not found")
+            else:
+                result.update(reason=error_code, message=f"[FAIL] {error_code}")
+        else:
+            result.update(reason=f"Status {response.status_code}", message=f"[FAIL] Status {response.status_code}")
+    except Exception as e:
+        result.update(reason=str(e)[:50], message=f"[ERROR] {str(e)[:50]}")
+    return result
+
+
+def select_candidates(avatars: list) -> Tuple[list, int, list]:
+    """First PROBE_LIMIT testable avatars with distinct IDs, numbered for progress output,
+    plus the duplicate count and the avatars skipped for their type"""
+    # The listing can repeat an ID (public and custom categories); each probe is a paid generate call
+    seen = set()
+    candidates = []
+    duplicates = 0
+    skipped_avatars = []
+    for avatar in avatars:
+        avatar_id = avatar.get("avatar_id") or avatar.get("id")
+        if not avatar_id:
+            continue
+        avatar_type = (avatar.get("type") or avatar.get("avatar_type") or "").lower()
+        if avatar_type and avatar_type not in _TESTABLE_TYPES:
+            skipped_avatars.append(avatar)
+            continue
+        if avatar_id in seen:
+            duplicates += 1
+            continue
+        seen.add(avatar_id)
+        candidates.append((len(candidates) + 1, avatar))
+        if len(candidates) == PROBE_LIMIT:
+            break
+    return candidates, duplicates, skipped_avatars
+
+
+async def first_working(coros) -> list:
+    """Run probes concurrently, cancelling the rest once one avatar works; cancelled probes come back as None"""
+    tasks = [asyncio.create_task(coro) for coro in coros]
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        if any(t.exception() is None and t.result()["ok"] for t in done):
+            break
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    return [None if t.cancelled() else (t.exception() or t.result()) for t in tasks]
+
+
+async def test_avatars(refresh: bool = False, first_only: bool = False):
     """Test avatars to find one that works"""
     print("=" * 80)
     print("Testing HeyGen Avatars for Video Generation")
     print("=" * 80)
     print()
     
-    if not settings.HEYGEN_API_KEY:
+    # Read the settings once; the probes only see these locals
+    api_key = settings.HEYGEN_API_KEY
+    api_url = settings.HEYGEN_API_URL.rstrip('/')
+    if not api_key:
         print("[ERROR] HEYGEN_API_KEY not configured!")
         return
     
-    # Get list of avatars
+    # One client for the catalog calls and every probe, so connections and TLS sessions are reused
+    async with httpx.AsyncClient(http2=True, timeout=30.0, limits=PROBE_LIMITS) as client:
+        await run_tests(client, api_key, api_url, refresh, first_only)
+
+
+async def run_tests(client: httpx.AsyncClient, api_key: str, api_url: str,
+                    refresh: bool = False, first_only: bool = False):
+    """Fetch the catalog, probe the first avatars and print the results"""
+    # Get list of avatars (and voices alongside, they're independent)
     print("Fetching avatars...")
-    avatars = await heygen_service.list_avatars()
+    avatars, voices = await asyncio.gather(
+        cached_fetch("avatars", DEFAULT_TTL, lambda: heygen_service.list_avatars(client=client), refresh),
+        cached_fetch("voices", DEFAULT_TTL, lambda: heygen_service.list_voices(client=client), refresh),
+    )
     
     if not avatars:
         print("[ERROR] No avatars found!")
         return
     
-    print(f"Found {len(avatars)} avatars. Testing first 20...")
+    print(f"Found {len(avatars)} avatars. Testing first {PROBE_LIMIT}...")
     print()
     
-    # Test script (minimal)
-    test_script = "Hello, this is a test video."
-    
     # Get a working voice ID
-    voices = await heygen_service.list_voices()
     if not voices:
         print("[ERROR] No voices found!")
         return
@@ -60,77 +197,54 @@ async def test_avatars():
     print()
     
     # Test avatars
-    endpoint = f"{settings.HEYGEN_API_URL.rstrip('/')}/v2/video/generate"
+    endpoint = f"{api_url}/v2/video/generate"
     headers = {
-        "X-Api-Key": settings.HEYGEN_API_KEY,
+        "X-Api-Key": api_key,
         "Content-Type": "application/json"
     }
     
+    # Probes run concurrently (bounded by the semaphore); progress is printed in order once all are back
+    candidates, duplicates, skipped_avatars = select_candidates(avatars)
+    if duplicates:
+        print(f"Skipped {duplicates} duplicate avatar ID(s)")
+    if skipped_avatars:
+        skipped_types = sorted({(a.get("type") or a.get("avatar_type")).lower() for a in skipped_avatars})
+        print(f"Skipped {len(skipped_avatars)} avatar(s) that can't be used as a video avatar (type: {', '.join(skipped_types)})")
+    sem = asyncio.Semaphore(PROBE_CONCURRENCY)
+    payload_parts = build_payload_parts(voice_id)
+    probes = [probe(avatar, sem, client, endpoint, headers, payload_parts) for _, avatar in candidates]
+    if first_only:
+        results = await first_working(probes)
+    else:
+        results = await asyncio.gather(*probes, return_exceptions=True)
+    
     working_avatars = []
     failed_avatars = []
     
-    for i, avatar in enumerate(avatars[:20], 1):
-        avatar_id = avatar.get("avatar_id") or avatar.get("id")
-        avatar_name = avatar.get("name", "Unnamed")
-        
-        if not avatar_id:
-            continue
-        
-        print(f"Testing {i}/20: {avatar_name} (ID: {avatar_id})...", end=" ")
-        
-        payload = {
-            "video_inputs": [
-                {
-                    "character": {
-                        "type": "avatar",
-                        "avatar_id": avatar_id,
-                        "avatar_style": "normal"
-                    },
-                    "voice": {
-                        "type": "text",
-                        "input_text": test_script,
-                        "voice_id": voice_id
-                    },
-                    "background": {
-                        "type": "color",
-                        "value": "#FAFAFA"
-                    }
-                }
-            ]
-        }
-        
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(endpoint, json=payload, headers=headers)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    video_id = result.get("data", {}).get("video_id")
-                    if video_id:
-                        print("[OK] Works!")
-                        working_avatars.append({
-                            "id": avatar_id,
-                            "name": avatar_name,
-                            "video_id": video_id
-                        })
-                    else:
-                        print("[WARNING] 200 but no video_id")
-                        failed_avatars.append({"id": avatar_id, "name": avatar_name, "reason": "No video_id"})
-                elif response.status_code == 404:
-                    error_data = response.json()
-                    error_code = error_data.get("error", {}).get("code", "")
-                    if error_code == "avatar_not_found":
-                        print("[FAIL] Avatar not found")
-                        failed_avatars.append({"id": avatar_id, "name": avatar_name, "reason": "Not found"})
-                    else:
-                        print(f"[FAIL] {error_code}")
-                        failed_avatars.append({"id": avatar_id, "name": avatar_name, "reason": error_code})
-                else:
-                    print(f"[FAIL] Status {response.status_code}")
-                    failed_avatars.append({"id": avatar_id, "name": avatar_name, "reason": f"Status {response.status_code}"})
-        except Exception as e:
-            print(f"[ERROR] {str(e)[:50]}")
-            failed_avatars.append({"id": avatar_id, "name": avatar_name, "reason": str(e)[:50]})
+    for (i, avatar), result in zip(candidates, results):
+        if result is None:
+            continue  # Cancelled by --first-only
+        if isinstance(result, BaseException):
+            result = {
+                "ok": False,
+                "id": avatar.get("avatar_id") or avatar.get("id"),
+                "name": avatar.get("name", "Unnamed"),
+                "reason": str(result)[:50],
+                "message": f"[ERROR] {str(result)[:50]}",
+            }
+        print(f"Testing {i}/{PROBE_LIMIT}: {result['name']} (ID: {result['id']})... {result['message']}")
+        if result["ok"]:
+            working_avatars.append({"id": result["id"], "name": result["name"], "video_id": result["video_id"]})
+        else:
+            failed_avatars.append({"id": result["id"], "name": result["name"], "reason": result["reason"]})
+    
+    http_versions = sorted({r["http_version"] for r in results if isinstance(r, dict) and "http_version" in r})
+    if http_versions:
+        print(f"Protocol: {', '.join(http_versions)}")
+    
+    skipped = results.count(None)
+    if skipped:
+        print(f"Stopped at the first working avatar; {skipped} probe(s) cancelled")
     
     print()
     print("=" * 80)
@@ -141,10 +255,7 @@ async def test_avatars():
     if working_avatars:
         print(f"[SUCCESS] Found {len(working_avatars)} working avatar(s):\n")
         for avatar in working_avatars:
-            print(f"  ✓ {avatar['name']}")
-            print(f"    ID: {avatar['id']}")
-            print(f"    Video ID: {avatar['video_id']}")
-            print()
+            print(f"  ✓ {avatar['name']}\n    ID: {avatar['id']}\n    Video ID: {avatar['video_id']}\n")
         
         print("\n" + "=" * 80)
         print("RECOMMENDED CONFIGURATION")
@@ -162,7 +273,18 @@ async def test_avatars():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_avatars())
+    parser = argparse.ArgumentParser(description="Find a HeyGen avatar ID that works for video generation")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached avatar/voice lists and fetch them again")
+    parser.add_argument("--first-only", action="store_true", help="Stop probing as soon as one avatar works")
+    args = parser.parse_args()
+    # uvloop (installed with uvicorn[standard]) schedules the concurrent requests faster; not available on Windows
+    if sys.platform != 'win32':
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+    asyncio.run(test_avatars(refresh=args.refresh, first_only=args.first_only))
 
 
 